@@ -0,0 +1,150 @@
+import re
+import time
+from typing import Any, Dict, List
+
+from agents.ranker import ranker_agent
+from schemas.state import ResearchState
+from tools.evidence_store import resolve
+from tools.search_cache import normalize_query
+from tools.text_similarity import STOPWORDS, cosine, tfidf_vectors, tokenize
+
+# An objective counts as covered once this many extracted facts are
+# lexically close to it
+COVERAGE_MIN_FACTS = 2
+COVERAGE_MIN_SIMILARITY = 0.15
+MAX_FOLLOW_UP_QUERIES = 3  # per round, one per uncovered objective
+
+# Follow-up queries: the objective's key terms plus a few from the
+# clarified query, so a search for "Operational overheads of self-hosting"
+# still says what is being self-hosted
+MAX_OBJECTIVE_TERMS = 8
+MAX_QUERY_TERMS = 4
+
+# Instruction words that open objectives and questions but match nothing
+# on a web page
+QUERY_FILLER_WORDS = {
+    "identify", "compare", "determine", "find", "explain", "list", "describe", "analyze",
+    "analyse", "evaluate", "assess", "summarize", "summarise", "investigate", "review",
+    "estimate", "examine", "understand", "outline", "research", "quantify",
+    "do", "does", "did", "can", "could", "should", "would", "i", "we", "you", "my",
+    "our", "your", "me", "than", "there", "using", "about", "between", "into",
+}
+_QUERY_TERM = re.compile(r"[A-Za-z0-9$][\w$.+-]*[\w$+]|[A-Za-z0-9]")
+
+# The first round reads fewer pages than the linear graph would; follow-up
+# rounds only spend more where objectives are still uncovered
+FIRST_ROUND_SOURCES = 6
+
+# Budgets for the whole iterative run (from the plan to the last round)
+MAX_RESEARCH_ROUNDS = 3
+MAX_RESEARCH_SECONDS = 180
+MAX_RESEARCH_TOKENS = 60000   # page text sent to extraction
+MAX_RESEARCH_SOURCES = 20     # pages read across rounds
+
+
+def objective_coverage(objectives: List[str], facts: List[str]) -> Dict[str, int]:
+    """Number of facts supporting each objective (TF-IDF cosine, no LLM)."""
+    if not objectives:
+        return {}
+
+    vectors = tfidf_vectors(objectives + facts)
+    objective_vectors, fact_vectors = vectors[:len(objectives)], vectors[len(objectives):]
+
+    return {
+        objective: sum(1 for f in fact_vectors if cosine(o, f) >= COVERAGE_MIN_SIMILARITY)
+        for objective, o in zip(objectives, objective_vectors)
+    }
+
+
+def _exhausted_budget(state: ResearchState, round_num: int):
+    if round_num >= MAX_RESEARCH_ROUNDS:
+        return "rounds"
+    if time.time() - state.get("research_started_at", time.time()) >= MAX_RESEARCH_SECONDS:
+        return "time"
+    if state.get("research_tokens", 0) >= MAX_RESEARCH_TOKENS:
+        return "tokens"
+    if len(state.get("read_urls", [])) >= MAX_RESEARCH_SOURCES:
+        return "sources"
+    return None
+
+
+def _key_terms(text: str) -> List[str]:
+    terms, seen = [], set()
+    for term in _QUERY_TERM.findall(text or ""):
+        lowered = term.lower()
+        if lowered in STOPWORDS or lowered in QUERY_FILLER_WORDS or lowered in seen:
+            continue
+        seen.add(lowered)
+        terms.append(term)
+    return terms
+
+
+def _follow_up_query(objective: str, query: str) -> str:
+    terms = _key_terms(objective)[:MAX_OBJECTIVE_TERMS]
+    have = {w for t in terms for w in tokenize(t)}
+    # Names, model sizes and figures say the most about the query's subject
+    context = sorted(
+        (t for t in _key_terms(query) if not set(tokenize(t)) <= have),
+        key=lambda t: not any(c.isdigit() or c.isupper() for c in t),
+    )
+    return " ".join(terms + context[:MAX_QUERY_TERMS])
+
+
+def _follow_up_queries(uncovered: List[str], query: str, searched: List[str]) -> List[str]:
+    seen = {normalize_query(q) for q in searched}
+    queries = []
+    for objective in uncovered:
+        follow_up = _follow_up_query(objective, query)
+        if follow_up and normalize_query(follow_up) not in seen:
+            seen.add(normalize_query(follow_up))
+            queries.append(follow_up)
+    return queries[:MAX_FOLLOW_UP_QUERIES]
+
+
+def iterative_ranker_agent(state: ResearchState):
+    """ranker_agent with the first round capped at FIRST_ROUND_SOURCES."""
+    if not state.get("research_round"):
+        state = {**state, "source_budget": FIRST_ROUND_SOURCES}
+    return ranker_agent(state)
+
+
+def coverage_agent(state: ResearchState):
+    """
+    After each reader round: measure how well the notes so far cover the
+    plan's objectives, then either queue targeted follow-up searches for
+    the uncovered ones or stop and hand over to the verifier.
+    """
+    round_num = state.get("research_round", 0) + 1
+    objectives = (state.get("plan") or {}).get("objectives", [])
+    facts = [fact for note in resolve(state.get("note_ids")) for fact in note["facts"]]
+
+    counts = objective_coverage(objectives, facts)
+    uncovered = [o for o, n in counts.items() if n < COVERAGE_MIN_FACTS]
+    searched = state.get("searched_queries", []) + state.get("search_queries", [])
+    query = state.get("clarified_query") or state.get("query", "")
+
+    stop_reason = "covered" if not uncovered else _exhausted_budget(state, round_num)
+    follow_ups = [] if stop_reason else _follow_up_queries(uncovered, query, searched)
+    if not stop_reason and not follow_ups:
+        stop_reason = "no_new_queries"
+
+    print(
+        f"[DEBUG] Coverage round {round_num}: {len(objectives) - len(uncovered)}/{len(objectives)} objectives "
+        f"covered by {len(facts)} facts, "
+        + (f"stopping ({stop_reason})" if stop_reason else f"{len(follow_ups)} follow-up searches")
+    )
+
+    update: Dict[str, Any] = {
+        "research_round": round_num,
+        "searched_queries": searched,
+        "coverage": {
+            "objectives": counts,
+            "uncovered": uncovered,
+            "stop_reason": stop_reason,
+        },
+        "research_done": bool(stop_reason),
+    }
+    if follow_ups:
+        update["search_queries"] = follow_ups
+        update["source_budget"] = MAX_RESEARCH_SOURCES - len(state.get("read_urls", []))
+    return update
@@ -0,0 +1,30 @@
+from schemas.state import ResearchState
+from tools.evidence_store import intern, resolve
+from tools.url_canonicalizer import canonicalize_url
+
+
+def dedup_agent(state: ResearchState):
+    """
+    Collapse search results that point at the same page (http/https,
+    www., trailing slashes, tracking params, fragments) before anything
+    is fetched. The first result wins its position; an https URL is
+    preferred over an http one for fetching.
+    """
+    results = resolve(state.get("source_ids"))
+    by_key = {}
+
+    for source in results:
+        key = canonicalize_url(source["url"])
+        kept = by_key.get(key)
+
+        if kept is None:
+            by_key[key] = {**source, "canonical_url": key}
+        elif kept["url"].startswith("http://") and source["url"].startswith("https://"):
+            kept["url"] = source["url"]
+
+    sources = list(by_key.values())
+    print(f"[DEBUG] Dedup: {len(results)} results → {len(sources)} unique URLs")
+
+    return {
+        "source_ids": intern("source", sources)
+    }
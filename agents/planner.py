@@ -32,14 +32,21 @@
 #             "search_queries": response.search_queries}
 
 
+import asyncio
+import time
 from dotenv import load_dotenv
 from langchain_core.messages import SystemMessage, HumanMessage
 from langchain_google_genai import ChatGoogleGenerativeAI
+from langgraph.config import get_config
+from langgraph.errors import GraphInterrupt
 from langgraph.types import interrupt
 from typing import List, Literal
 from pydantic import BaseModel, Field
 
+from agents.speculation import speculate
 from schemas.state import ResearchState
+from tools.plan_cache import get_plan_cache, plan_cache_key
+from tools.telemetry import llm_callbacks
 
 load_dotenv()
 
@@ -56,19 +63,44 @@ class PlannerOutput(BaseModel):
     objectives: List[str]
     search_queries: List[str]
 
+class FusedPlannerOutput(BaseModel):
+    status: Literal["CLEAR", "AMBIGUOUS"]
+    reason: str
+    questions: List[str] = Field(
+        default_factory=list,
+        description="Clarification questions; empty when the query is CLEAR"
+    )
+    objectives: List[str] = Field(
+        default_factory=list,
+        description="Provisional research objectives, given even when AMBIGUOUS"
+    )
+    search_queries: List[str] = Field(
+        default_factory=list,
+        description="Provisional web search queries for the objectives"
+    )
+
 # ---------- LLMs ----------
 
 ambiguity_llm = ChatGoogleGenerativeAI(
     model="gemini-2.5-flash"
-).with_structured_output(AmbiguityCheckOutput)
+).with_structured_output(AmbiguityCheckOutput).with_config(callbacks=llm_callbacks)
 
 clarification_llm = ChatGoogleGenerativeAI(
     model="gemini-2.5-flash"
-).with_structured_output(ClarificationOutput)
+).with_structured_output(ClarificationOutput).with_config(callbacks=llm_callbacks)
 
 planner_llm = ChatGoogleGenerativeAI(
     model="gemini-2.5-flash"
-).with_structured_output(PlannerOutput)
+).with_structured_output(PlannerOutput).with_config(callbacks=llm_callbacks)
+
+# Fused mode: one call decides ambiguity, asks the questions and drafts
+# the plan, instead of up to three serial calls per planner round
+FUSED_PLANNER = True
+FUSED_PLANNER_MODEL = "gemini-2.5-flash"
+
+fused_planner_llm = ChatGoogleGenerativeAI(
+    model=FUSED_PLANNER_MODEL
+).with_structured_output(FusedPlannerOutput).with_config(callbacks=llm_callbacks)
 
 # ---------- Prompts ----------
 
@@ -100,17 +132,28 @@ PLANNER_PROMPT = """
         Do NOT answer the question.
 """
 
+FUSED_PLANNER_PROMPT = """
+You are a research planner.
+
+Your task, in one response:
+1. Decide whether the user's query is sufficiently specific for factual research (status CLEAR or AMBIGUOUS) and give the reason.
+2. If AMBIGUOUS, ask clarification questions that will reduce the ambiguity.
+3. ALWAYS produce a research plan: clear research objectives and concrete web search queries for the query as it stands.
+
+Rules:
+- DO NOT assume missing criteria.
+- Subjective terms like "best", "top", "most", "worst", etc.(these words are just used for example there are many more words like these) REQUIRE clarification.
+- Be conservative.
+- Max 3 questions, and none when the query is CLEAR.
+- Do NOT answer the question.
+"""
+
 # ---------- Agent ----------
 MAX_CLARIFICATION_ROUNDS = 3
 
 # ---------- Planner Node ----------
 
-def planner_agent(state: ResearchState):
-    """
-    Planner owns the clarification loop.
-    It is the ONLY place where ambiguity is decided.
-    """
-
+def _planner_query(state: ResearchState):
     # Resume input (if any)
     resume = state.get("__resume__")
 
@@ -120,41 +163,150 @@ def planner_agent(state: ResearchState):
 
     query = state.get("clarified_query") or state["query"]
     round_num = state.get("clarification_round", 0)
+    return query, round_num
 
-    # Stop clarification if max rounds reached
-    if round_num >= MAX_CLARIFICATION_ROUNDS:
-        return _produce_plan(query)
-
-    # Ambiguity check
-    ambiguity = ambiguity_llm.invoke([
+def _ambiguity_messages(query: str):
+    return [
         SystemMessage(content=AMBIGUITY_PROMPT),
         HumanMessage(content=query),
-    ])
+    ]
 
-    if ambiguity.status == "AMBIGUOUS":
-        questions = clarification_llm.invoke([
-            SystemMessage(content=CLARIFICATION_PROMPT),
-            HumanMessage(content=query),
-        ])
+def _clarification_messages(query: str):
+    return [
+        SystemMessage(content=CLARIFICATION_PROMPT),
+        HumanMessage(content=query),
+    ]
 
+def _ask_for_clarification(reason: str, questions: List[str], round_num: int, query: str, search_queries=None):
+    try:
         return interrupt({
             "type": "clarification",
-            "reason": ambiguity.reason,
-            "questions": questions.questions,
+            "reason": reason,
+            "questions": questions,
             "round": round_num + 1,
         })
+    except GraphInterrupt:
+        # The run is pausing (not resuming): search and prefetch for the
+        # provisional plan while the human thinks
+        speculate(query, search_queries or [query])
+        raise
+
+def _fused_messages(query: str):
+    return [
+        SystemMessage(content=FUSED_PLANNER_PROMPT),
+        HumanMessage(content=query),
+    ]
+
+def _thread_id():
+    try:
+        return (get_config().get("configurable") or {}).get("thread_id")
+    except RuntimeError:
+        return None  # called outside a graph run
+
+def _cached_verdict(query: str, thread_id):
+    if thread_id is None:
+        return None
+    cached = get_plan_cache().get(plan_cache_key(FUSED_PLANNER_MODEL, FUSED_PLANNER_PROMPT, query, thread_id))
+    return FusedPlannerOutput.model_validate(cached) if cached is not None else None
+
+def _cache_verdict(query: str, thread_id, verdict: FusedPlannerOutput):
+    if thread_id is not None:
+        get_plan_cache().set(
+            plan_cache_key(FUSED_PLANNER_MODEL, FUSED_PLANNER_PROMPT, query, thread_id), verdict.model_dump()
+        )
+    return verdict
+
+def _fused_verdict(query: str):
+    """
+    Verdict + provisional plan for `query`. Cached per thread and
+    (clarified) query, so the planner re-running on resume costs no LLM
+    call, while other users of the same query still get a fresh verdict.
+    """
+    thread_id = _thread_id()
+    return _cached_verdict(query, thread_id) or _cache_verdict(
+        query, thread_id, fused_planner_llm.invoke(_fused_messages(query))
+    )
+
+async def _afused_verdict(query: str):
+    # The plan cache is blocking SQLite; keep it off the event loop
+    thread_id = _thread_id()
+    cached = await asyncio.to_thread(_cached_verdict, query, thread_id)
+    if cached is not None:
+        return cached
+    verdict = await fused_planner_llm.ainvoke(_fused_messages(query))
+    return await asyncio.to_thread(_cache_verdict, query, thread_id, verdict)
+
+def _fused_update(verdict: FusedPlannerOutput, round_num: int, query: str):
+    """
+    Interrupt for AMBIGUOUS (until MAX_CLARIFICATION_ROUNDS), otherwise
+    take the provisional plan as is. None if it came back without one.
+    """
+    if verdict.status == "AMBIGUOUS" and verdict.questions and round_num < MAX_CLARIFICATION_ROUNDS:
+        return _ask_for_clarification(verdict.reason, verdict.questions, round_num, query, verdict.search_queries)
+
+    if not verdict.search_queries:
+        return None
+    return _plan_update(PlannerOutput(objectives=verdict.objectives, search_queries=verdict.search_queries))
+
+def planner_agent(state: ResearchState):
+    """
+    Planner owns the clarification loop.
+    It is the ONLY place where ambiguity is decided.
+    """
+    query, round_num = _planner_query(state)
+
+    if FUSED_PLANNER:
+        update = _fused_update(_fused_verdict(query), round_num, query)
+        return update if update is not None else _produce_plan(query)
+
+    # Stop clarification if max rounds reached
+    if round_num >= MAX_CLARIFICATION_ROUNDS:
+        return _produce_plan(query)
+
+    # Ambiguity check
+    ambiguity = ambiguity_llm.invoke(_ambiguity_messages(query))
+
+    if ambiguity.status == "AMBIGUOUS":
+        questions = clarification_llm.invoke(_clarification_messages(query))
+        return _ask_for_clarification(ambiguity.reason, questions.questions, round_num, query)
 
     # Clear → produce plan
     return _produce_plan(query)
 
-def _produce_plan(query: str):
-    plan = planner_llm.invoke([
+async def aplanner_agent(state: ResearchState):
+    query, round_num = _planner_query(state)
+
+    if FUSED_PLANNER:
+        update = _fused_update(await _afused_verdict(query), round_num, query)
+        return update if update is not None else await _aproduce_plan(query)
+
+    if round_num >= MAX_CLARIFICATION_ROUNDS:
+        return await _aproduce_plan(query)
+
+    ambiguity = await ambiguity_llm.ainvoke(_ambiguity_messages(query))
+
+    if ambiguity.status == "AMBIGUOUS":
+        questions = await clarification_llm.ainvoke(_clarification_messages(query))
+        return _ask_for_clarification(ambiguity.reason, questions.questions, round_num, query)
+
+    return await _aproduce_plan(query)
+
+def _plan_messages(query: str):
+    return [
         SystemMessage(content=PLANNER_PROMPT),
         HumanMessage(content=query),
-    ])
+    ]
 
+def _plan_update(plan: PlannerOutput):
     return {
         "plan": plan.model_dump(),
         "search_queries": plan.search_queries,
         "clarification_complete": True,
+        "research_started_at": time.time(),
     }
+
+def _produce_plan(query: str):
+    return _plan_update(planner_llm.invoke(_plan_messages(query)))
+
+async def _aproduce_plan(query: str):
+    return _plan_update(await planner_llm.ainvoke(_plan_messages(query)))
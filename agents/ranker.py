@@ -0,0 +1,118 @@
+from collections import Counter
+from typing import Any, Dict, List
+from urllib.parse import urlparse
+
+from schemas.state import ResearchState
+from tools.evidence_store import intern, resolve
+from tools.source_classifier import classify_source_type
+from tools.text_similarity import cosine, tfidf_vectors
+from tools.url_canonicalizer import canonicalize_url
+
+# Adaptive top-K: always read MIN, never more than MAX, and stop in
+# between once scores drop below a share of the best source's score
+MIN_SOURCES_TO_READ = 4
+MAX_SOURCES_TO_READ = 10
+RELATIVE_SCORE_CUTOFF = 0.5
+
+SOURCE_TYPE_WEIGHTS = {
+    "official": 1.0,
+    "independent_blog": 0.7,
+    "vendor_blog": 0.6,
+    "forum": 0.2,
+}
+
+# Score mix
+RELEVANCE_WEIGHT = 0.6     # snippet/title similarity to the plan
+SOURCE_TYPE_WEIGHT = 0.25  # classify_source_type tier
+SEARCH_SCORE_WEIGHT = 0.15 # Tavily's own relevance score
+
+# Each further source from an already selected domain is discounted
+DOMAIN_REPEAT_PENALTY = 0.6
+
+
+def _domain(url: str) -> str:
+    domain = urlparse(url).netloc.lower()
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+def score_sources(sources: List[Dict[str, Any]], reference: str) -> List[float]:
+    """
+    Score each source on lexical relevance of its title + snippet to
+    `reference`, its source-type tier and the search engine's score.
+    """
+    documents = [f"{s.get('title') or ''} {s.get('snippet') or ''}" for s in sources]
+    vectors = tfidf_vectors(documents + [reference])
+    reference_vector = vectors[-1]
+
+    relevance = [cosine(v, reference_vector) for v in vectors[:-1]]
+    best_relevance = max(relevance, default=0.0) or 1.0
+
+    scores = []
+    for source, rel in zip(sources, relevance):
+        tier = SOURCE_TYPE_WEIGHTS.get(classify_source_type(source["url"]), 0.5)
+        search_score = source.get("score") or 0.0
+        scores.append(
+            RELEVANCE_WEIGHT * rel / best_relevance
+            + SOURCE_TYPE_WEIGHT * tier
+            + SEARCH_SCORE_WEIGHT * search_score
+        )
+
+    return scores
+
+
+def select_top_sources(sources: List[Dict[str, Any]], scores: List[float],
+                       max_sources: int = MAX_SOURCES_TO_READ) -> List[Dict[str, Any]]:
+    """
+    Greedy selection by score with a per-domain diversity discount and an
+    adaptive cutoff between MIN_SOURCES_TO_READ and `max_sources`.
+    """
+    remaining = list(range(len(sources)))
+    domain_counts = Counter()
+    selected = []
+    top_score = None
+
+    while remaining and len(selected) < max_sources:
+        def adjusted(i):
+            return scores[i] * DOMAIN_REPEAT_PENALTY ** domain_counts[_domain(sources[i]["url"])]
+
+        best = max(remaining, key=lambda i: (adjusted(i), -i))
+        best_score = adjusted(best)
+        if top_score is None:
+            top_score = best_score
+
+        if len(selected) >= MIN_SOURCES_TO_READ and best_score < RELATIVE_SCORE_CUTOFF * top_score:
+            break
+
+        selected.append({**sources[best], "rank_score": round(best_score, 4)})
+        domain_counts[_domain(sources[best]["url"])] += 1
+        remaining.remove(best)
+
+    return selected
+
+
+def ranker_agent(state: ResearchState):
+    # Forums are never read, so they shouldn't take a slot; neither do
+    # pages an earlier round (iterative mode) already read
+    read = set(state.get("read_urls", []))
+    candidates = [
+        s for s in resolve(state.get("source_ids"))
+        if classify_source_type(s["url"]) != "forum"
+        and (s.get("canonical_url") or canonicalize_url(s["url"])) not in read
+    ]
+    if not candidates:
+        return {"source_ids": []}
+
+    plan = state.get("plan") or {}
+    reference = " ".join([
+        state.get("clarified_query") or state.get("query", ""),
+        *plan.get("objectives", []),
+        *state.get("search_queries", []),
+    ])
+
+    max_sources = min(MAX_SOURCES_TO_READ, state.get("source_budget") or MAX_SOURCES_TO_READ)
+    selected = select_top_sources(candidates, score_sources(candidates, reference), max_sources)
+    print(f"[DEBUG] Ranker: reading {len(selected)} of {len(candidates)} sources")
+
+    return {
+        "source_ids": intern("source", selected)
+    }
@@ -1,17 +1,45 @@
+import asyncio
 import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, as_completed, wait
 from dotenv import load_dotenv
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.runnables.config import ContextThreadPoolExecutor
 from pydantic import BaseModel, Field
 from typing import List
-import requests
-from bs4 import BeautifulSoup
 from langchain_openai import ChatOpenAI
+from tools.chunker import chunk_text, count_tokens
+from tools.evidence_store import intern, resolve
+from tools.extraction_cache import extraction_cache_key, get_extraction_cache
+from tools.html_extractor import extract_text
+from tools.http_client import afetch, fetch
+from tools.near_duplicates import NearDuplicateIndex
+from tools.page_cache import get_page_cache
 from tools.source_classifier import classify_source_type
+from tools.streaming import stream_writer
+from tools.telemetry import llm_callbacks, span
+from tools.url_canonicalizer import canonicalize_url
 load_dotenv()
 
 MAX_FACTS_PER_SOURCE = 5
-MAX_SOURCES_TO_READ = 10
+
+# Long pages are chunked (see tools/chunker) instead of cut at a fixed
+# length; this only caps how much text we tokenize per page
+MAX_PAGE_CHARS = 40000
+
+# Pipeline concurrency: fetchers feed extraction workers as pages arrive
+MAX_FETCH_WORKERS = 8
+MAX_EXTRACT_WORKERS = 4
+
+# Batching: short documents share one structured request, packed up to a
+# token budget, to cut per-request overhead on OpenRouter
+READER_BATCHING = True
+BATCH_MAX_TOKENS = 3000
+BATCH_MAX_DOCUMENTS = 6
+SHORT_DOCUMENT_TOKENS = 600
+BATCH_MAX_WAIT_SECONDS = 1.0  # a partial batch goes out after this, even if fetches are pending
 
 class ExtractedFacts(BaseModel):
     facts: List[str] = Field(
@@ -21,66 +49,540 @@ class ExtractedFacts(BaseModel):
         )
     )
 
-reader_llm = ChatOpenAI(
-    model="mistralai/mistral-7b-instruct",
+class DocumentFacts(BaseModel):
+    document_id: int = Field(description="The id attribute of the document the facts come from")
+    facts: List[str] = Field(
+        description=(
+            "List of explicit factual statements directly stated in this document. "
+            "Do NOT infer, summarize, or add opinions."
+        )
+    )
+
+class BatchExtractedFacts(BaseModel):
+    documents: List[DocumentFacts]
+
+READER_MODEL = "mistralai/mistral-7b-instruct"
+
+_reader_chat = ChatOpenAI(
+    model=READER_MODEL,
     temperature=0,
     api_key=os.getenv("OPENROUTER_API_KEY"),
     base_url="https://openrouter.ai/api/v1"
-    ).with_structured_output(ExtractedFacts)
+    )
+
+reader_llm = _reader_chat.with_structured_output(ExtractedFacts).with_config(callbacks=llm_callbacks)
+batch_reader_llm = _reader_chat.with_structured_output(BatchExtractedFacts).with_config(callbacks=llm_callbacks)
+
+EXTRACTION_PROMPT = (
+    "You are an information extraction agent. "
+    "Extract ONLY explicit factual statements from the text. "
+    "Do NOT summarize, infer, or add opinions."
+)
+
+BATCH_EXTRACTION_PROMPT = (
+    "You are an information extraction agent. "
+    "You will receive several documents, each wrapped in <document id=\"N\"> tags. "
+    "For EACH document, extract ONLY explicit factual statements from that document's text "
+    "and return them under its id. Never mix facts between documents. "
+    "Do NOT summarize, infer, or add opinions."
+)
 
 def fetch_page_text(url: str, max_chars: int = 6000) -> str:
-    try:
-        response = requests.get(url, timeout=10)
-        soup = BeautifulSoup(response.text, "html.parser")
+    cache = get_page_cache()
 
-        # Remove scripts & styles
-        for tag in soup(["script", "style", "noscript"]):
-            tag.decompose()
+    with span("page.fetch", "cache", url=url) as s:
+        try:
+            cached = cache.get(url)
+            if cached and cached.is_fresh(cache.ttl):
+                s.set(**{"cache.hit": True, "page.cache": "fresh"})
+                return cached.text[:max_chars]
 
-        text = soup.get_text(separator=" ", strip=True)
-        return text[:max_chars]
+            # Stale entry → conditional GET, reuse the stored text on 304
+            headers = cached.conditional_headers() if cached else None
+            response = fetch(url, headers=headers)
 
-    except Exception:
-        return ""
-    
-def reader_agent(state):
+            if response.status_code == 304 and cached:
+                cache.refresh(url)
+                s.set(**{"cache.hit": True, "page.cache": "revalidated"})
+                return cached.text[:max_chars]
+
+            s.set(**{"cache.hit": False, "page.cache": "miss"})
+            if response.status_code >= 400:
+                return ""
+
+            text = extract_text(response.text)
+            cache.put(
+                url,
+                text,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+            s.set(**{"page.chars": len(text)})
+            return text[:max_chars]
+
+        except Exception as e:
+            s.set(error=type(e).__name__)
+            return ""
+
+async def afetch_page_text(url: str, max_chars: int = 6000) -> str:
+    cache = get_page_cache()
+
+    with span("page.fetch", "cache", url=url) as s:
+        try:
+            # The page cache is blocking SQLite; keep it off the event loop too
+            cached = await asyncio.to_thread(cache.get, url)
+            if cached and cached.is_fresh(cache.ttl):
+                s.set(**{"cache.hit": True, "page.cache": "fresh"})
+                return cached.text[:max_chars]
+
+            headers = cached.conditional_headers() if cached else None
+            response = await afetch(url, headers=headers)
+
+            if response.status_code == 304 and cached:
+                await asyncio.to_thread(cache.refresh, url)
+                s.set(**{"cache.hit": True, "page.cache": "revalidated"})
+                return cached.text[:max_chars]
+
+            s.set(**{"cache.hit": False, "page.cache": "miss"})
+            if response.status_code >= 400:
+                return ""
+
+            # HTML parsing is CPU-bound; keep it off the event loop
+            text = await asyncio.to_thread(extract_text, response.text)
+            await asyncio.to_thread(
+                cache.put,
+                url,
+                text,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+            s.set(**{"page.chars": len(text)})
+            return text[:max_chars]
+
+        except Exception as e:
+            s.set(error=type(e).__name__)
+            return ""
+
+class _ExtractionStats:
+    """
+    Counters for one reader run. The extraction cache's own hit counter is
+    process-wide, so concurrent runs would mix their numbers.
+    """
+
+    def __init__(self):
+        self.cache_hits = 0
+        self.llm_tokens = 0  # page text actually sent to the LLM, for the research token budget
+        self._lock = threading.Lock()  # extraction workers update it concurrently
+
+    def add(self, cache_hits: int = 0, llm_texts: List[str] = ()):
+        tokens = sum(count_tokens(t) for t in llm_texts)
+        with self._lock:
+            self.cache_hits += cache_hits
+            self.llm_tokens += tokens
+
+def _extraction_messages(page_text: str):
+    return [
+        SystemMessage(content=EXTRACTION_PROMPT),
+        HumanMessage(content=page_text),
+    ]
+
+def _batch_extraction_messages(texts: List[str], missing: List[int]):
+    return [
+        SystemMessage(content=BATCH_EXTRACTION_PROMPT),
+        HumanMessage(content="\n\n".join(
+            f"<document id=\"{n}\">\n{texts[i]}\n</document>"
+            for n, i in enumerate(missing)
+        )),
+    ]
+
+def extract_facts(page_text: str, stats: _ExtractionStats = None) -> List[str]:
+    cache = get_extraction_cache()
+    key = extraction_cache_key(READER_MODEL, EXTRACTION_PROMPT, page_text)
+
+    with span("reader.extract", "cache", **{"input.chars": len(page_text)}) as s:
+        cached = cache.get(key)
+        s.set(**{"cache.hit": cached is not None})
+        if cached is not None:
+            if stats is not None:
+                stats.add(cache_hits=1)
+            return cached
+
+        if stats is not None:
+            stats.add(llm_texts=[page_text])
+        extracted = reader_llm.invoke(_extraction_messages(page_text))
+
+        cache.set(key, extracted.facts)
+        return extracted.facts
+
+async def aextract_facts(page_text: str, stats: _ExtractionStats = None) -> List[str]:
+    cache = get_extraction_cache()
+    key = extraction_cache_key(READER_MODEL, EXTRACTION_PROMPT, page_text)
+
+    with span("reader.extract", "cache", **{"input.chars": len(page_text)}) as s:
+        cached = await asyncio.to_thread(cache.get, key)
+        s.set(**{"cache.hit": cached is not None})
+        if cached is not None:
+            if stats is not None:
+                stats.add(cache_hits=1)
+            return cached
+
+        if stats is not None:
+            stats.add(llm_texts=[page_text])
+        extracted = await reader_llm.ainvoke(_extraction_messages(page_text))
+
+        await asyncio.to_thread(cache.set, key, extracted.facts)
+        return extracted.facts
+
+def extract_facts_batch(texts: List[str], stats: _ExtractionStats = None) -> List[List[str]]:
+    """
+    Extract facts from several short documents with one structured request.
+    Returns one fact list per input text, in input order.
+    """
+    cache = get_extraction_cache()
+    keys = [extraction_cache_key(READER_MODEL, BATCH_EXTRACTION_PROMPT, t) for t in texts]
+    results = [cache.get(key) for key in keys]
+    missing = [i for i, r in enumerate(results) if r is None]
+    if stats is not None:
+        stats.add(cache_hits=len(texts) - len(missing))
+
+    if len(missing) == 1:
+        results[missing[0]] = extract_facts(texts[missing[0]], stats)
+        return results
+
+    if missing:
+        if stats is not None:
+            stats.add(llm_texts=[texts[i] for i in missing])
+        try:
+            with span("reader.extract_batch", "llm", documents=len(missing)):
+                extracted = batch_reader_llm.invoke(_batch_extraction_messages(texts, missing))
+            by_id = {d.document_id: d.facts for d in extracted.documents}
+        except Exception as e:
+            print(f"[WARN] Batched extraction of {len(missing)} documents failed ({e}), retrying one by one")
+            by_id = {}
+
+        for n, i in enumerate(missing):
+            if n in by_id:
+                results[i] = by_id[n]
+                cache.set(keys[i], by_id[n])
+            else:
+                # The model skipped this document or the batch failed;
+                # extract it on its own
+                results[i] = extract_facts(texts[i], stats)
+
+    return results
+
+async def aextract_facts_batch(texts: List[str], stats: _ExtractionStats = None) -> List[List[str]]:
+    cache = get_extraction_cache()
+    keys = [extraction_cache_key(READER_MODEL, BATCH_EXTRACTION_PROMPT, t) for t in texts]
+    results = await asyncio.to_thread(lambda: [cache.get(key) for key in keys])
+    missing = [i for i, r in enumerate(results) if r is None]
+    if stats is not None:
+        stats.add(cache_hits=len(texts) - len(missing))
+
+    if len(missing) == 1:
+        results[missing[0]] = await aextract_facts(texts[missing[0]], stats)
+        return results
+
+    if missing:
+        if stats is not None:
+            stats.add(llm_texts=[texts[i] for i in missing])
+        try:
+            with span("reader.extract_batch", "llm", documents=len(missing)):
+                extracted = await batch_reader_llm.ainvoke(_batch_extraction_messages(texts, missing))
+            by_id = {d.document_id: d.facts for d in extracted.documents}
+        except Exception as e:
+            print(f"[WARN] Batched extraction of {len(missing)} documents failed ({e}), retrying one by one")
+            by_id = {}
+
+        for n, i in enumerate(missing):
+            if n in by_id:
+                results[i] = by_id[n]
+                await asyncio.to_thread(cache.set, keys[i], by_id[n])
+            else:
+                results[i] = await aextract_facts(texts[i], stats)
+
+    return results
+
+def _merge_chunk_facts(chunk_facts: List[List[str]]) -> List[str]:
+    """
+    Interleave facts chunk by chunk so the per-source cap keeps facts from
+    deep in the page, dropping repeats from overlapping chunks.
+    """
+    merged = []
+    seen = set()
+
+    for rank in range(max((len(f) for f in chunk_facts), default=0)):
+        for facts in chunk_facts:
+            if rank >= len(facts):
+                continue
+            key = " ".join(facts[rank].lower().split())
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(facts[rank])
+
+    return merged
+
+def _select_sources(sources):
     seen_urls = set()
-    notes = []
+    selected = []
 
-    for source in state["sources"]: # [:MAX_SOURCES_TO_READ]:
+    for source in sources:
         url = source["url"]
+        key = source.get("canonical_url") or canonicalize_url(url)
 
-        if url in seen_urls or classify_source_type(url) == "forum":
+        if key in seen_urls or classify_source_type(url) == "forum":
             continue
-        seen_urls.add(url)
+        seen_urls.add(key)
+        selected.append(source)
 
-        page_text = fetch_page_text(url)
-        if not page_text:
-            continue
+    return selected
 
-        system_message = SystemMessage(
-            content=(
-                "You are an information extraction agent. "
-                "Extract ONLY explicit factual statements from the text. "
-                "Do NOT summarize, infer, or add opinions."
-            )
-        )
+def _extract_group(texts: List[str], stats: _ExtractionStats) -> List[List[str]]:
+    if len(texts) == 1:
+        return [extract_facts(texts[0], stats)]
+    return extract_facts_batch(texts, stats)
+
+async def _aextract_group(texts: List[str], stats: _ExtractionStats) -> List[List[str]]:
+    if len(texts) == 1:
+        return [await aextract_facts(texts[0], stats)]
+    return await aextract_facts_batch(texts, stats)
+
+class _ChunkBatcher:
+    """
+    Turns fetched pages into extraction requests: long chunks go out on
+    their own, short ones are packed into batches up to a token budget.
+    `submit` receives a list of ((source index, chunk index), text).
+    """
+
+    def __init__(self, submit):
+        self.submit = submit
+        self.batch = []
+        self.batch_tokens = 0
+        self.batch_started_at = 0.0
+
+    def add_page(self, i: int, page_text: str):
+        for j, chunk in enumerate(chunk_text(page_text)):
+            tokens = count_tokens(chunk)
+            if not READER_BATCHING or tokens > SHORT_DOCUMENT_TOKENS:
+                self.submit([((i, j), chunk)])
+                continue
+
+            if self.batch and (self.batch_tokens + tokens > BATCH_MAX_TOKENS or len(self.batch) >= BATCH_MAX_DOCUMENTS):
+                self.flush()
+            if not self.batch:
+                self.batch_started_at = time.monotonic()
+            self.batch.append(((i, j), chunk))
+            self.batch_tokens += tokens
+
+    def time_left(self):
+        """Seconds until the partial batch is due, None when there is none."""
+        if not self.batch:
+            return None
+        return max(0.0, BATCH_MAX_WAIT_SECONDS - (time.monotonic() - self.batch_started_at))
+
+    def flush_due(self):
+        # Short pages that arrived early shouldn't wait for the slowest fetch
+        if self.batch and self.time_left() == 0:
+            self.flush()
 
-        human_message = HumanMessage(content=page_text)
+    def flush(self):
+        if self.batch:
+            self.submit(self.batch)
+        self.batch, self.batch_tokens = [], 0
 
-        extracted = reader_llm.invoke([system_message, human_message])
+    def discard(self, i: int):
+        """Drop source `i`'s chunks that haven't been submitted yet."""
+        self.batch = [item for item in self.batch if item[0][0] != i]
+        self.batch_tokens = sum(count_tokens(text) for _, text in self.batch)
 
-        if not extracted.facts:
+def _is_near_duplicate(near_duplicates: NearDuplicateIndex, sources, i: int, page_text: str, batcher, dropped) -> bool:
+    """
+    Syndicated copies / mirrors: of a set of near duplicates the one with
+    the lowest source index (the better-ranked source) is kept, whatever
+    order the fetches finish in. A page that arrives after its copy
+    displaces it; the copy's facts are discarded.
+    """
+    original, displaced = near_duplicates.add(i, page_text)
+    if original is not None:
+        print(f"[DEBUG] Skipping {sources[i]['url']}: near duplicate of {sources[original]['url']}")
+        return True
+
+    for k in displaced:
+        print(f"[DEBUG] Dropping {sources[k]['url']}: near duplicate of {sources[i]['url']}")
+        batcher.discard(k)
+        dropped.add(k)
+    return False
+
+def _store_group_facts(chunk_facts, sources, positions, group_facts=None, error=None):
+    if error is not None:
+        urls = sorted({sources[i]["url"] for i, _ in positions})
+        print(f"[WARN] Extraction failed for {', '.join(urls)} ({error})")
+        return
+    for (i, j), facts in zip(positions, group_facts):
+        chunk_facts.setdefault(i, {})[j] = facts
+
+def _build_notes(sources, chunk_facts, dropped):
+    # Emit notes in source order regardless of completion order
+    notes = []
+    for i, source in enumerate(sources):
+        if i in dropped:
+            continue
+        chunks = chunk_facts.get(i, {})
+        facts = _merge_chunk_facts([chunks[j] for j in sorted(chunks)])
+        if not facts:
             continue
 
+        url = source["url"]
         notes.append({
             "url": url,
             "title": source.get("title"),
             "source_type": classify_source_type(url),
-            "facts": extracted.facts[:MAX_FACTS_PER_SOURCE]
+            "facts": facts[:MAX_FACTS_PER_SOURCE]
+        })
+
+    return notes
+
+def _reader_update(sources, chunk_facts, stats, dropped):
+    return {
+        "note_ids": intern("note", _build_notes(sources, chunk_facts, dropped)),
+        "read_urls": [s.get("canonical_url") or canonicalize_url(s["url"]) for s in sources],
+        "research_tokens": stats.llm_tokens,
+    }
+
+def reader_agent(state):
+    sources = _select_sources(resolve(state["source_ids"]))
+    chunk_facts = {}  # source index -> {chunk index: facts}
+    stats = _ExtractionStats()
+
+    # Source-level progress as "custom" stream events for the UI
+    writer = stream_writer()
+    fetched, extracted = 0, 0
+
+    def report_progress():
+        writer({
+            "type": "reader_progress",
+            "total": len(sources),
+            "fetched": fetched,
+            "extracted": extracted,
+            "submitted": len(extractions),
         })
 
-    return {"notes": notes}
+    # Context-propagating pools keep telemetry spans and callbacks attached
+    with ContextThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as fetch_pool, \
+            ContextThreadPoolExecutor(max_workers=MAX_EXTRACT_WORKERS) as extract_pool:
+
+        fetches = {
+            fetch_pool.submit(fetch_page_text, source["url"], MAX_PAGE_CHARS): i
+            for i, source in enumerate(sources)
+        }
+
+        extractions = {}  # future -> [(source index, chunk index), ...]
+        near_duplicates = NearDuplicateIndex()
+        dropped = set()  # sources displaced by a better-ranked near duplicate
+
+        def submit(group):
+            future = extract_pool.submit(_extract_group, [text for _, text in group], stats)
+            extractions[future] = [position for position, _ in group]
+
+        batcher = _ChunkBatcher(submit)
+
+        # Hand each page's chunks to the extraction pool as soon as it is fetched
+        pending = set(fetches)
+        while pending:
+            done, pending = wait(pending, timeout=batcher.time_left(), return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=fetches.get):
+                fetched += 1
+                report_progress()
+
+                page_text = future.result()
+                i = fetches[future]
+                if page_text and not _is_near_duplicate(near_duplicates, sources, i, page_text, batcher, dropped):
+                    batcher.add_page(i, page_text)
+
+            batcher.flush_due()
+
+        batcher.flush()
+
+        for future in as_completed(extractions):
+            try:
+                _store_group_facts(chunk_facts, sources, extractions[future], future.result())
+            except Exception as e:
+                _store_group_facts(chunk_facts, sources, extractions[future], error=e)
+
+            extracted += 1
+            report_progress()
+
+    print(f"[DEBUG] Extraction cache saved {stats.cache_hits} LLM calls")
+
+    return _reader_update(sources, chunk_facts, stats, dropped)
+
+async def areader_agent(state):
+    """
+    Async reader_agent(): the same fetch → chunk → extract pipeline on
+    coroutines, with semaphores in place of the two thread pools.
+    """
+    # The evidence store is blocking SQLite; keep it off the event loop
+    sources = _select_sources(await asyncio.to_thread(resolve, state["source_ids"]))
+    chunk_facts = {}
+    stats = _ExtractionStats()
+
+    writer = stream_writer()
+    fetched, extracted = 0, 0
+    extractions = []  # tasks resolving to (positions, facts, error)
+
+    def report_progress():
+        writer({
+            "type": "reader_progress",
+            "total": len(sources),
+            "fetched": fetched,
+            "extracted": extracted,
+            "submitted": len(extractions),
+        })
+
+    fetch_slots = asyncio.Semaphore(MAX_FETCH_WORKERS)
+    extract_slots = asyncio.Semaphore(MAX_EXTRACT_WORKERS)
+
+    async def fetch_source(i: int):
+        async with fetch_slots:
+            return i, await afetch_page_text(sources[i]["url"], MAX_PAGE_CHARS)
+
+    async def extract(group):
+        positions = [position for position, _ in group]
+        async with extract_slots:
+            try:
+                return positions, await _aextract_group([text for _, text in group], stats), None
+            except Exception as e:
+                return positions, None, e
+
+    def submit(group):
+        extractions.append(asyncio.create_task(extract(group)))
+
+    batcher = _ChunkBatcher(submit)
+    near_duplicates = NearDuplicateIndex()
+    dropped = set()
+
+    pending = {asyncio.create_task(fetch_source(i)) for i in range(len(sources))}
+    while pending:
+        done, pending = await asyncio.wait(pending, timeout=batcher.time_left(), return_when=asyncio.FIRST_COMPLETED)
+        for i, page_text in sorted(task.result() for task in done):
+            fetched += 1
+            report_progress()
+
+            if page_text and not _is_near_duplicate(near_duplicates, sources, i, page_text, batcher, dropped):
+                batcher.add_page(i, page_text)
+
+        batcher.flush_due()
+
+    batcher.flush()
+
+    for next_group in asyncio.as_completed(extractions):
+        positions, group_facts, error = await next_group
+        _store_group_facts(chunk_facts, sources, positions, group_facts, error)
 
+        extracted += 1
+        report_progress()
 
+    print(f"[DEBUG] Extraction cache saved {stats.cache_hits} LLM calls")
 
+    return await asyncio.to_thread(_reader_update, sources, chunk_facts, stats, dropped)
@@ -1,18 +1,35 @@
+import asyncio
+
 from schemas.state import ResearchState
-from tools.web_search import web_search
+from tools.evidence_store import intern
+from tools.search_executor import arun_searches, run_searches
 
 MAX_RESULTS_PER_QUERY = 4
 
 def search_agent(state: ResearchState):
     all_sources = []
 
-    for query in state["search_queries"]:
-        results = web_search(
-            query=query,
-            max_results=MAX_RESULTS_PER_QUERY
-        )
+    # Queries run concurrently; results keep the planner's query order
+    for results in run_searches(
+        queries=state["search_queries"],
+        max_results=MAX_RESULTS_PER_QUERY
+    ):
+        all_sources.extend(results)
+
+    return {
+        "source_ids": intern("source", all_sources)
+    }
+
+async def asearch_agent(state: ResearchState):
+    all_sources = []
+
+    for results in await arun_searches(
+        queries=state["search_queries"],
+        max_results=MAX_RESULTS_PER_QUERY
+    ):
         all_sources.extend(results)
 
+    # The evidence store is blocking SQLite; keep it off the event loop
     return {
-        "sources": all_sources
+        "source_ids": await asyncio.to_thread(intern, "source", all_sources)
     }
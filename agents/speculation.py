@@ -0,0 +1,82 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from agents.ranker import score_sources, select_top_sources
+from agents.reader import MAX_FETCH_WORKERS, MAX_PAGE_CHARS, fetch_page_text
+from agents.searcher import MAX_RESULTS_PER_QUERY
+from tools.search_executor import run_searches
+from tools.source_classifier import classify_source_type
+from tools.telemetry import span
+from tools.url_canonicalizer import canonicalize_url
+
+# While a run waits for the human to answer clarification questions,
+# search and fetch for the provisional plan so the resumed run finds the
+# search and page caches warm. Nothing lands in graph state: reuse
+# happens through the caches when the clarified plan issues the same
+# queries or ranks the same pages.
+SPECULATIVE_PREFETCH = True
+SPECULATIVE_WORKERS = 2
+MAX_PENDING_SPECULATIONS = 8  # beyond this, new clarifications skip speculation
+
+_pool = ThreadPoolExecutor(max_workers=SPECULATIVE_WORKERS, thread_name_prefix="speculation")
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+def _prefetch(query: str, search_queries: List[str]):
+    with span("speculation.prefetch", "speculation", queries=len(search_queries)) as s:
+        sources, seen = [], set()
+        for results in run_searches(queries=search_queries, max_results=MAX_RESULTS_PER_QUERY):
+            for source in results:
+                key = canonicalize_url(source["url"])
+                if key not in seen and classify_source_type(source["url"]) != "forum":
+                    seen.add(key)
+                    sources.append(source)
+
+        if not sources:
+            return
+
+        # Prefetch what the ranker would pick for the query as it stands
+        reference = " ".join([query, *search_queries])
+        selected = select_top_sources(sources, score_sources(sources, reference))
+
+        with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as fetch_pool:
+            fetched = sum(1 for text in fetch_pool.map(
+                lambda source: fetch_page_text(source["url"], MAX_PAGE_CHARS), selected
+            ) if text)
+
+        s.set(sources=len(sources), pages=fetched)
+        print(f"[DEBUG] Speculation: {len(search_queries)} searches, {fetched}/{len(selected)} pages prefetched")
+
+
+def _run(query: str, search_queries: List[str]):
+    global _pending
+
+    try:
+        _prefetch(query, search_queries)
+    except Exception as e:
+        print(f"[WARN] Speculative prefetch failed: {e}")
+    finally:
+        with _pending_lock:
+            _pending -= 1
+
+
+def speculate(query: str, search_queries: List[str]) -> bool:
+    """
+    Start prefetching for `query` in the background; never blocks the
+    caller. Returns False if speculation is off or the pool is saturated.
+    """
+    global _pending
+
+    if not SPECULATIVE_PREFETCH:
+        return False
+
+    with _pending_lock:
+        if _pending >= MAX_PENDING_SPECULATIONS:
+            print("[DEBUG] Speculation: pool saturated, skipping")
+            return False
+        _pending += 1
+
+    _pool.submit(_run, query, list(search_queries or [query]))
+    return True
@@ -1,6 +1,12 @@
+import asyncio
+
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
 
+from agents.verifier import conflicts_from, verified_facts_from
+from tools.streaming import stream_writer
+from tools.telemetry import llm_callbacks
+
 
 # =========================
 # System Prompt
@@ -83,25 +89,23 @@ Formatting Rules:
 synthesizer_llm = ChatGoogleGenerativeAI(
     model="gemini-2.5-flash",
     temperature=0.2
-)
+).with_config(callbacks=llm_callbacks)
 
 
 # =========================
 # Synthesizer Agent
 # =========================
 
-def synthesizer_agent(state):
-    verified_facts = state.get("verified_facts", [])
-    conflicts = state.get("conflicts", [])
+INSUFFICIENT_EVIDENCE_ANSWER = "Insufficient verified information to produce an executive summary."
+
+
+def _synthesis_messages(state):
+    verified_facts = list(verified_facts_from(state))
+    conflicts = list(conflicts_from(state))
     uncertain_facts = state.get("uncertain_facts", [])
     query = state.get("query", "")
     clarified_query = state.get("clarified_query", "")
 
-    if not verified_facts:
-        return {
-            "final_answer": "Insufficient verified information to produce an executive summary."
-        }
-
     human_message = HumanMessage(
         content=f"""
 
@@ -120,9 +124,46 @@ Produce the final executive synthesis now.
     )
 
     system_message = SystemMessage(content=SYSTEM_PROMPT)
+    return [system_message, human_message]
+
+
+def synthesizer_agent(state):
+    if not state.get("verified_fact_ids", []):
+        return {
+            "final_answer": INSUFFICIENT_EVIDENCE_ANSWER
+        }
+
+    # Stream tokens out as "custom" events so the UI can render the
+    # summary while it is being written; a no-op under plain invoke()
+    writer = stream_writer()
+    parts = []
+
+    for chunk in synthesizer_llm.stream(_synthesis_messages(state)):
+        if chunk.text:
+            parts.append(chunk.text)
+            writer({"type": "synthesis_token", "content": chunk.text})
+
+    return {
+        "final_answer": "".join(parts)
+    }
+
+
+async def asynthesizer_agent(state):
+    if not state.get("verified_fact_ids", []):
+        return {
+            "final_answer": INSUFFICIENT_EVIDENCE_ANSWER
+        }
+
+    writer = stream_writer()
+    parts = []
 
-    result = synthesizer_llm.invoke([system_message, human_message])
+    # Building the prompt resolves evidence IDs (blocking SQLite)
+    messages = await asyncio.to_thread(_synthesis_messages, state)
+    async for chunk in synthesizer_llm.astream(messages):
+        if chunk.text:
+            parts.append(chunk.text)
+            writer({"type": "synthesis_token", "content": chunk.text})
 
     return {
-        "final_answer": result.content
+        "final_answer": "".join(parts)
     }
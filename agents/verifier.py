@@ -1,7 +1,15 @@
+import asyncio
 from typing import List, Optional
+from urllib.parse import urlparse
 from pydantic import BaseModel, Field
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+
+from tools.claim_clustering import claims_agree, cluster_by_topic, group_near_identical, pack_clusters
+from tools.evidence_store import EvidenceView, intern, resolve
+from tools.telemetry import llm_callbacks
+from tools.verification_rules import EXCLUDED_SOURCE_TYPES, UNCERTAIN, VERIFIED, preclassify
 
 
 # =========================
@@ -42,12 +50,16 @@ class VerifierOutput(BaseModel):
 SYSTEM_PROMPT = """
 You are a FACT VERIFICATION AGENT.
 
-You will receive factual statements extracted from multiple sources.
-Each statement includes:
-- fact
+You will receive claims extracted from multiple sources.
+Near-identical statements have already been grouped into one CLAIM.
+Each claim lists every source that states it, with:
 - source_type (official, independent_blog, vendor_blog, forum)
-- url
 - title
+- url
+the other wordings sources used (VARIANT), and the number of independent
+sources (distinct websites) whose wording agrees with the claim exactly.
+A VARIANT that differs in negation, numbers or qualifiers may contradict
+the claim; judge it like any other conflicting source.
 
 Your task:
 - Verify facts conservatively.
@@ -88,23 +100,230 @@ IMPORTANT:
 verifier_llm = ChatGoogleGenerativeAI(
     model="gemini-2.5-flash",
     temperature=0.0
-).with_structured_output(VerifierOutput)
+).with_structured_output(VerifierOutput).with_config(callbacks=llm_callbacks)
+
+
+# =========================
+# Map-reduce settings
+# =========================
+
+# Evidence sets larger than this are verified in topic clusters, in parallel
+MAP_REDUCE_MIN_CLAIMS = 60
+MAX_CLAIMS_PER_BATCH = 40
+MAX_VERIFY_WORKERS = 4
+
+# Settle mechanically decidable claims in code (tools/verification_rules)
+RULE_BASED_PREVERIFICATION = True
+
+
+# =========================
+# Helpers
+# =========================
+
+def _domain(url: str) -> str:
+    domain = urlparse(url).netloc.lower()
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+def build_claim_groups(evidence_items):
+    """
+    Collapse near-identical facts into one claim carrying the combined
+    evidence of every source that states it. The first wording seen is
+    kept as the claim and the other distinct wordings as `variants`; a
+    source repeating the claim counts once, and only sources whose
+    wording agrees with the claim count as independent support.
+    """
+    groups = []
+
+    for members in group_near_identical([e["fact"] for e in evidence_items]):
+        claim = evidence_items[members[0]]["fact"]
+        sources = {}
+        variants = {}
+        agreeing_urls = set()
+
+        for i in members:
+            e = evidence_items[i]
+            sources.setdefault(e["url"], {
+                "url": e["url"],
+                "title": e["title"],
+                "source_type": e["source_type"],
+            })
+            if _claim_key(e["fact"]) != _claim_key(claim):
+                variants.setdefault(_claim_key(e["fact"]), e["fact"])
+            if claims_agree(claim, e["fact"]):
+                agreeing_urls.add(e["url"])
+
+        groups.append({
+            "claim": claim,
+            "variants": list(variants.values()),
+            "sources": list(sources.values()),
+            "independent_sources": len({_domain(url) for url in agreeing_urls}),
+        })
+
+    return groups
+
+
+def _format_claims(claim_groups) -> str:
+    return "\n".join(
+        f"- CLAIM: {g['claim']}\n"
+        f"  INDEPENDENT_SOURCES: {g['independent_sources']}\n"
+        + "".join(f"  - VARIANT: {v}\n" for v in g.get("variants", []))
+        + "".join(
+            f"  - SOURCE_TYPE: {s['source_type']} | TITLE: {s['title']} | URL: {s['url']}\n"
+            for s in g["sources"]
+        )
+        for g in claim_groups
+    )
+
+
+def _verify_messages(claim_groups):
+    return [
+        SystemMessage(content=SYSTEM_PROMPT),
+        HumanMessage(content=_format_claims(claim_groups)),
+    ]
+
+
+def _verify(claim_groups) -> VerifierOutput:
+    return verifier_llm.invoke(_verify_messages(claim_groups))
+
+
+async def _averify(claim_groups) -> VerifierOutput:
+    return await verifier_llm.ainvoke(_verify_messages(claim_groups))
+
+
+def _claim_key(text: str) -> str:
+    return " ".join(text.lower().split()).rstrip(".")
+
+
+def _merge_evidence(a: List[Evidence], b: List[Evidence]) -> List[Evidence]:
+    urls = {e.url for e in a}
+    return a + [e for e in b if e.url not in urls]
+
+
+def merge_verifier_outputs(outputs: List[VerifierOutput]) -> VerifierOutput:
+    """
+    Reduce step: combine partial results, collapsing repeated facts and
+    claims and pooling their evidence. A fact verified in one partial
+    result is not also reported as uncertain.
+    """
+    verified = {}
+    conflicts = {}
+    uncertain = {}
+
+    for output in outputs:
+        for fact in output.verified_facts:
+            key = _claim_key(fact.fact)
+            if key in verified:
+                kept = verified[key]
+                kept.evidence = _merge_evidence(kept.evidence, fact.evidence)
+                kept.confidence = max(kept.confidence, fact.confidence)
+            else:
+                verified[key] = fact.model_copy(deep=True)
+
+        for conflict in output.conflicts:
+            key = _claim_key(conflict.claim)
+            if key in conflicts:
+                kept = conflicts[key]
+                kept.conflicting_sources = _merge_evidence(kept.conflicting_sources, conflict.conflicting_sources)
+            else:
+                conflicts[key] = conflict.model_copy(deep=True)
+
+        for item in output.uncertain_facts:
+            uncertain.setdefault(_claim_key(item), item)
+
+    return VerifierOutput(
+        verified_facts=list(verified.values()),
+        conflicts=list(conflicts.values()),
+        uncertain_facts=[item for key, item in uncertain.items() if key not in verified],
+    )
+
+
+def _map_batches(claim_groups):
+    # Map: related claims stay together so cross-source agreement is visible
+    clusters = cluster_by_topic([g["claim"] for g in claim_groups])
+    batches = pack_clusters(clusters, MAX_CLAIMS_PER_BATCH)
+    print(f"[DEBUG] Verifier: {len(claim_groups)} claims → {len(clusters)} clusters in {len(batches)} batches")
+    return [[claim_groups[i] for i in batch] for batch in batches]
+
+
+def _failed_batch(groups, error) -> VerifierOutput:
+    # One failed batch must not sink the whole verification
+    print(f"[WARN] Verification batch of {len(groups)} claims failed ({error})")
+    return VerifierOutput(uncertain_facts=[g["claim"] for g in groups])
+
+
+def _verify_map_reduce(claim_groups) -> VerifierOutput:
+    def verify_batch(groups):
+        try:
+            return _verify(groups)
+        except Exception as e:
+            return _failed_batch(groups, e)
+
+    with ContextThreadPoolExecutor(max_workers=MAX_VERIFY_WORKERS) as pool:
+        partials = list(pool.map(verify_batch, _map_batches(claim_groups)))
+
+    # Reduce
+    return merge_verifier_outputs(partials)
+
+
+async def _averify_map_reduce(claim_groups) -> VerifierOutput:
+    slots = asyncio.Semaphore(MAX_VERIFY_WORKERS)
+
+    async def verify_batch(groups):
+        async with slots:
+            try:
+                return await _averify(groups)
+            except Exception as e:
+                return _failed_batch(groups, e)
+
+    partials = await asyncio.gather(*(verify_batch(groups) for groups in _map_batches(claim_groups)))
+    return merge_verifier_outputs(list(partials))
+
+
+def _preverify(claim_groups):
+    """
+    Split claim groups into those the deterministic rules settle and
+    those that still need the LLM.
+    """
+    decided = VerifierOutput()
+    remaining = []
+
+    for group, decision in zip(claim_groups, preclassify(claim_groups)):
+        if decision["verdict"] == VERIFIED:
+            decided.verified_facts.append(VerifiedFact(
+                fact=group["claim"],
+                confidence=decision["confidence"],
+                evidence=[
+                    Evidence(url=s["url"], title=s["title"])
+                    for s in group["sources"]
+                    if s["source_type"] not in EXCLUDED_SOURCE_TYPES
+                ],
+            ))
+        elif decision["verdict"] == UNCERTAIN:
+            decided.uncertain_facts.append(group["claim"])
+        else:
+            remaining.append(group)
+
+    print(
+        f"[DEBUG] Verifier rules: {len(decided.verified_facts)} verified, "
+        f"{len(decided.uncertain_facts)} uncertain, {len(remaining)} sent to LLM"
+    )
+    return decided, remaining
 
 
 # =========================
 # Verifier Agent
 # =========================
 
-def verifier_agent(state):
-    notes = state.get("notes", [])
+def _no_notes_update():
+    return {
+        "verified_fact_ids": [],
+        "conflict_ids": [],
+        "uncertain_facts": ["No extracted facts were available for verification."]
+    }
 
-    if not notes:
-        return {
-            "verified_facts": [],
-            "conflicts": [],
-            "uncertain_facts": ["No extracted facts were available for verification."]
-        }
 
+def _claim_groups_for(notes):
     # Flatten facts with metadata
     evidence_items = []
 
@@ -117,26 +336,67 @@ def verifier_agent(state):
                 "title": note.get("title", "Unknown source")
             })
 
-    # Build LLM input
-    human_message = HumanMessage(
-        content="\n".join(
-            f"- FACT: {e['fact']}\n"
-            f"  SOURCE_TYPE: {e['source_type']}\n"
-            f"  TITLE: {e['title']}\n"
-            f"  URL: {e['url']}\n"
-            for e in evidence_items
-        )
-    )
+    # Group repeated claims before building the prompt
+    claim_groups = build_claim_groups(evidence_items)
+    print(f"[DEBUG] Verifier: {len(evidence_items)} facts grouped into {len(claim_groups)} claims")
 
-    system_message = SystemMessage(content=SYSTEM_PROMPT)
+    # Decide what the rules can decide; only the rest goes to the LLM
+    if RULE_BASED_PREVERIFICATION:
+        return _preverify(claim_groups)
+    return VerifierOutput(), claim_groups
 
-    # Invoke verifier
-    result: VerifierOutput = verifier_llm.invoke(
-        [system_message, human_message]
-    )
 
+def _verifier_update(result: VerifierOutput):
     return {
-        "verified_facts": result.verified_facts,
-        "conflicts": result.conflicts,
+        "verified_fact_ids": intern("fact", [f.model_dump() for f in result.verified_facts]),
+        "conflict_ids": intern("conflict", [c.model_dump() for c in result.conflicts]),
         "uncertain_facts": result.uncertain_facts
     }
+
+
+def verified_facts_from(state) -> EvidenceView:
+    """The run's VerifiedFact objects, loaded on first access."""
+    return EvidenceView(state.get("verified_fact_ids"), VerifiedFact)
+
+
+def conflicts_from(state) -> EvidenceView:
+    """The run's Conflict objects, loaded on first access."""
+    return EvidenceView(state.get("conflict_ids"), Conflict)
+
+
+def verifier_agent(state):
+    notes = resolve(state.get("note_ids"))
+
+    if not notes:
+        return _no_notes_update()
+
+    decided, claim_groups = _claim_groups_for(notes)
+
+    # Invoke verifier
+    if not claim_groups:
+        result = decided
+    elif len(claim_groups) > MAP_REDUCE_MIN_CLAIMS:
+        result = merge_verifier_outputs([decided, _verify_map_reduce(claim_groups)])
+    else:
+        result = merge_verifier_outputs([decided, _verify(claim_groups)])
+
+    return _verifier_update(result)
+
+
+async def averifier_agent(state):
+    # The evidence store is blocking SQLite; keep it off the event loop
+    notes = await asyncio.to_thread(resolve, state.get("note_ids"))
+
+    if not notes:
+        return _no_notes_update()
+
+    decided, claim_groups = _claim_groups_for(notes)
+
+    if not claim_groups:
+        result = decided
+    elif len(claim_groups) > MAP_REDUCE_MIN_CLAIMS:
+        result = merge_verifier_outputs([decided, await _averify_map_reduce(claim_groups)])
+    else:
+        result = merge_verifier_outputs([decided, await _averify(claim_groups)])
+
+    return await asyncio.to_thread(_verifier_update, result)
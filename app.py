@@ -161,9 +161,14 @@
 #     # FINAL ANSWER
 #     st.subheader("📌 Executive Summary")
 #     st.markdown(final_state.get("final_answer", "No final answer generated."))
+import time
+import uuid
+
 import streamlit as st
 from langgraph.types import Command
+from agents.verifier import conflicts_from, verified_facts_from
 from graph.research_graph import build_graph
+from tools.evidence_store import resolve
 
 # ======================================================
 # Page setup
@@ -217,6 +222,55 @@ def render_uncertainty(item, idx):
     st.write(item)
     st.divider()
 
+
+def render_partial(node_name, output, elapsed):
+    """Show what a node produced as soon as it finishes."""
+    label = f"{node_name} · {elapsed:.1f}s"
+
+    if node_name == "planner" and output.get("plan"):
+        with st.expander(f"🧠 Research plan ({label})"):
+            st.markdown("**Objectives:**")
+            for objective in output["plan"].get("objectives", []):
+                st.markdown(f"- {objective}")
+            st.markdown("**Search queries:**")
+            for q in output.get("search_queries", []):
+                st.markdown(f"- `{q}`")
+
+    elif node_name in ("search", "dedup"):
+        st.caption(f"🔍 {len(output.get('source_ids', []))} sources after {label}")
+
+    elif node_name == "ranker":
+        with st.expander(f"📊 Sources selected for reading ({label})"):
+            for s in resolve(output.get("source_ids")):
+                title = s.get("title") or s["url"]
+                st.markdown(f"- [{title}]({s['url']}) · score `{s.get('rank_score', '-')}`")
+
+    elif node_name == "reader":
+        notes = resolve(output.get("note_ids"))
+        with st.expander(f"📖 Facts from {len(notes)} sources ({label})"):
+            for note in notes:
+                st.markdown(f"**[{note.get('title') or note['url']}]({note['url']})** · `{note['source_type']}`")
+                for fact in note["facts"]:
+                    st.markdown(f"- {fact}")
+
+    elif node_name == "coverage":
+        coverage = output.get("coverage") or {}
+        objectives = coverage.get("objectives", {})
+        covered = len(objectives) - len(coverage.get("uncovered", []))
+        if coverage.get("stop_reason"):
+            st.caption(f"🎯 {covered}/{len(objectives)} objectives covered, stopping ({coverage['stop_reason']}) · {label}")
+        else:
+            with st.expander(f"🎯 {covered}/{len(objectives)} objectives covered, searching again ({label})"):
+                for q in output.get("search_queries", []):
+                    st.markdown(f"- `{q}`")
+
+    elif node_name == "verifier":
+        st.caption(
+            f"✅ {len(output.get('verified_fact_ids', []))} verified, "
+            f"{len(output.get('conflict_ids', []))} conflicts, "
+            f"{len(output.get('uncertain_facts', []))} uncertain ({label})"
+        )
+
 # ======================================================
 # Session state
 # ======================================================
@@ -232,6 +286,11 @@ if "running" not in st.session_state:
 if "base_query" not in st.session_state:
     st.session_state.base_query = None
 
+# One checkpoint thread per research run, so concurrent sessions never
+# resume each other's clarifications
+if "thread_id" not in st.session_state:
+    st.session_state.thread_id = None
+
 # ======================================================
 # Progress UI
 # ======================================================
@@ -242,6 +301,18 @@ def set_progress(pct: float, text: str):
     progress_bar.progress(pct)
     step_text.info(text)
 
+# Progress reached when each node finishes, and what runs next
+NODE_STEPS = {
+    "planner": (0.15, "🔍 Search: gathering sources"),
+    "search": (0.30, "🧹 Dedup: collapsing duplicate URLs"),
+    "dedup": (0.33, "📊 Ranker: choosing sources to read"),
+    "ranker": (0.36, "📖 Reader: fetching pages"),
+    "reader": (0.70, "✅ Verifier: validating claims"),
+    "coverage": (0.72, "🎯 Coverage: deciding on follow-up searches"),
+    "verifier": (0.85, "🧾 Synthesizer: generating final answer"),
+    "synthesizer": (1.0, "🧾 Synthesizer: done"),
+}
+
 # ======================================================
 # Query input
 # ======================================================
@@ -252,6 +323,7 @@ if st.button("Run Research") and query:
     print("[DEBUG] Initial query:", query)
 
     st.session_state.base_query = query
+    st.session_state.thread_id = f"streamlit-{uuid.uuid4().hex}"
     st.session_state.graph_state = {
         "query": query,
         "clarification_round": 0,
@@ -273,12 +345,63 @@ if (
         print("\n[DEBUG] Invoking graph with state:")
         print(st.session_state.graph_state)
 
-        config = {"configurable": {"thread_id": "deep-research"}}
+        config = {"configurable": {"thread_id": st.session_state.thread_id}}
 
         # ---- Planner phase ----
         set_progress(0.15, "🧠 Planner: analyzing query")
 
-        result = graph.invoke(st.session_state.graph_state, config=config)
+        # Stream node updates (partial results, timings, final state) and
+        # custom events (reader progress, synthesizer tokens)
+        result = {}
+        node_timings = []
+        live_results = st.container()
+        summary_placeholder = None
+        streamed_answer = ""
+        last_tick = time.perf_counter()
+
+        for mode, chunk in graph.stream(
+            st.session_state.graph_state,
+            config=config,
+            stream_mode=["updates", "custom"],
+        ):
+            if mode == "custom" and chunk.get("type") == "reader_progress":
+                start, end = NODE_STEPS["ranker"][0], NODE_STEPS["reader"][0]
+                fetched = chunk["fetched"] / max(chunk["total"], 1)
+                extracted = chunk["extracted"] / max(chunk["submitted"], 1)
+                set_progress(
+                    start + (end - start) * fetched * (1 + extracted) / 2,
+                    f"📖 Reader: fetched {chunk['fetched']}/{chunk['total']} pages, "
+                    f"extracted {chunk['extracted']}/{chunk['submitted']} chunks",
+                )
+
+            elif mode == "custom" and chunk.get("type") == "synthesis_token":
+                if summary_placeholder is None:
+                    st.divider()
+                    st.subheader("📌 Executive Summary")
+                    summary_placeholder = st.empty()
+
+                streamed_answer += chunk["content"]
+                summary_placeholder.markdown(streamed_answer + "▌")
+
+            elif mode == "updates":
+                now = time.perf_counter()
+                elapsed, last_tick = now - last_tick, now
+
+                for node_name, node_output in chunk.items():
+                    if node_name == "__interrupt__":
+                        result["__interrupt__"] = node_output
+                        continue
+
+                    print(f"[DEBUG] Node {node_name} finished in {elapsed:.2f}s")
+                    node_timings.append({"node": node_name, "seconds": round(elapsed, 2)})
+
+                    if node_output:
+                        result.update(node_output)
+                        with live_results:
+                            render_partial(node_name, node_output, elapsed)
+
+                    if node_name in NODE_STEPS:
+                        set_progress(*NODE_STEPS[node_name])
 
         print("\n[DEBUG] Graph returned result:")
         print(result)
@@ -295,30 +418,35 @@ if (
 
         # ================= FINAL RESULT =================
         else:
-            # Deterministic progress (invoke is atomic)
-            set_progress(0.35, "🔍 Search: gathering sources")
-            set_progress(0.55, "📖 Reader: extracting facts")
-            set_progress(0.75, "✅ Verifier: validating claims")
-            set_progress(1.0, "🧾 Synthesizer: generating final answer")
             step_text.success("✅ Research complete")
 
-            st.divider()
+            with st.expander("⏱ Node timings"):
+                st.table(node_timings)
+
+            final_answer = result.get("final_answer", "No final answer generated.")
+            if summary_placeholder is not None:
+                summary_placeholder.markdown(final_answer)
+            else:
+                st.divider()
+                st.subheader("📌 Executive Summary")
+                st.markdown(final_answer)
 
-            st.subheader("📌 Executive Summary")
-            st.markdown(result.get("final_answer", "No final answer generated."))
+            # Evidence arrives as IDs; records load only when rendered
+            verified_facts = verified_facts_from(result)
+            conflicts = conflicts_from(result)
 
             st.subheader("✅ Verified Facts")
-            if result.get("verified_facts"):
+            if verified_facts:
                 with st.expander("View Verified Facts"):
-                    for i, fact in enumerate(result["verified_facts"]):
+                    for i, fact in enumerate(verified_facts):
                         render_verified_fact(fact, i)
             else:
                 st.info("No verified facts found.")
 
             st.subheader("⚠️ Conflicts")
-            if result.get("conflicts"):
+            if conflicts:
                 with st.expander("View Conflicts"):
-                    for i, conflict in enumerate(result["conflicts"]):
+                    for i, conflict in enumerate(conflicts):
                         render_conflict(conflict, i)
             else:
                 st.success("No conflicts detected.")
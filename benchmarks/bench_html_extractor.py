@@ -0,0 +1,76 @@
+"""
+Compare HTML-to-text engines on the saved pages in fixtures/html.
+
+For every engine this reports parse time per page, output size, whether
+the page's key sentence survives the reader's 6000-char budget, and how
+many boilerplate markers (menus, footers, cookie banners, ...) still eat
+into that budget. "legacy" is the original BeautifulSoup path from
+fetch_page_text, kept here as the baseline.
+
+Run from the repo root:
+    python -m benchmarks.bench_html_extractor [--iterations N]
+"""
+import argparse
+import json
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+from tools.html_extractor import ENGINES, extract_text
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "html")
+MAX_CHARS = 6000
+
+
+def legacy_extract(html: str) -> str:
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+    return soup.get_text(separator=" ", strip=True)
+
+
+def load_fixtures():
+    with open(os.path.join(FIXTURE_DIR, "expected.json")) as f:
+        expected = json.load(f)
+
+    fixtures = {}
+    for name in sorted(expected):
+        with open(os.path.join(FIXTURE_DIR, f"{name}.html"), encoding="utf-8") as f:
+            fixtures[name] = f.read()
+    return fixtures, expected
+
+
+def run(iterations: int):
+    fixtures, expected = load_fixtures()
+
+    engines = {"legacy": legacy_extract}
+    for name in ENGINES:
+        engines[name] = lambda html, name=name: extract_text(html, engine=name)
+
+    print(f"{'engine':<12}{'page':<16}{'ms/page':>10}{'chars':>10}{'key fact':>10}{'boilerplate':>13}")
+
+    for engine_name, extract in engines.items():
+        total_ms = 0.0
+
+        for page, html in fixtures.items():
+            start = time.perf_counter()
+            for _ in range(iterations):
+                text = extract(html)
+            ms = (time.perf_counter() - start) * 1000 / iterations
+            total_ms += ms
+
+            budget = text[:MAX_CHARS]
+            found = all(s in budget for s in expected[page]["content"])
+            noise = sum(marker in budget for marker in expected[page]["boilerplate"])
+
+            print(f"{engine_name:<12}{page:<16}{ms:>10.2f}{len(text):>10}{'yes' if found else 'no':>10}{noise:>13}")
+
+        print(f"{engine_name:<12}{'TOTAL':<16}{total_ms:>10.2f}")
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20)
+    run(parser.parse_args().iterations)
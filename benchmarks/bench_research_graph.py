@@ -0,0 +1,221 @@
+"""
+End-to-end benchmark of the research graph, fully offline.
+
+Every Tavily search, page fetch and LLM call is replayed from a fixture
+recorded from a real run (see benchmarks/replay.py) after a synthetic,
+seeded latency. For each concurrency level this runs the graph N times
+on a thread pool (or as coroutines with --async) and reports wall time, run latency (p50/p95), research
+runs per minute, process CPU time, peak memory and per-node wall time
+(from the telemetry node spans).
+
+Each level starts with empty caches in a fresh directory, so runs within
+a level share caches the way concurrent users would. --warm fills the
+caches with one untimed run first.
+
+Run from the repo root:
+    python -m benchmarks.bench_research_graph [--concurrency 1,2,4,8] [--runs 8]
+    python -m benchmarks.bench_research_graph --latency-scale 0   # pure CPU cost
+    python -m benchmarks.bench_research_graph --json results.json # for regression diffs
+
+Record a new fixture (needs the real API keys and network):
+    python -m benchmarks.bench_research_graph --record "your query" --fixtures path.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# The agents build their clients at import time; replayed runs never use
+# these keys, and caches/checkpoints must not touch the repo's .cache/.state
+if "--record" not in sys.argv:
+    for _key in ("OPENAI_API_KEY", "GOOGLE_API_KEY", "TAVILY_API_KEY", "OPENROUTER_API_KEY"):
+        os.environ.setdefault(_key, "replay")
+os.environ.setdefault("RESEARCH_CACHE_DIR", tempfile.mkdtemp(prefix="research-bench-"))
+os.environ.setdefault("RESEARCH_STATE_DIR", os.environ["RESEARCH_CACHE_DIR"])
+
+import tools.evidence_store as evidence_store
+import tools.extraction_cache as extraction_cache
+import tools.kv_cache as kv_cache
+import tools.page_cache as page_cache
+import tools.plan_cache as plan_cache
+import tools.search_cache as search_cache
+from benchmarks import replay
+from graph.research_graph import build_graph
+from tools.telemetry import collector
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "research", "llm_cost_comparison.json")
+NODES = ("planner", "search", "dedup", "ranker", "reader", "coverage", "verifier", "synthesizer")
+
+
+def reset_caches(cache_dir: str):
+    """Point every cache at an empty directory."""
+    os.makedirs(cache_dir, exist_ok=True)
+    kv_cache.CACHE_DIR = cache_dir
+    page_cache._page_cache = page_cache.PageCache(path=os.path.join(cache_dir, "pages.sqlite"))
+    search_cache._search_cache = None
+    extraction_cache._extraction_cache = None
+    plan_cache._plan_cache = None
+    evidence_store.STATE_DIR = cache_dir
+    evidence_store._evidence_store = None
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def one_run(graph, query: str, thread_id: str) -> float:
+    start = time.perf_counter()
+    result = graph.invoke({"query": query}, config={"configurable": {"thread_id": thread_id}})
+    if not result.get("final_answer"):
+        raise RuntimeError(f"Run {thread_id} ended without an answer")
+    return time.perf_counter() - start
+
+
+async def aone_run(graph, query: str, thread_id: str) -> float:
+    start = time.perf_counter()
+    result = await graph.ainvoke({"query": query}, config={"configurable": {"thread_id": thread_id}})
+    if not result.get("final_answer"):
+        raise RuntimeError(f"Run {thread_id} ended without an answer")
+    return time.perf_counter() - start
+
+
+async def arun_all(graph, query: str, concurrency: int, runs: int):
+    slots = asyncio.Semaphore(concurrency)
+
+    async def bounded(i: int):
+        async with slots:
+            return await aone_run(graph, query, f"bench-async-{concurrency}-{i}")
+
+    return await asyncio.gather(*(bounded(i) for i in range(runs)))
+
+
+def run_level(graph, query: str, concurrency: int, runs: int, cache_dir: str, warm: bool,
+              trace_memory: bool, use_async: bool = False):
+    reset_caches(cache_dir)
+    if warm:
+        one_run(graph, query, f"warmup-{concurrency}")
+    collector.clear()
+
+    if trace_memory:
+        tracemalloc.start()
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+
+    if use_async:
+        latencies = asyncio.run(arun_all(graph, query, concurrency, runs))
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(
+                lambda i: one_run(graph, query, f"bench-{concurrency}-{i}"),
+                range(runs),
+            ))
+
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    if trace_memory:
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    else:
+        # High-water mark of the whole process so far (KiB on Linux)
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    node_times = defaultdict(list)
+    for s in collector.spans():
+        if s.kind == "node":
+            node_times[s.name].append(s.duration)
+
+    return {
+        "concurrency": concurrency,
+        "runs": runs,
+        "wall_seconds": wall,
+        "run_p50_seconds": statistics.median(latencies),
+        "run_p95_seconds": percentile(latencies, 0.95),
+        "runs_per_minute": runs / wall * 60,
+        "cpu_seconds": cpu,
+        "cpu_percent": cpu / wall * 100,
+        "peak_memory_mb": peak_mb,
+        "nodes": {
+            name: {"mean_seconds": statistics.mean(times), "p95_seconds": percentile(times, 0.95)}
+            for name, times in node_times.items()
+        },
+    }
+
+
+def print_report(results):
+    print(f"{'conc':>5}{'runs':>6}{'wall s':>9}{'p50 s':>8}{'p95 s':>8}{'runs/min':>10}"
+          f"{'cpu s':>8}{'cpu %':>7}{'peak MB':>9}")
+    for r in results:
+        print(f"{r['concurrency']:>5}{r['runs']:>6}{r['wall_seconds']:>9.2f}{r['run_p50_seconds']:>8.2f}"
+              f"{r['run_p95_seconds']:>8.2f}{r['runs_per_minute']:>10.1f}{r['cpu_seconds']:>8.2f}"
+              f"{r['cpu_percent']:>7.0f}{r['peak_memory_mb']:>9.1f}")
+
+    print("\nPer-node mean wall time (s)")
+    print(f"{'node':<13}" + "".join(f"{'c=' + str(r['concurrency']):>9}" for r in results))
+    for node in NODES:
+        row = [r["nodes"].get(node, {}).get("mean_seconds") for r in results]
+        print(f"{node:<13}" + "".join(f"{v:>9.3f}" if v is not None else f"{'-':>9}" for v in row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES)
+    parser.add_argument("--concurrency", default="1,2,4,8", help="comma-separated levels")
+    parser.add_argument("--runs", type=int, default=8, help="research runs per level")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiplier for all synthetic latency")
+    parser.add_argument("--search-latency", type=float)
+    parser.add_argument("--fetch-latency", type=float)
+    parser.add_argument("--llm-latency", type=float)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="run the graph with ainvoke() on one event loop instead of a thread per run")
+    parser.add_argument("--iterative", action="store_true",
+                        help="build the graph in iterative (coverage-driven) mode")
+    parser.add_argument("--warm", action="store_true", help="fill caches with one untimed run per level")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="per-level Python heap peak instead of process RSS (slows the run)")
+    parser.add_argument("--json", help="also write results to this file")
+    parser.add_argument("--record", metavar="QUERY", help="record --fixtures from a live run instead")
+    args = parser.parse_args()
+
+    if args.record:
+        replay.record(args.record, args.fixtures)
+        return
+
+    fixtures = replay.load_fixtures(args.fixtures)
+    overrides = {
+        kind: value for kind, value in
+        (("search", args.search_latency), ("fetch", args.fetch_latency), ("llm", args.llm_latency))
+        if value is not None
+    }
+    replay.install(fixtures, replay.Latency(args.latency_scale, args.seed, overrides))
+
+    graph = build_graph(iterative=args.iterative)
+    cache_root = os.environ["RESEARCH_CACHE_DIR"]
+    results = []
+    for level in [int(c) for c in args.concurrency.split(",")]:
+        results.append(run_level(
+            graph, fixtures["query"], level, args.runs,
+            cache_dir=os.path.join(cache_root, f"c{level}-{time.time_ns()}"),
+            warm=args.warm,
+            trace_memory=args.tracemalloc,
+            use_async=args.use_async,
+        ))
+
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"fixtures": os.path.basename(args.fixtures), "args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+Record / replay of every external dependency of the research graph.
+
+A fixture file holds what Tavily, the web and each LLM returned for one
+real research run:
+
+    {
+      "query": "...",
+      "search": {"<search_cache_key>": <tavily response>},
+      "pages":  {"<url>": {"status": 200, "headers": {...}, "body": "<html>"}},
+      "llm":    {"<role>": {"<prompt key>": <structured output | [stream chunks]>}}
+    }
+
+install() swaps the Tavily clients, the reader's HTTP fetch (sync and
+async) and the LLM objects for replayers that sleep for a synthetic latency and return the
+recorded response. Everything in between (caches, HTML extraction,
+chunking, ranking, verification rules, the graph itself) runs for real.
+Prompts that were not recorded (e.g. after a chunking change) fall back
+to a recorded response picked by hash, so replays stay deterministic.
+
+record() wraps the same seams around the live clients and writes a
+fixture file from one run.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from langchain_core.messages import AIMessageChunk
+
+import agents.planner as planner
+import agents.reader as reader
+import agents.synthesizer as synthesizer
+import agents.verifier as verifier
+import tools.web_search as web_search
+from tools.http_client import FetchResponse
+from tools.search_cache import search_cache_key
+from tools.telemetry import span
+
+# Synthetic latency (seconds) per call, before --latency-scale
+DEFAULT_LATENCY = {
+    "search": 0.6,
+    "fetch": 0.4,
+    "llm": 1.0,            # time to first token / structured response
+    "llm_per_token": 0.004,  # added per output token
+    "token": 0.0,            # streamed chunks: per-token time only
+}
+LATENCY_JITTER = 0.25      # +/- fraction, drawn from a seeded RNG
+
+# role -> (module, attribute, output model or None for streaming)
+LLM_SEAMS = {
+    "ambiguity": (planner, "ambiguity_llm", planner.AmbiguityCheckOutput),
+    "clarification": (planner, "clarification_llm", planner.ClarificationOutput),
+    "planner": (planner, "planner_llm", planner.PlannerOutput),
+    "fused_planner": (planner, "fused_planner_llm", planner.FusedPlannerOutput),
+    "reader": (reader, "reader_llm", reader.ExtractedFacts),
+    "batch_reader": (reader, "batch_reader_llm", reader.BatchExtractedFacts),
+    "verifier": (verifier, "verifier_llm", verifier.VerifierOutput),
+    "synthesizer": (synthesizer, "synthesizer_llm", None),
+}
+
+
+def _text_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:24]
+
+
+def prompt_key(messages) -> str:
+    # The human message carries everything that varies between calls
+    return _text_key(messages[-1].content)
+
+
+def _pick(recorded: Dict[str, Any], key: str):
+    if key in recorded:
+        return recorded[key]
+    keys = sorted(recorded)
+    if not keys:
+        return None
+    return recorded[keys[int(hashlib.sha256(key.encode()).hexdigest(), 16) % len(keys)]]
+
+
+def _output_tokens(value) -> int:
+    return len(json.dumps(value)) // 4
+
+
+# =========================
+# Latency
+# =========================
+
+class Latency:
+    def __init__(self, scale: float = 1.0, seed: int = 0, overrides: Optional[Dict[str, float]] = None):
+        self.scale = scale
+        self.values = {**DEFAULT_LATENCY, **(overrides or {})}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def seconds(self, kind: str, output_tokens: int = 0) -> float:
+        seconds = self.values[kind] + self.values["llm_per_token"] * output_tokens
+        with self._lock:
+            seconds *= 1 + self._rng.uniform(-LATENCY_JITTER, LATENCY_JITTER)
+        return max(0.0, seconds * self.scale)
+
+    def sleep(self, kind: str, output_tokens: int = 0):
+        time.sleep(self.seconds(kind, output_tokens))
+
+    async def asleep(self, kind: str, output_tokens: int = 0):
+        await asyncio.sleep(self.seconds(kind, output_tokens))
+
+
+# =========================
+# Replayers
+# =========================
+
+class ReplayTavily:
+    def __init__(self, fixtures, latency: Latency):
+        self.recorded = fixtures["search"]
+        self.latency = latency
+
+    def search(self, query: str, max_results: int = 5, **kwargs):
+        self.latency.sleep("search")
+        return _pick(self.recorded, search_cache_key(query, max_results))
+
+
+class ReplayAsyncTavily(ReplayTavily):
+    async def search(self, query: str, max_results: int = 5, **kwargs):
+        await self.latency.asleep("search")
+        return _pick(self.recorded, search_cache_key(query, max_results))
+
+
+class ReplayFetch:
+    def __init__(self, fixtures, latency: Latency):
+        self.recorded = fixtures["pages"]
+        self.latency = latency
+
+    def __call__(self, url: str, headers=None, **kwargs) -> FetchResponse:
+        self.latency.sleep("fetch")
+        return self._response(url)
+
+    def _response(self, url: str) -> FetchResponse:
+        page = self.recorded.get(url)
+        if page is None:
+            return FetchResponse(url=url, status_code=404)
+        return FetchResponse(
+            url=url,
+            status_code=page["status"],
+            headers=page.get("headers", {}),
+            content=page["body"].encode("utf-8"),
+            encoding="utf-8",
+        )
+
+
+class ReplayAsyncFetch(ReplayFetch):
+    async def __call__(self, url: str, headers=None, **kwargs) -> FetchResponse:
+        await self.latency.asleep("fetch")
+        return self._response(url)
+
+
+class ReplayLLM:
+    def __init__(self, role: str, model, fixtures, latency: Latency):
+        self.role = role
+        self.model = model
+        self.fixtures = fixtures
+        self.recorded = fixtures["llm"].get(role, {})
+        self.latency = latency
+
+    def _output(self, messages):
+        value = _pick(self.recorded, prompt_key(messages))
+        if self.role == "batch_reader":
+            value = self._batch_output(messages, value)
+        if self.role == "fused_planner" and value is None:
+            value = self._fused_output(messages)
+        return value
+
+    def _fused_output(self, messages):
+        # Fixtures recorded before the fused planner: combine what the
+        # separate ambiguity / clarification / planner calls returned
+        key = prompt_key(messages)
+        recorded = self.fixtures["llm"]
+        ambiguity = _pick(recorded["ambiguity"], key)
+        clarification = _pick(recorded.get("clarification", {}), key) or {"questions": []}
+        plan = _pick(recorded["planner"], key)
+        return {
+            **ambiguity,
+            "questions": clarification["questions"] if ambiguity["status"] == "AMBIGUOUS" else [],
+            **plan,
+        }
+
+    def _batch_output(self, messages, value):
+        # Answer for exactly the documents in this prompt, reusing the
+        # single-document recordings when the batch itself wasn't recorded
+        documents = re.findall(r'<document id="(\d+)">\n(.*?)\n</document>', messages[-1].content, re.S)
+        if value and sorted(d["document_id"] for d in value["documents"]) == sorted(int(i) for i, _ in documents):
+            return value
+        single = self.fixtures["llm"]["reader"]
+        return {
+            "documents": [
+                {"document_id": int(i), "facts": _pick(single, _text_key(text))["facts"]}
+                for i, text in documents
+            ]
+        }
+
+    def invoke(self, messages, *args, **kwargs):
+        value = self._output(messages)
+        with span("llm.replay", "llm", model=f"replay:{self.role}"):
+            self.latency.sleep("llm", _output_tokens(value))
+        return self.model.model_validate(value)
+
+    def stream(self, messages, *args, **kwargs):
+        chunks = self._output(messages)
+        with span("llm.replay", "llm", model=f"replay:{self.role}"):
+            self.latency.sleep("llm")
+        for chunk in chunks:
+            self.latency.sleep("token", max(1, len(chunk) // 4))
+            yield AIMessageChunk(content=chunk)
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        value = self._output(messages)
+        with span("llm.replay", "llm", model=f"replay:{self.role}"):
+            await self.latency.asleep("llm", _output_tokens(value))
+        return self.model.model_validate(value)
+
+    async def astream(self, messages, *args, **kwargs):
+        chunks = self._output(messages)
+        with span("llm.replay", "llm", model=f"replay:{self.role}"):
+            await self.latency.asleep("llm")
+        for chunk in chunks:
+            await self.latency.asleep("token", max(1, len(chunk) // 4))
+            yield AIMessageChunk(content=chunk)
+
+
+# =========================
+# Recorders
+# =========================
+
+class RecordingTavily:
+    def __init__(self, client, fixtures):
+        self.client = client
+        self.fixtures = fixtures
+
+    def search(self, query: str, max_results: int = 5, **kwargs):
+        response = self.client.search(query=query, max_results=max_results, **kwargs)
+        self.fixtures["search"][search_cache_key(query, max_results)] = response
+        return response
+
+
+class RecordingFetch:
+    def __init__(self, fetch, fixtures):
+        self.fetch = fetch
+        self.fixtures = fixtures
+
+    def __call__(self, url: str, headers=None, **kwargs) -> FetchResponse:
+        response = self.fetch(url, headers=headers, **kwargs)
+        if response.status_code != 304:
+            self.fixtures["pages"][url] = {
+                "status": response.status_code,
+                "headers": {
+                    k: v for k, v in response.headers.items()
+                    if k.lower() in ("content-type", "etag", "last-modified")
+                },
+                "body": response.text,
+            }
+        return response
+
+
+class RecordingLLM:
+    def __init__(self, role: str, llm, fixtures):
+        self.role = role
+        self.llm = llm
+        self.recorded = fixtures["llm"].setdefault(role, {})
+
+    def invoke(self, messages, *args, **kwargs):
+        output = self.llm.invoke(messages, *args, **kwargs)
+        self.recorded[prompt_key(messages)] = output.model_dump()
+        return output
+
+    def stream(self, messages, *args, **kwargs):
+        chunks = []
+        for chunk in self.llm.stream(messages, *args, **kwargs):
+            chunks.append(chunk.content)
+            yield chunk
+        self.recorded[prompt_key(messages)] = chunks
+
+
+def record(query: str, path: str):
+    """Run the graph once against the live services and save what they returned."""
+    from graph.research_graph import build_graph
+
+    fixtures = {"query": query, "search": {}, "pages": {}, "llm": {role: {} for role in LLM_SEAMS}}
+    web_search.tavily = RecordingTavily(web_search.tavily, fixtures)
+    reader.fetch = RecordingFetch(reader.fetch, fixtures)
+    for role, (module, attribute, _) in LLM_SEAMS.items():
+        setattr(module, attribute, RecordingLLM(role, getattr(module, attribute), fixtures))
+
+    result = build_graph().invoke(
+        {"query": query},
+        config={"configurable": {"thread_id": "benchmark-record"}},
+    )
+    if "__interrupt__" in result:
+        print("[WARN] Query needs clarification; the recording stops at the planner. Use a more specific query.")
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(fixtures, f, indent=1)
+    print(f"[DEBUG] Recorded {len(fixtures['search'])} searches, {len(fixtures['pages'])} pages, "
+          f"{sum(len(v) for v in fixtures['llm'].values())} LLM calls to {path}")
+
+
+# =========================
+# Replay
+# =========================
+
+def load_fixtures(path: str):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def install(fixtures, latency: Latency):
+    """Point every external call of the graph at the recorded fixtures."""
+    web_search.tavily = ReplayTavily(fixtures, latency)
+    web_search.async_tavily = ReplayAsyncTavily(fixtures, latency)
+    reader.fetch = ReplayFetch(fixtures, latency)
+    reader.afetch = ReplayAsyncFetch(fixtures, latency)
+    for role, (module, attribute, model) in LLM_SEAMS.items():
+        setattr(module, attribute, ReplayLLM(role, model, fixtures, latency))
@@ -0,0 +1,626 @@
+"""
+Durable checkpointer for the research graph.
+
+DurableSaver implements LangGraph's BaseCheckpointSaver on top of a small
+storage interface with two implementations:
+
+- SQLiteCheckpointStore: one WAL-mode SQLite file. Several worker
+  processes on one host can share it, and it survives restarts.
+- KVCheckpointStore: any key-value server with get/set/delete/prefix
+  scan (Redis, etcd, ...). SQLiteKVClient is the local stand-in; a real
+  server client only has to provide the same four methods. Per-thread
+  lookups go through key indexes stored next to the data; prefix scan
+  is only used to enumerate threads (GC and unscoped listing).
+
+Channel values are stored once per version, not once per checkpoint, so
+a step that only touches `notes` doesn't rewrite `sources`. Payloads use
+LangGraph's msgpack serializer and are zlib-compressed above a size
+threshold. Threads expire on a TTL: finished threads quickly, idle ones
+(e.g. a clarification nobody answered) after a longer grace period.
+Any worker pointed at the same store can resume any thread_id.
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import ormsgpack
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+CHECKPOINT_BACKEND = os.getenv("CHECKPOINT_BACKEND", "sqlite")  # sqlite | kv | memory
+STATE_DIR = os.getenv("RESEARCH_STATE_DIR", ".state")
+
+FINISHED_THREAD_TTL_SECONDS = 24 * 60 * 60
+IDLE_THREAD_TTL_SECONDS = 7 * 24 * 60 * 60
+GC_INTERVAL_SECONDS = 10 * 60
+
+INDEX_CHUNK_KEYS = 64  # keys per KV index record; appending rewrites one record at most
+
+COMPRESS_MIN_BYTES = 1024
+COMPRESSION_LEVEL = 6
+
+Typed = Tuple[str, bytes]
+
+
+# =========================
+# Serialization
+# =========================
+
+class CompactSerializer:
+    """LangGraph's msgpack serializer, zlib-compressing large payloads."""
+
+    def __init__(self, serde=None):
+        self.serde = serde or JsonPlusSerializer()
+
+    def dumps_typed(self, obj: Any) -> Typed:
+        type_, data = self.serde.dumps_typed(obj)
+        if len(data) >= COMPRESS_MIN_BYTES:
+            return f"z:{type_}", zlib.compress(data, COMPRESSION_LEVEL)
+        return type_, data
+
+    def loads_typed(self, typed: Typed) -> Any:
+        type_, data = typed
+        if type_.startswith("z:"):
+            return self.serde.loads_typed((type_[2:], zlib.decompress(data)))
+        return self.serde.loads_typed((type_, data))
+
+
+# =========================
+# Stores
+# =========================
+
+class SQLiteCheckpointStore:
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                thread_id TEXT, checkpoint_ns TEXT, checkpoint_id TEXT, parent_id TEXT,
+                type TEXT, checkpoint BLOB, metadata_type TEXT, metadata BLOB,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+            );
+            CREATE TABLE IF NOT EXISTS blobs (
+                thread_id TEXT, checkpoint_ns TEXT, channel TEXT, version TEXT,
+                type TEXT, value BLOB,
+                PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+            );
+            CREATE TABLE IF NOT EXISTS writes (
+                thread_id TEXT, checkpoint_ns TEXT, checkpoint_id TEXT, task_id TEXT, idx INTEGER,
+                channel TEXT, type TEXT, value BLOB, task_path TEXT,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+            );
+            CREATE TABLE IF NOT EXISTS threads (
+                thread_id TEXT PRIMARY KEY, updated_at REAL, finished_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS threads_updated_at ON threads (updated_at);
+            """
+        )
+        self._conn.commit()
+
+    def _touch(self, thread_id: str):
+        self._conn.execute(
+            "INSERT INTO threads VALUES (?, ?, NULL) "
+            "ON CONFLICT(thread_id) DO UPDATE SET updated_at = excluded.updated_at, finished_at = NULL",
+            (thread_id, time.time()),
+        )
+
+    def put_checkpoint(self, thread_id, ns, checkpoint_id, parent_id, checkpoint: Typed, metadata: Typed, blobs):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)",
+                [(thread_id, ns, channel, str(version), t, v) for channel, version, (t, v) in blobs],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, ns, checkpoint_id, parent_id, *checkpoint, *metadata),
+            )
+            self._touch(thread_id)
+            self._conn.commit()
+
+    def list_checkpoints(self, thread_id=None, ns=None, checkpoint_id=None, before_id=None, limit=None):
+        query = "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_id, type, checkpoint, metadata_type, metadata FROM checkpoints"
+        where, params = [], []
+        for column, op, value in (
+            ("thread_id", "=", thread_id), ("checkpoint_ns", "=", ns),
+            ("checkpoint_id", "=", checkpoint_id), ("checkpoint_id", "<", before_id),
+        ):
+            if value is not None:
+                where.append(f"{column} {op} ?")
+                params.append(value)
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY checkpoint_id DESC"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        for tid, ns_, cid, parent, t, cp, mt, md in rows:
+            yield tid, ns_, cid, parent, (t, cp), (mt, md)
+
+    def get_blobs(self, thread_id, ns, versions: ChannelVersions) -> Dict[str, Typed]:
+        if not versions:
+            return {}
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT channel, type, value FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND "
+                f"({' OR '.join(['(channel = ? AND version = ?)'] * len(versions))})",
+                [thread_id, ns] + [x for channel, version in versions.items() for x in (channel, str(version))],
+            ).fetchall()
+        return {channel: (t, v) for channel, t, v in rows}
+
+    def put_writes(self, thread_id, ns, checkpoint_id, rows):
+        with self._lock:
+            for task_id, idx, channel, (t, v), task_path in rows:
+                # Special writes (negative idx) replace; regular writes are idempotent
+                verb = "INSERT OR REPLACE" if idx < 0 else "INSERT OR IGNORE"
+                self._conn.execute(
+                    f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (thread_id, ns, checkpoint_id, task_id, idx, channel, t, v, task_path),
+                )
+            self._conn.commit()
+
+    def get_writes(self, thread_id, ns, checkpoint_id) -> List[Tuple[str, str, Typed]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task_id, channel, type, value FROM writes "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+                (thread_id, ns, checkpoint_id),
+            ).fetchall()
+        return [(task_id, channel, (t, v)) for task_id, channel, t, v in rows]
+
+    def delete_thread(self, thread_id: str):
+        with self._lock:
+            for table in ("checkpoints", "blobs", "writes", "threads"):
+                self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+            self._conn.commit()
+
+    def mark_finished(self, thread_id: str):
+        with self._lock:
+            self._conn.execute("UPDATE threads SET finished_at = ? WHERE thread_id = ?", (time.time(), thread_id))
+            self._conn.commit()
+
+    def expired_threads(self, finished_before: float, idle_before: float) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT thread_id FROM threads WHERE finished_at < ? OR updated_at < ?",
+                (finished_before, idle_before),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+
+class SQLiteKVClient:
+    """
+    Local key-value store (one SQLite table) standing in for a networked
+    KV server; a Redis client wrapper with the same methods drops in.
+    Every write commits, so the store stays readable after a crash.
+    """
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB NOT NULL) WITHOUT ROWID")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._conn.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return bytes(row[0]) if row else None
+
+    def set(self, key: str, value: bytes):
+        self._conn.execute("INSERT OR REPLACE INTO kv VALUES (?, ?)", (key, value))
+        self._conn.commit()
+
+    def delete(self, key: str):
+        self._conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+        self._conn.commit()
+
+    def scan(self, prefix: str) -> Iterator[str]:
+        # Range over the primary key: touches only the matching keys
+        end = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        rows = self._conn.execute("SELECT key FROM kv WHERE key >= ? AND key < ? ORDER BY key", (prefix, end))
+        for (key,) in rows.fetchall():
+            yield key
+
+    def close(self):
+        self._conn.close()
+
+
+class KVCheckpointStore:
+    """
+    Checkpoint storage over a plain key-value client. Keys:
+        cp/<thread>/<ns>/<checkpoint id>            checkpoint + metadata
+        blob/<thread>/<ns>/<channel>/<version>      channel value
+        w/<thread>/<ns>/<checkpoint id>/<task>/<idx> pending write
+        thread/<thread>                             updated_at / finished_at
+        keys/<thread>                               number of index records
+        keys/<thread>/<n>                           index record: up to INDEX_CHUNK_KEYS keys
+
+    The index is append-only, so a put rewrites at most one small record
+    however long the thread gets. Every client call, reads included,
+    holds `_lock`: the async saver runs storage calls in worker threads.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _pack(value) -> bytes:
+        return ormsgpack.packb(value)
+
+    @staticmethod
+    def _unpack(raw: bytes):
+        return ormsgpack.unpackb(raw)
+
+    # ---------- index (caller holds _lock) ----------
+
+    def _index_records(self, thread_id: str) -> int:
+        raw = self.client.get(f"keys/{thread_id}")
+        return self._unpack(raw) if raw else 0
+
+    def _thread_keys(self, thread_id: str) -> List[str]:
+        keys = []
+        for n in range(self._index_records(thread_id)):
+            raw = self.client.get(f"keys/{thread_id}/{n}")
+            if raw:
+                keys.extend(self._unpack(raw))
+        return list(dict.fromkeys(keys))
+
+    def _index(self, thread_id: str, new_keys: List[str]):
+        if not new_keys:
+            return
+        records = self._index_records(thread_id)
+
+        # Top up the last record before starting new ones
+        n, current = records, []
+        if records:
+            raw = self.client.get(f"keys/{thread_id}/{records - 1}")
+            last = self._unpack(raw) if raw else []
+            if len(last) < INDEX_CHUNK_KEYS:
+                n, current = records - 1, last
+
+        pending = list(new_keys)
+        while pending:
+            room = INDEX_CHUNK_KEYS - len(current)
+            current, pending = current + pending[:room], pending[room:]
+            self.client.set(f"keys/{thread_id}/{n}", self._pack(current))
+            n, current = n + 1, []
+
+        if n != records:
+            self.client.set(f"keys/{thread_id}", self._pack(n))
+
+    def _thread_ids(self) -> List[str]:
+        return [key.split("/", 1)[1] for key in self.client.scan("thread/")]
+
+    def _touch(self, thread_id: str, finished: bool = False):
+        key = f"thread/{thread_id}"
+        now = time.time()
+        if finished:
+            raw = self.client.get(key)
+            info = self._unpack(raw) if raw else {"updated_at": now}
+            info["finished_at"] = now
+        else:
+            info = {"updated_at": now, "finished_at": None}
+        self.client.set(key, self._pack(info))
+
+    # ---------- store API ----------
+
+    def put_checkpoint(self, thread_id, ns, checkpoint_id, parent_id, checkpoint: Typed, metadata: Typed, blobs):
+        with self._lock:
+            keys = []
+            for channel, version, typed in blobs:
+                key = f"blob/{thread_id}/{ns}/{channel}/{version}"
+                self.client.set(key, self._pack(list(typed)))
+                keys.append(key)
+            key = f"cp/{thread_id}/{ns}/{checkpoint_id}"
+            self.client.set(
+                key,
+                self._pack({"parent_id": parent_id, "checkpoint": list(checkpoint), "metadata": list(metadata)}),
+            )
+            keys.append(key)
+            self._index(thread_id, keys)
+            self._touch(thread_id)
+
+    def list_checkpoints(self, thread_id=None, ns=None, checkpoint_id=None, before_id=None, limit=None):
+        with self._lock:
+            thread_ids = [thread_id] if thread_id is not None else self._thread_ids()
+            rows = []
+            for tid in thread_ids:
+                for key in self._thread_keys(tid):
+                    if not key.startswith("cp/"):
+                        continue
+                    _, _, ns_, cid = key.split("/", 3)
+                    if ns is not None and ns_ != ns:
+                        continue
+                    if checkpoint_id is not None and cid != checkpoint_id:
+                        continue
+                    if before_id is not None and cid >= before_id:
+                        continue
+                    rows.append((cid, tid, ns_, key))
+
+            rows.sort(reverse=True)
+            # Read the records under the lock, yield after releasing it
+            records = []
+            for cid, tid, ns_, key in rows[:limit] if limit is not None else rows:
+                raw = self.client.get(key)
+                if raw is not None:
+                    records.append((tid, ns_, cid, self._unpack(raw)))
+
+        for tid, ns_, cid, record in records:
+            yield tid, ns_, cid, record["parent_id"], tuple(record["checkpoint"]), tuple(record["metadata"])
+
+    def get_blobs(self, thread_id, ns, versions: ChannelVersions) -> Dict[str, Typed]:
+        blobs = {}
+        with self._lock:
+            for channel, version in versions.items():
+                raw = self.client.get(f"blob/{thread_id}/{ns}/{channel}/{version}")
+                if raw is not None:
+                    blobs[channel] = tuple(self._unpack(raw))
+        return blobs
+
+    def put_writes(self, thread_id, ns, checkpoint_id, rows):
+        with self._lock:
+            new_keys = []
+            for task_id, idx, channel, typed, task_path in rows:
+                key = f"w/{thread_id}/{ns}/{checkpoint_id}/{task_id}/{idx}"
+                exists = self.client.get(key) is not None
+                if idx >= 0 and exists:
+                    continue
+                self.client.set(key, self._pack([channel, list(typed), task_path]))
+                if not exists:
+                    new_keys.append(key)
+            self._index(thread_id, new_keys)
+
+    def get_writes(self, thread_id, ns, checkpoint_id) -> List[Tuple[str, str, Typed]]:
+        prefix = f"w/{thread_id}/{ns}/{checkpoint_id}/"
+        writes = []
+        with self._lock:
+            for key in sorted(k for k in self._thread_keys(thread_id) if k.startswith(prefix)):
+                raw = self.client.get(key)
+                if raw is None:
+                    continue
+                channel, typed, _ = self._unpack(raw)
+                writes.append((key.split("/")[4], channel, tuple(typed)))
+        return writes
+
+    def delete_thread(self, thread_id: str):
+        with self._lock:
+            for key in self._thread_keys(thread_id):
+                self.client.delete(key)
+            for n in range(self._index_records(thread_id)):
+                self.client.delete(f"keys/{thread_id}/{n}")
+            self.client.delete(f"keys/{thread_id}")
+            self.client.delete(f"thread/{thread_id}")
+
+    def mark_finished(self, thread_id: str):
+        with self._lock:
+            self._touch(thread_id, finished=True)
+
+    def expired_threads(self, finished_before: float, idle_before: float) -> List[str]:
+        expired = []
+        with self._lock:
+            for thread_id in self._thread_ids():
+                raw = self.client.get(f"thread/{thread_id}")
+                if raw is None:
+                    continue
+                info = self._unpack(raw)
+                finished_at = info.get("finished_at")
+                if (finished_at is not None and finished_at < finished_before) or info["updated_at"] < idle_before:
+                    expired.append(thread_id)
+        return expired
+
+
+# =========================
+# Saver
+# =========================
+
+class DurableSaver(BaseCheckpointSaver):
+    def __init__(
+        self,
+        store,
+        finished_ttl: float = FINISHED_THREAD_TTL_SECONDS,
+        idle_ttl: float = IDLE_THREAD_TTL_SECONDS,
+        gc_interval: float = GC_INTERVAL_SECONDS,
+    ):
+        super().__init__(serde=CompactSerializer())
+        self.store = store
+        self.finished_ttl = finished_ttl
+        self.idle_ttl = idle_ttl
+        self.gc_interval = gc_interval
+        self._last_gc = time.time()
+
+    # ---------- sync API ----------
+
+    def _tuple(self, thread_id, ns, checkpoint_id, parent_id, checkpoint: Typed, metadata: Typed) -> CheckpointTuple:
+        checkpoint_ = self.serde.loads_typed(checkpoint)
+        blobs = self.store.get_blobs(thread_id, ns, checkpoint_["channel_versions"])
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": checkpoint_id}},
+            checkpoint={
+                **checkpoint_,
+                "channel_values": {
+                    channel: self.serde.loads_typed(typed)
+                    for channel, typed in blobs.items() if typed[0] != "empty"
+                },
+            },
+            metadata=self.serde.loads_typed(metadata),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": parent_id}}
+                if parent_id else None
+            ),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed(typed))
+                for task_id, channel, typed in self.store.get_writes(thread_id, ns, checkpoint_id)
+            ],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        configurable = config["configurable"]
+        rows = self.store.list_checkpoints(
+            thread_id=configurable["thread_id"],
+            ns=configurable.get("checkpoint_ns", ""),
+            checkpoint_id=get_checkpoint_id(config),
+            limit=1,
+        )
+        for row in rows:
+            return self._tuple(*row)
+        return None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        configurable = (config or {}).get("configurable", {})
+        rows = self.store.list_checkpoints(
+            thread_id=configurable.get("thread_id"),
+            ns=configurable.get("checkpoint_ns"),
+            checkpoint_id=get_checkpoint_id(config) if config else None,
+            before_id=get_checkpoint_id(before) if before else None,
+            # Metadata filters are applied after decoding
+            limit=None if filter else limit,
+        )
+        for row in rows:
+            if limit is not None and limit <= 0:
+                break
+            if filter:
+                metadata = self.serde.loads_typed(row[5])
+                if not all(metadata.get(k) == v for k, v in filter.items()):
+                    continue
+            if limit is not None:
+                limit -= 1
+            yield self._tuple(*row)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        ns = configurable.get("checkpoint_ns", "")
+
+        # Only channels that changed in this step get a new blob
+        checkpoint_ = checkpoint.copy()
+        values = checkpoint_.pop("channel_values", {})
+        blobs = [
+            (channel, version, self.serde.dumps_typed(values[channel]) if channel in values else ("empty", b""))
+            for channel, version in new_versions.items()
+        ]
+
+        self.store.put_checkpoint(
+            thread_id, ns, checkpoint["id"], configurable.get("checkpoint_id"),
+            self.serde.dumps_typed(checkpoint_),
+            self.serde.dumps_typed(get_checkpoint_metadata(config, metadata)),
+            blobs,
+        )
+        self._maybe_collect_garbage()
+
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        configurable = config["configurable"]
+        self.store.put_writes(
+            configurable["thread_id"],
+            configurable.get("checkpoint_ns", ""),
+            configurable["checkpoint_id"],
+            [
+                (task_id, WRITES_IDX_MAP.get(channel, idx), channel, self.serde.dumps_typed(value), task_path)
+                for idx, (channel, value) in enumerate(writes)
+            ],
+        )
+
+    def delete_thread(self, thread_id: str) -> None:
+        self.store.delete_thread(thread_id)
+
+    # ---------- async API (storage calls run in a thread) ----------
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        for item in await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        ):
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = "") -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    # ---------- lifecycle ----------
+
+    def mark_finished(self, thread_id: str):
+        """Start the short finished-thread TTL for a run that reached END."""
+        self.store.mark_finished(thread_id)
+
+    def collect_garbage(self) -> int:
+        now = time.time()
+        expired = self.store.expired_threads(now - self.finished_ttl, now - self.idle_ttl)
+        for thread_id in expired:
+            self.store.delete_thread(thread_id)
+        if expired:
+            print(f"[DEBUG] Checkpointer GC removed {len(expired)} threads")
+        return len(expired)
+
+    def _maybe_collect_garbage(self):
+        if time.time() - self._last_gc < self.gc_interval:
+            return
+        self._last_gc = time.time()
+        try:
+            self.collect_garbage()
+        except Exception as e:
+            print(f"[WARN] Checkpointer GC failed ({e})")
+
+
+def make_checkpointer(kind: str = CHECKPOINT_BACKEND, state_dir: str = STATE_DIR):
+    """
+    Build a checkpointer by name: "sqlite" (default), "kv" (SQLiteKVClient
+    stand-in for a KV server) or "memory" (in-process MemorySaver).
+    """
+    if kind == "memory":
+        from langgraph.checkpoint.memory import MemorySaver
+        return MemorySaver()
+    if kind == "sqlite":
+        return DurableSaver(SQLiteCheckpointStore(os.path.join(state_dir, "checkpoints.sqlite")))
+    if kind == "kv":
+        return DurableSaver(KVCheckpointStore(SQLiteKVClient(os.path.join(state_dir, "checkpoints.kv.sqlite"))))
+    raise ValueError(f"Unknown checkpoint backend: {kind}")
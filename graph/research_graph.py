@@ -35,19 +35,45 @@
 
 #     return builder.compile(checkpointer=checkpointer)
 
+import os
+
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
 
+from graph.checkpointer import make_checkpointer
 from schemas.state import ResearchState
+from tools.telemetry import instrument_node
 
 # ----------------------------
 # Import agents
 # ----------------------------
-from agents.planner import planner_agent
-from agents.searcher import search_agent
-from agents.reader import reader_agent
-from agents.verifier import verifier_agent
-from agents.synthesizer import synthesizer_agent
+from agents.coverage import coverage_agent, iterative_ranker_agent
+from agents.planner import aplanner_agent, planner_agent
+from agents.searcher import asearch_agent, search_agent
+from agents.deduplicator import dedup_agent
+from agents.ranker import ranker_agent
+from agents.reader import areader_agent, reader_agent
+from agents.verifier import averifier_agent, verifier_agent
+from agents.synthesizer import asynthesizer_agent, synthesizer_agent
+
+# Iterative mode: reader rounds repeat with follow-up searches until the
+# plan's objectives are covered or a budget runs out (agents/coverage.py)
+ITERATIVE_RESEARCH = os.getenv("RESEARCH_ITERATIVE", "0") == "1"
+
+
+def node(name: str, sync_fn, async_fn=None):
+    """
+    Instrumented graph node. With an async twin the graph runs the
+    coroutine under ainvoke()/astream() and the sync function under
+    invoke()/stream(); CPU-only nodes (dedup, ranker) need no twin.
+    """
+    if async_fn is None:
+        return instrument_node(name, sync_fn)
+    return RunnableLambda(
+        instrument_node(name, sync_fn),
+        afunc=instrument_node(name, async_fn),
+        name=name,
+    )
 
 
 # ----------------------------
@@ -66,20 +92,34 @@ def route_after_planner(state: ResearchState) -> str:
     return "search"
 
 
+def route_after_coverage(state: ResearchState) -> str:
+    """
+    Iterative mode: another search → read round for uncovered objectives,
+    or on to verification once coverage or a budget says stop.
+    """
+    if state.get("research_done", False):
+        return "verifier"
+    return "search"
+
+
 # ----------------------------
 # Build graph
 # ----------------------------
-def build_graph():
+def build_graph(checkpointer=None, iterative: bool = ITERATIVE_RESEARCH):
     builder = StateGraph(ResearchState)
 
     # ----------------------------
-    # Nodes
+    # Nodes (telemetry-instrumented; sync + async where the node does I/O)
     # ----------------------------
-    builder.add_node("planner", planner_agent)
-    builder.add_node("search", search_agent)
-    builder.add_node("reader", reader_agent)
-    builder.add_node("verifier", verifier_agent)
-    builder.add_node("synthesizer", synthesizer_agent)
+    builder.add_node("planner", node("planner", planner_agent, aplanner_agent))
+    builder.add_node("search", node("search", search_agent, asearch_agent))
+    builder.add_node("dedup", node("dedup", dedup_agent))
+    builder.add_node("ranker", node("ranker", iterative_ranker_agent if iterative else ranker_agent))
+    builder.add_node("reader", node("reader", reader_agent, areader_agent))
+    builder.add_node("verifier", node("verifier", verifier_agent, averifier_agent))
+    builder.add_node("synthesizer", node("synthesizer", synthesizer_agent, asynthesizer_agent))
+    if iterative:
+        builder.add_node("coverage", node("coverage", coverage_agent))
 
     # ----------------------------
     # Entry point
@@ -101,14 +141,31 @@ def build_graph():
     # ----------------------------
     # Normal research flow
     # ----------------------------
-    builder.add_edge("search", "reader")
-    builder.add_edge("reader", "verifier")
+    builder.add_edge("search", "dedup")
+    builder.add_edge("dedup", "ranker")
+    builder.add_edge("ranker", "reader")
+
+    if iterative:
+        builder.add_edge("reader", "coverage")
+        builder.add_conditional_edges(
+            "coverage",
+            route_after_coverage,
+            {
+                "search": "search",      # follow-up round
+                "verifier": "verifier",  # covered or out of budget
+            },
+        )
+    else:
+        builder.add_edge("reader", "verifier")
+
     builder.add_edge("verifier", "synthesizer")
     builder.add_edge("synthesizer", END)
 
     # ----------------------------
-    # Checkpointer (REQUIRED for interrupt)
+    # Checkpointer (REQUIRED for interrupt); durable by default so any
+    # worker can resume a thread (see graph/checkpointer.py)
     # ----------------------------
-    checkpointer = MemorySaver()
+    if checkpointer is None:
+        checkpointer = make_checkpointer()
 
     return builder.compile(checkpointer=checkpointer)
@@ -1,5 +1,9 @@
+import os
+
 from graph.research_graph import build_graph
 from schemas.state import ResearchState
+from tools.evidence_store import resolve_state
+from tools.telemetry import collector
 from pprint import pprint
 
 graph = build_graph()
@@ -10,7 +14,7 @@ if __name__ == "__main__":
 
     state = ResearchState(query=query)
 
-    result = graph.invoke(state)
+    result = resolve_state(graph.invoke(state))
 
     print("\n--- PLAN OUTPUT ---")
     pprint(result["plan"], width=100)
@@ -38,4 +42,11 @@ if __name__ == "__main__":
     for uncertainty in result["uncertain_facts"]:
         print("-", uncertainty)
     print("\n--- FINAL ANSWER ---")
-    print(result["final_answer"])
\ No newline at end of file
+    print(result["final_answer"])
+
+    # Telemetry: spans as OTLP JSON, aggregates as Prometheus text
+    if os.getenv("TELEMETRY_OTLP_PATH"):
+        collector.write_otlp_json(os.getenv("TELEMETRY_OTLP_PATH"))
+    if os.getenv("TELEMETRY_PROMETHEUS_PATH"):
+        with open(os.getenv("TELEMETRY_PROMETHEUS_PATH"), "w") as f:
+            f.write(collector.export_prometheus())
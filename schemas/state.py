@@ -1,3 +1,4 @@
+import operator
 from typing import Any, Dict, List, Optional, TypedDict, Annotated
 
 from langgraph.graph.message import add_messages
@@ -15,16 +16,30 @@ class ResearchState(TypedDict):
     clarification_round: int = 0
     clarification_complete: bool = False
 
+    # Evidence is checkpointed by reference: these hold IDs into
+    # tools/evidence_store.py, resolved only where the records are read
+
     # Search & reading
     search_queries: List[str] = []
-    sources: List[Dict[str, Any]] = []
+    source_ids: List[str] = []
     # sources: Annotated[list[Dict[str,Any]], add_messages]= [] , we will use this later for message conversion
 
-    notes: List[Dict[str, Any]] = []
+    # Accumulate across rounds in iterative mode
+    note_ids: Annotated[List[str], operator.add] = []
+    read_urls: Annotated[List[str], operator.add] = []
+    research_tokens: Annotated[int, operator.add] = 0
+
+    # Iterative mode (agents/coverage.py)
+    research_started_at: float | None = None
+    research_round: int = 0
+    searched_queries: List[str] = []
+    source_budget: int | None = None
+    coverage: Dict[str, Any] | None = None
+    research_done: bool = False
 
     # Verification
-    verified_facts: List[str] = []
-    conflicts: List[str] = []
+    verified_fact_ids: List[str] = []
+    conflict_ids: List[str] = []
     uncertain_facts: List[str] = []
 
     # Final output
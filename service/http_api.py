@@ -0,0 +1,236 @@
+"""
+Headless HTTP API for research jobs (stdlib server, JSON + Server-Sent Events).
+
+    POST   /jobs                     {"query": "..."}          → 202 job
+    GET    /jobs                                              → this tenant's jobs
+    GET    /jobs/<id>                                         → status, interrupt, result
+    GET    /jobs/<id>/events?after=N                          → SSE stream of job events
+    POST   /jobs/<id>/resume         {"answers": ["..."]}     → 202 job
+    POST   /jobs/<id>/cancel   (or DELETE /jobs/<id>)         → job
+    GET    /metrics                                           → Prometheus text
+    GET    /healthz
+
+The tenant comes from the X-Tenant-ID header; a tenant only ever sees its
+own jobs. Run from the repo root:
+    python -m service.http_api [--host 0.0.0.0] [--port 8000]
+"""
+import argparse
+import json
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from service.jobs import (
+    AWAITING_INPUT,
+    TERMINAL_STATES,
+    AdmissionError,
+    JobManager,
+    JobStateError,
+)
+from tools.telemetry import collector
+
+DEFAULT_TENANT = "anonymous"
+MAX_BODY_BYTES = 64 * 1024
+MAX_QUERY_CHARS = 2000
+SSE_HEARTBEAT_SECONDS = 15
+
+JOB_PATH = re.compile(r"^/jobs/([0-9a-f]{32})(?:/(events|resume|cancel))?$")
+
+
+class ResearchAPIHandler(BaseHTTPRequestHandler):
+    server_version = "DeepResearchAgent/1.0"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def jobs(self) -> JobManager:
+        return self.server.jobs
+
+    @property
+    def tenant(self) -> str:
+        return self.headers.get("X-Tenant-ID", DEFAULT_TENANT).strip() or DEFAULT_TENANT
+
+    # ---------- responses ----------
+
+    def _send_json(self, status: int, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_error(self, status: int, message: str, headers=None):
+        self._send_json(status, {"error": message}, headers)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError("Request body too large")
+        raw = self.rfile.read(length) if length else b"{}"
+        body = json.loads(raw or b"{}")
+        if not isinstance(body, dict):
+            raise ValueError("Request body must be a JSON object")
+        return body
+
+    def log_message(self, format, *args):
+        print(f"[DEBUG] {self.address_string()} {format % args}")
+
+    # ---------- routing ----------
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+
+        if url.path == "/healthz":
+            return self._send_json(200, {"ok": True})
+
+        if url.path == "/metrics":
+            payload = (self.jobs.export_prometheus() + collector.export_prometheus()).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        if url.path == "/jobs":
+            return self._send_json(200, {"jobs": [job.to_dict() for job in self.jobs.list(self.tenant)]})
+
+        match = JOB_PATH.match(url.path)
+        if not match or match.group(2) not in (None, "events"):
+            return self._send_error(404, "Not found")
+
+        job = self.jobs.get(match.group(1), self.tenant)
+        if job is None:
+            return self._send_error(404, "Job not found")
+
+        if match.group(2) == "events":
+            after = parse_qs(url.query).get("after", [self.headers.get("Last-Event-ID", "-1")])[0]
+            return self._stream_events(job, int(after) + 1 if after.lstrip("-").isdigit() else 0)
+
+        return self._send_json(200, job.to_dict())
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+
+        try:
+            body = self._read_json()
+        except ValueError as e:  # includes json.JSONDecodeError
+            return self._send_error(400, str(e))
+
+        if url.path == "/jobs":
+            query = body.get("query")
+            if not isinstance(query, str) or not query.strip():
+                return self._send_error(400, "'query' must be a non-empty string")
+            if len(query) > MAX_QUERY_CHARS:
+                return self._send_error(400, f"'query' is longer than {MAX_QUERY_CHARS} characters")
+
+            try:
+                job = self.jobs.submit(self.tenant, query.strip())
+            except AdmissionError as e:
+                return self._send_admission_error(e)
+            return self._send_json(202, job.to_dict(), {"Location": f"/jobs/{job.id}"})
+
+        match = JOB_PATH.match(url.path)
+        if not match or match.group(2) not in ("resume", "cancel"):
+            return self._send_error(404, "Not found")
+
+        job = self.jobs.get(match.group(1), self.tenant)
+        if job is None:
+            return self._send_error(404, "Job not found")
+
+        if match.group(2) == "cancel":
+            return self._send_json(200, self.jobs.cancel(job).to_dict())
+
+        answers = body.get("answers")
+        if not isinstance(answers, list) or not all(isinstance(a, str) for a in answers):
+            return self._send_error(400, "'answers' must be a list of strings")
+
+        try:
+            self.jobs.resume(job, answers)
+        except JobStateError as e:
+            return self._send_error(409, str(e))
+        except AdmissionError as e:
+            return self._send_admission_error(e)
+        return self._send_json(202, job.to_dict())
+
+    def do_DELETE(self):
+        match = JOB_PATH.match(urlsplit(self.path).path)
+        if not match or match.group(2) is not None:
+            return self._send_error(404, "Not found")
+
+        job = self.jobs.get(match.group(1), self.tenant)
+        if job is None:
+            return self._send_error(404, "Job not found")
+        return self._send_json(200, self.jobs.cancel(job).to_dict())
+
+    def _send_admission_error(self, e: AdmissionError):
+        headers = {"Retry-After": str(e.retry_after)} if e.retry_after else None
+        return self._send_error(e.status, e.reason, headers)
+
+    # ---------- SSE ----------
+
+    def _stream_events(self, job, next_id: int):
+        """
+        Replay events from `next_id`, then follow the job live until it
+        finishes or stops for clarification.
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        try:
+            while True:
+                events = job.wait_for_events(next_id, timeout=SSE_HEARTBEAT_SECONDS)
+                if not events:
+                    if job.status in TERMINAL_STATES or job.status == AWAITING_INPUT:
+                        return
+                    self.wfile.write(b": heartbeat\n\n")
+                    self.wfile.flush()
+                    continue
+
+                for event in events:
+                    self.wfile.write(
+                        f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n".encode("utf-8")
+                    )
+                self.wfile.flush()
+                next_id = events[-1]["id"] + 1
+
+        except (BrokenPipeError, ConnectionResetError):
+            # Client went away; the job keeps running
+            return
+
+
+class ResearchAPIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, jobs: JobManager):
+        super().__init__(address, ResearchAPIHandler)
+        self.jobs = jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deep research job service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    jobs = JobManager().start()
+    server = ResearchAPIServer((args.host, args.port), jobs)
+    print(f"[DEBUG] Research API listening on http://{args.host}:{args.port} "
+          f"({jobs.max_concurrent} workers, queue {jobs.max_queued})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        jobs.stop()
+
+
+if __name__ == "__main__":
+    main()
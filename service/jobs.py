@@ -0,0 +1,460 @@
+"""
+Research jobs: a bounded queue feeding a fixed pool of async workers.
+
+Each job runs the graph under its own thread_id (so concurrent users
+never share a checkpoint thread) with astream(), and records what it
+sees as numbered events that HTTP clients can poll or stream. With a
+shared checkpointer, a job parked on a clarification can be resumed
+through any worker. Admission
+control rejects work up front instead of letting the queue grow: a full
+queue is a 503, a tenant over its quota a 429.
+"""
+import asyncio
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+from langgraph.types import Command
+from pydantic import BaseModel
+
+from graph.research_graph import build_graph
+from tools.evidence_store import resolve_state
+
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", "8"))   # worker pool size
+MAX_QUEUED_JOBS = int(os.getenv("MAX_QUEUED_JOBS", "64"))          # waiting to start
+MAX_ACTIVE_JOBS_PER_TENANT = int(os.getenv("MAX_ACTIVE_JOBS_PER_TENANT", "4"))
+
+FINISHED_JOB_RETENTION_SECONDS = 60 * 60
+MAX_EVENTS_PER_JOB = 5000  # token events beyond this are dropped, status events never
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+AWAITING_INPUT = "awaiting_input"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+ACTIVE_STATES = {QUEUED, RUNNING, AWAITING_INPUT}
+TERMINAL_STATES = {SUCCEEDED, FAILED, CANCELLED}
+
+RESULT_KEYS = ("final_answer", "verified_facts", "conflicts", "uncertain_facts", "plan", "coverage")  # after resolve_state()
+
+
+class AdmissionError(Exception):
+    def __init__(self, status: int, reason: str, retry_after: Optional[int] = None):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class JobStateError(Exception):
+    """Operation not valid for the job's current state (e.g. resuming a running job)."""
+
+
+def to_jsonable(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, dict):
+        return {k: to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    return value
+
+
+# =========================
+# Job
+# =========================
+
+class Job:
+    def __init__(self, tenant: str, query: str):
+        self.id = uuid.uuid4().hex
+        self.tenant = tenant
+        self.query = query
+        self.thread_id = f"job-{self.id}"
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.queued_at = self.created_at
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.interrupt: Optional[Dict[str, Any]] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+
+        self.events: List[Dict[str, Any]] = []
+        self._changed = threading.Condition()
+        self._task: Optional[asyncio.Task] = None
+
+    def add_event(self, kind: str, data: Any = None):
+        with self._changed:
+            if kind == "synthesis_token" and len(self.events) >= MAX_EVENTS_PER_JOB:
+                return
+            self.events.append({"id": len(self.events), "type": kind, "data": to_jsonable(data)})
+            self._changed.notify_all()
+
+    def set_status(self, status: str, **data):
+        self.status = status
+        if status in TERMINAL_STATES:
+            self.finished_at = time.time()
+        self.add_event("status", {"status": status, **data})
+
+    def wait_for_events(self, after: int, timeout: float) -> List[Dict[str, Any]]:
+        """Events with id >= after, blocking up to `timeout` for new ones."""
+        with self._changed:
+            if len(self.events) <= after and self.status not in TERMINAL_STATES | {AWAITING_INPUT}:
+                self._changed.wait(timeout)
+            return self.events[after:]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "tenant": self.tenant,
+            "query": self.query,
+            "thread_id": self.thread_id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "interrupt": self.interrupt,
+            "result": self.result,
+            "error": self.error,
+            "events": len(self.events),
+        }
+
+
+# =========================
+# Manager
+# =========================
+
+class JobManager:
+    """
+    Owns the event loop thread, the job queue and the worker pool.
+    All public methods are safe to call from HTTP handler threads.
+    """
+
+    def __init__(
+        self,
+        graph_factory: Callable = build_graph,
+        max_concurrent: int = MAX_CONCURRENT_JOBS,
+        max_queued: int = MAX_QUEUED_JOBS,
+        max_active_per_tenant: int = MAX_ACTIVE_JOBS_PER_TENANT,
+    ):
+        self.graph = graph_factory()
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.max_active_per_tenant = max_active_per_tenant
+
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._counters = Counter()  # finished-by-status, rejected-by-reason
+        self._queue_wait_sum = 0.0
+        self._queue_wait_count = 0
+
+        self._loop = asyncio.new_event_loop()
+        self._queue: Optional[asyncio.Queue] = None
+        self._background = set()  # strong refs to fire-and-forget tasks
+        self._thread = threading.Thread(target=self._run_loop, name="research-jobs", daemon=True)
+        self._ready = threading.Event()
+
+    # ---------- lifecycle ----------
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        for _ in range(self.max_concurrent):
+            self._loop.create_task(self._worker())
+        self._ready.set()
+        self._loop.run_forever()
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    # ---------- API ----------
+
+    def submit(self, tenant: str, query: str) -> Job:
+        job = Job(tenant, query)
+        with self._lock:
+            self._collect_garbage()
+            self._admit(tenant)
+            self._jobs[job.id] = job
+            self._queued += 1
+        job.add_event("status", {"status": QUEUED})
+        self._enqueue(job, {"query": query})
+        return job
+
+    def resume(self, job: Job, answers: List[str]) -> Job:
+        # Same clarified-query format the Streamlit app builds
+        with self._lock:
+            if job.status != AWAITING_INPUT:
+                raise JobStateError(f"Job is {job.status}, not awaiting input")
+            if self._queued >= self.max_queued:
+                self._reject("queue_full")
+                raise AdmissionError(503, "Job queue is full", retry_after=5)
+            self._queued += 1
+            round_num = job.interrupt["round"]
+            job.interrupt = None
+            job.queued_at = time.time()
+            job.set_status(QUEUED)
+
+        clarified_query = job.query + " | " + " ".join(a for a in answers if a.strip())
+        self._enqueue(job, Command(resume={
+            "clarified_query": clarified_query,
+            "clarification_round": round_num,
+        }))
+        return job
+
+    def cancel(self, job: Job) -> Job:
+        with self._lock:
+            if job.status in TERMINAL_STATES:
+                return job
+            if job.status == QUEUED:
+                # The worker skips it when it comes up
+                self._queued -= 1
+                self._finish(job, CANCELLED)
+                return job
+            if job.status == AWAITING_INPUT:
+                self._finish(job, CANCELLED)
+                return job
+
+        # Running: cancel on the loop thread, where the task is guaranteed
+        # to exist once the job is marked running; _execute records it
+        self._loop.call_soon_threadsafe(self._cancel_task, job)
+        return job
+
+    def _cancel_task(self, job: Job):
+        if job._task is not None:
+            job._task.cancel()
+
+    def get(self, job_id: str, tenant: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is not None and job.status == AWAITING_INPUT and not self._still_parked(job):
+            # Resumed through another worker since we parked it
+            with self._lock:
+                self._jobs.pop(job_id, None)
+            job = None
+
+        job = job or self._restore(job_id, tenant)
+        # Another tenant's job is indistinguishable from a missing one
+        if job is None or job.tenant != tenant:
+            return None
+        return job
+
+    def _still_parked(self, job: Job) -> bool:
+        try:
+            return bool(self.graph.get_state({"configurable": {"thread_id": job.thread_id}}).interrupts)
+        except Exception:
+            return True
+
+    def _restore(self, job_id: str, tenant: str) -> Optional[Job]:
+        """
+        Adopt a job another worker started, from the shared checkpointer:
+        one parked on a clarification (so it can be resumed here) or one
+        that already finished. A run still in flight elsewhere is only
+        reported as running; it stays with the worker executing it.
+        """
+        job = Job(tenant, "")
+        job.id, job.thread_id = job_id, f"job-{job_id}"
+        try:
+            state = self.graph.get_state({"configurable": {"thread_id": job.thread_id}})
+        except Exception as e:
+            print(f"[WARN] Could not load job {job_id} from the checkpointer ({e})")
+            return None
+        if not state.values or (state.metadata or {}).get("tenant") != tenant:
+            return None
+
+        job.query = state.values.get("query", "")
+        job.created_at = job.queued_at = job.started_at = time.time()
+        if state.interrupts:
+            job.interrupt = to_jsonable(state.interrupts[0].value)
+            job.set_status(AWAITING_INPUT, interrupt=job.interrupt)
+        elif not state.next and state.values.get("final_answer"):
+            values = resolve_state(state.values)
+            job.result = to_jsonable({key: values.get(key) for key in RESULT_KEYS})
+            job.set_status(SUCCEEDED)
+        else:
+            job.set_status(RUNNING)
+            return job
+
+        with self._lock:
+            return self._jobs.setdefault(job_id, job)
+
+    def list(self, tenant: str) -> List[Job]:
+        with self._lock:
+            self._collect_garbage()
+        return sorted(
+            (job for job in list(self._jobs.values()) if job.tenant == tenant),
+            key=lambda job: job.created_at,
+        )
+
+    # ---------- admission ----------
+
+    def _admit(self, tenant: str):
+        # Called with self._lock held
+        if self._queued >= self.max_queued:
+            self._reject("queue_full")
+            raise AdmissionError(503, "Job queue is full", retry_after=5)
+
+        active = sum(1 for job in self._jobs.values() if job.tenant == tenant and job.status in ACTIVE_STATES)
+        if active >= self.max_active_per_tenant:
+            self._reject("tenant_quota")
+            raise AdmissionError(
+                429, f"Tenant already has {active} active jobs (limit {self.max_active_per_tenant})", retry_after=30
+            )
+
+    def _reject(self, reason: str):
+        self._counters[("rejected", reason)] += 1
+
+    # ---------- workers ----------
+
+    def _enqueue(self, job: Job, payload):
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (job, payload))
+
+    async def _worker(self):
+        while True:
+            job, payload = await self._queue.get()
+            with self._lock:
+                if job.status != QUEUED:
+                    continue  # cancelled while waiting
+                self._queued -= 1
+                self._running += 1
+                self._queue_wait_sum += time.time() - job.queued_at
+                self._queue_wait_count += 1
+                if job.started_at is None:
+                    job.started_at = time.time()
+                job.set_status(RUNNING)
+
+            job._task = asyncio.create_task(self._execute(job, payload))
+            try:
+                await asyncio.wait([job._task])
+            finally:
+                job._task = None
+                with self._lock:
+                    self._running -= 1
+
+    async def _execute(self, job: Job, payload):
+        # The tenant is stored in checkpoint metadata so another worker can
+        # check ownership before adopting the thread
+        config = {
+            "configurable": {"thread_id": job.thread_id},
+            "metadata": {"tenant": job.tenant, "job_id": job.id},
+        }
+        interrupt = None
+
+        try:
+            async for mode, chunk in self.graph.astream(payload, config=config, stream_mode=["updates", "custom"]):
+                if mode == "custom":
+                    job.add_event(chunk.get("type", "custom"), chunk)
+                    continue
+
+                for node_name, node_output in chunk.items():
+                    if node_name == "__interrupt__":
+                        interrupt = node_output[0].value
+                    else:
+                        job.add_event("node", {"node": node_name, "update": node_output})
+
+            if interrupt is not None:
+                with self._lock:
+                    job.interrupt = to_jsonable(interrupt)
+                    job.set_status(AWAITING_INPUT, interrupt=job.interrupt)
+                return
+
+            values = resolve_state((await self.graph.aget_state(config)).values)
+            job.result = to_jsonable({key: values.get(key) for key in RESULT_KEYS})
+            with self._lock:
+                self._finish(job, SUCCEEDED)
+
+        except asyncio.CancelledError:
+            with self._lock:
+                self._finish(job, CANCELLED)
+        except Exception as e:
+            print(f"[WARN] Job {job.id} failed: {e}")
+            job.error = f"{type(e).__name__}: {e}"
+            with self._lock:
+                self._finish(job, FAILED, error=job.error)
+
+    def _finish(self, job: Job, status: str, **data):
+        # Called with self._lock held
+        job.set_status(status, **data)
+        self._counters[("finished", status)] += 1
+        self._collect_garbage()
+
+        # Finished threads only need to outlive result polling. The
+        # checkpointer call blocks, so it runs in a worker thread once the
+        # caller has released the lock, never on the loop itself
+        self._loop.call_soon_threadsafe(self._start_mark_finished, job.thread_id)
+
+    def _start_mark_finished(self, thread_id: str):
+        task = self._loop.create_task(self._mark_finished(thread_id))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _mark_finished(self, thread_id: str):
+        mark_finished = getattr(self.graph.checkpointer, "mark_finished", None)
+        if mark_finished is None:
+            return
+        try:
+            await asyncio.to_thread(mark_finished, thread_id)
+        except Exception as e:
+            print(f"[WARN] Could not mark thread {thread_id} finished ({e})")
+
+    def _collect_garbage(self):
+        # Called with self._lock held, from submit(), _finish() and list(),
+        # so clients that only submit and poll don't keep finished jobs forever
+        cutoff = time.time() - FINISHED_JOB_RETENTION_SECONDS
+        for job_id in [
+            job_id for job_id, job in self._jobs.items()
+            if job.status in TERMINAL_STATES and job.finished_at < cutoff
+        ]:
+            del self._jobs[job_id]
+
+    # ---------- metrics ----------
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            by_status = Counter(job.status for job in self._jobs.values())
+            return {
+                "queue_depth": self._queued,
+                "running": self._running,
+                "awaiting_input": by_status[AWAITING_INPUT],
+                "workers": self.max_concurrent,
+                "queue_capacity": self.max_queued,
+                "jobs_by_status": dict(by_status),
+                "finished_total": {s: n for (kind, s), n in self._counters.items() if kind == "finished"},
+                "rejected_total": {r: n for (kind, r), n in self._counters.items() if kind == "rejected"},
+                "queue_wait_seconds_sum": self._queue_wait_sum,
+                "queue_wait_seconds_count": self._queue_wait_count,
+            }
+
+    def export_prometheus(self) -> str:
+        m = self.metrics()
+        lines = [
+            "# TYPE research_jobs_queue_depth gauge",
+            f"research_jobs_queue_depth {m['queue_depth']}",
+            "# TYPE research_jobs_running gauge",
+            f"research_jobs_running {m['running']}",
+            "# TYPE research_jobs_awaiting_input gauge",
+            f"research_jobs_awaiting_input {m['awaiting_input']}",
+            "# TYPE research_jobs_workers gauge",
+            f"research_jobs_workers {m['workers']}",
+            "# TYPE research_jobs_finished_total counter",
+        ]
+        lines += [f'research_jobs_finished_total{{status="{s}"}} {n}' for s, n in sorted(m["finished_total"].items())]
+        lines.append("# TYPE research_jobs_rejected_total counter")
+        lines += [f'research_jobs_rejected_total{{reason="{r}"}} {n}' for r, n in sorted(m["rejected_total"].items())]
+        lines += [
+            "# TYPE research_jobs_queue_wait_seconds summary",
+            f"research_jobs_queue_wait_seconds_sum {m['queue_wait_seconds_sum']:.6f}",
+            f"research_jobs_queue_wait_seconds_count {m['queue_wait_seconds_count']}",
+        ]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Agents build their LLM clients at import time; tests never call them
+for _key in ("OPENAI_API_KEY", "GOOGLE_API_KEY", "TAVILY_API_KEY", "OPENROUTER_API_KEY"):
+    os.environ.setdefault(_key, "test")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,128 @@
+import asyncio
+import operator
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated, List, TypedDict
+
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Command, interrupt
+
+from graph.checkpointer import INDEX_CHUNK_KEYS, DurableSaver, KVCheckpointStore, SQLiteKVClient, make_checkpointer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class State(TypedDict):
+    steps: Annotated[List[str], operator.add]
+    answer: str
+
+
+def ask(state: State):
+    return {"steps": ["ask"], "answer": interrupt("question?")}
+
+
+def finish(state: State):
+    return {"steps": ["finish"]}
+
+
+def build(checkpointer):
+    graph = StateGraph(State)
+    graph.add_node("ask", ask)
+    graph.add_node("finish", finish)
+    graph.add_edge(START, "ask")
+    graph.add_edge("ask", "finish")
+    graph.add_edge("finish", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def test_kv_interrupt_and_resume_across_savers(tmp_path):
+    config = {"configurable": {"thread_id": "t1"}}
+    first = make_checkpointer("kv", str(tmp_path))
+    build(first).invoke({"steps": []}, config)
+    first.store.client.close()  # the worker exits
+
+    # A fresh saver over the same file resumes the thread
+    app = build(make_checkpointer("kv", str(tmp_path)))
+    result = app.invoke(Command(resume="yes"), config)
+    assert result == {"steps": ["ask", "finish"], "answer": "yes"}
+    assert len(list(app.checkpointer.list(config))) >= 3
+
+
+def test_kv_async_runs_share_one_store(tmp_path):
+    app = build(make_checkpointer("kv", str(tmp_path)))
+
+    async def run(i):
+        config = {"configurable": {"thread_id": f"t{i}"}}
+        await app.ainvoke({"steps": []}, config)
+        return await app.ainvoke(Command(resume=str(i)), config)
+
+    async def main():
+        return await asyncio.gather(*(run(i) for i in range(8)))
+
+    results = asyncio.run(main())
+    assert [r["answer"] for r in results] == [str(i) for i in range(8)]
+
+
+def test_kv_reads_are_safe_from_worker_threads(tmp_path):
+    store = KVCheckpointStore(SQLiteKVClient(str(tmp_path / "cp.sqlite")))
+
+    def work(i):
+        thread_id = f"t{i}"
+        for n in range(20):
+            store.put_checkpoint(thread_id, "", f"{n:04d}", None, ("msgpack", b"c"), ("msgpack", b"m"),
+                                 [("notes", str(n), ("msgpack", b"v"))])
+            store.put_writes(thread_id, "", f"{n:04d}", [("task", 0, "notes", ("msgpack", b"w"), "")])
+            assert store.get_blobs(thread_id, "", {"notes": str(n)}) == {"notes": ("msgpack", b"v")}
+            assert len(store.get_writes(thread_id, "", f"{n:04d}")) == 1
+            store.expired_threads(0, 0)
+        return len(list(store.list_checkpoints(thread_id=thread_id)))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert list(pool.map(work, range(8))) == [20] * 8
+
+
+def test_kv_delete_and_expiry_use_the_index(tmp_path):
+    store = KVCheckpointStore(SQLiteKVClient(str(tmp_path / "cp.sqlite")))
+    for thread_id in ("a", "b"):
+        store.put_checkpoint(thread_id, "", "0001", None, ("msgpack", b"c"), ("msgpack", b"m"),
+                             [("notes", "1", ("msgpack", b"v"))])
+    store.mark_finished("a")
+
+    saver = DurableSaver(store, finished_ttl=-1, idle_ttl=3600)
+    assert saver.collect_garbage() == 1
+    assert [row[0] for row in store.list_checkpoints()] == ["b"]
+    assert store.client.get("blob/a//notes/1") is None
+
+
+def test_kv_store_survives_a_crash(tmp_path):
+    path = str(tmp_path / "cp.sqlite")
+    script = f"""
+import os
+from graph.checkpointer import KVCheckpointStore, SQLiteKVClient
+store = KVCheckpointStore(SQLiteKVClient({path!r}))
+for n in range(200):
+    store.put_checkpoint("t", "", f"{{n:04d}}", None, ("msgpack", b"c"), ("msgpack", b"m"),
+                         [("notes", str(n), ("msgpack", b"v"))])
+os._exit(0)
+"""
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=ROOT)
+
+    store = KVCheckpointStore(SQLiteKVClient(path))
+    assert len(list(store.list_checkpoints(thread_id="t"))) == 200
+
+
+def test_kv_index_appends_in_bounded_records(tmp_path):
+    store = KVCheckpointStore(SQLiteKVClient(str(tmp_path / "cp.sqlite")))
+    for n in range(100):
+        store.put_checkpoint("t", "", f"{n:04d}", None, ("msgpack", b"c"), ("msgpack", b"m"),
+                             [("notes", str(n), ("msgpack", b"v"))])
+
+    records = store._index_records("t")
+    assert records == -(-200 // INDEX_CHUNK_KEYS)
+    sizes = [len(store._unpack(store.client.get(f"keys/t/{n}"))) for n in range(records)]
+    assert max(sizes) <= INDEX_CHUNK_KEYS and sum(sizes) == 200
+
+    store.delete_thread("t")
+    assert list(store.client.scan("keys/")) == []
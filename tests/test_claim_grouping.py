@@ -0,0 +1,42 @@
+from agents.verifier import _format_claims, build_claim_groups
+from tools.claim_clustering import claims_agree, group_near_identical
+
+
+def item(fact, url, source_type="independent_blog"):
+    return {"fact": fact, "url": url, "title": url, "source_type": source_type}
+
+
+def test_negated_claims_never_share_a_group():
+    texts = [
+        "Llama 3 supports function calling natively.",
+        "Llama 3 does not support function calling natively.",
+    ]
+    assert group_near_identical(texts) == [[0], [1]]
+
+
+def test_agreeing_pair_counts_both_sources():
+    groups = build_claim_groups([
+        item("Llama 3 supports function calling natively.", "https://a.com/x"),
+        item("Llama 3 supports function calling natively", "https://b.com/y"),
+    ])
+    assert len(groups) == 1
+    assert groups[0]["independent_sources"] == 2
+    assert groups[0]["variants"] == []
+
+
+def test_qualified_variant_is_shown_but_not_counted():
+    groups = build_claim_groups([
+        item("Llama 3 supports function calling natively.", "https://a.com/x"),
+        item("Llama 3 partially supports function calling natively.", "https://b.com/y"),
+    ])
+    assert len(groups) == 1
+    assert groups[0]["independent_sources"] == 1
+    assert groups[0]["variants"] == ["Llama 3 partially supports function calling natively."]
+    assert "VARIANT: Llama 3 partially supports" in _format_claims(groups)
+
+
+def test_claims_agree_compares_numbers_polarity_and_qualifiers():
+    assert claims_agree("GPT-4 Turbo costs $10 per million tokens.", "GPT-4 Turbo is priced at $10 per million tokens.")
+    assert not claims_agree("GPT-4 Turbo costs $10 per million tokens.", "GPT-4 Turbo costs $30 per million tokens.")
+    assert not claims_agree("vLLM supports AWQ.", "vLLM doesn't support AWQ.")
+    assert not claims_agree("vLLM supports AWQ.", "vLLM may support AWQ.")
@@ -0,0 +1,40 @@
+import agents.coverage as coverage
+
+QUERY = (
+    "Compare the total cost of self-hosting an open-weight 70B LLM on GPUs "
+    "versus using a hosted inference API for 10 million tokens per day"
+)
+
+
+def test_follow_up_query_adds_the_query_subject_to_the_objective():
+    query = coverage._follow_up_query("Operational overheads of self-hosting", QUERY)
+    assert query.startswith("Operational overheads self-hosting")
+    assert "70B" in query and "LLM" in query
+    assert "of" not in query.split()
+
+
+def test_follow_up_query_drops_instruction_words():
+    query = coverage._follow_up_query("Identify the GPU rental cost", QUERY)
+    assert query.split()[:3] == ["GPU", "rental", "cost"]
+    # "GPUs" from the query is the same term
+    assert "GPUs" not in query.split()
+
+
+def test_follow_up_queries_skip_searched_queries():
+    uncovered = ["Operational overheads of self-hosting", "Operational overheads of self-hosting"]
+    searched = [coverage._follow_up_query("Hosted API price per million tokens", QUERY)]
+    assert coverage._follow_up_queries(uncovered + ["Hosted API price per million tokens"], QUERY, searched) == [
+        coverage._follow_up_query(uncovered[0], QUERY),
+    ]
+
+
+def test_coverage_agent_uses_the_clarified_query(monkeypatch):
+    monkeypatch.setattr(coverage, "resolve", lambda ids: [])
+    update = coverage.coverage_agent({
+        "query": "cost of self-hosting",
+        "clarified_query": "cost of self-hosting | Llama 70B",
+        "plan": {"objectives": ["Operational overheads"]},
+        "search_queries": ["self-hosting cost"],
+    })
+    assert update["search_queries"] == ["Operational overheads Llama 70B cost self-hosting"]
+    assert not update["research_done"]
@@ -0,0 +1,30 @@
+import pytest
+
+import tools.evidence_store as evidence_store
+from tools.evidence_store import EvidenceStore, EvidenceView, MemoryEvidenceBackend
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = EvidenceStore(MemoryEvidenceBackend())
+    monkeypatch.setattr(evidence_store, "get_evidence_store", lambda: store)
+    return store
+
+
+def test_view_length_matches_iteration_when_ids_expired(store):
+    ids = store.put_many("fact", [{"fact": "a"}, {"fact": "b"}])
+    view = EvidenceView(ids + ["fact:expired"])
+
+    assert len(view) == len(list(view)) == 2
+    assert view[len(view) - 1] == {"fact": "b"}
+
+
+def test_view_of_only_expired_ids_is_empty(store):
+    view = EvidenceView(["fact:expired"])
+    assert not view
+    assert len(view) == 0
+
+
+def test_empty_view_never_touches_the_store(store, monkeypatch):
+    monkeypatch.setattr(store, "resolve", lambda ids: pytest.fail("resolved"))
+    assert len(EvidenceView(None)) == 0
@@ -0,0 +1,46 @@
+import pytest
+
+from tools.html_extractor import ENGINES, MIN_MAIN_CONTENT_CHARS, _configured_engine, extract_text
+
+ARTICLE = "<p>" + "Quantized models trade accuracy for memory. " * 10 + "</p>"
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+@pytest.mark.parametrize("classes", [
+    "layout has-sidebar",
+    "post comments-open",
+    "entry-content share-enabled",
+    "site-content with-header",
+])
+def test_state_classes_keep_content(engine, classes):
+    html = f'<html><body><div class="{classes}">{ARTICLE}</div></body></html>'
+    assert len(extract_text(html, engine=engine)) >= MIN_MAIN_CONTENT_CHARS
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+def test_boilerplate_tokens_are_dropped(engine):
+    html = (
+        f'<html><body><div class="cookie-banner">ACCEPT COOKIES</div>'
+        f'<div id="nav_menu">HOME ABOUT</div><article>{ARTICLE}</article></body></html>'
+    )
+    text = extract_text(html, engine=engine)
+    assert "ACCEPT COOKIES" not in text
+    assert "HOME ABOUT" not in text
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+def test_wrapper_around_article_is_kept(engine):
+    html = f'<html><body><form><div class="sidebar"><main>{ARTICLE}</main></div></form></body></html>'
+    assert len(extract_text(html, engine=engine)) >= MIN_MAIN_CONTENT_CHARS
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+def test_short_result_falls_back_to_body(engine):
+    html = '<html><body><div class="footer">Contact: team@example.com</div></body></html>'
+    assert extract_text(html, engine=engine) == "Contact: team@example.com"
+
+
+def test_unavailable_engine_setting_falls_back_to_auto(capsys):
+    assert _configured_engine("no-such-parser") == "auto"
+    assert "[WARN]" in capsys.readouterr().out
+    assert _configured_engine("bs4") == "bs4"
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tools.http_client import FetchResponse, _HostSlots, afetch, fetch, get_async_client
+
+
+class LowercaseHeaders(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b"<html><body>hello</body></html>"
+        self.send_response(200)
+        self.send_header("content-type", "text/html")
+        self.send_header("etag", '"v1"')
+        self.send_header("last-modified", "Wed, 21 Oct 2026 07:28:00 GMT")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), LowercaseHeaders)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}/"
+    httpd.shutdown()
+
+
+def test_fetch_headers_are_case_insensitive(server):
+    response = fetch(server)
+    assert response.headers.get("ETag") == '"v1"'
+    assert response.headers.get("Last-Modified") == "Wed, 21 Oct 2026 07:28:00 GMT"
+
+
+def test_plain_dict_headers_are_case_insensitive():
+    response = FetchResponse(url="https://a.com/", status_code=200, headers={"etag": '"v1"'})
+    assert response.headers.get("ETag") == '"v1"'
+
+
+def test_async_client_is_closed_with_its_loop(server):
+    async def main():
+        response = await afetch(server)
+        client, _ = await get_async_client()
+        return response, client
+
+    response, client = asyncio.run(main())
+    assert response.headers.get("ETag") == '"v1"'
+    assert client.is_closed
+
+
+def test_idle_host_slots_are_pruned():
+    async def main():
+        slots = _HostSlots(per_host=2, max_hosts=3)
+        async with slots.hold("busy.com"):
+            for n in range(10):
+                async with slots.hold(f"host{n}.com"):
+                    pass
+            assert "busy.com" in slots._slots
+        return len(slots)
+
+    assert asyncio.run(main()) == 3
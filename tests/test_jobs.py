@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import service.jobs as jobs
+from service.jobs import SUCCEEDED, Job, JobManager
+
+
+class FakeGraph:
+    checkpointer = None
+    gate = None  # a threading.Event runs wait for, if set
+
+    async def astream(self, payload, config=None, stream_mode=None):
+        if self.gate is not None:
+            await asyncio.to_thread(self.gate.wait, 5)
+        return
+        yield
+
+    async def aget_state(self, config):
+        return SimpleNamespace(values={"final_answer": "done"})
+
+
+@pytest.fixture
+def manager():
+    # The loop thread is a daemon; leaving it running avoids tearing down
+    # its idle worker tasks mid-await
+    return JobManager(graph_factory=FakeGraph, max_concurrent=1).start()
+
+
+def old_finished_job(manager):
+    job = Job("t", "old query")
+    job.status = SUCCEEDED
+    job.finished_at = time.time() - jobs.FINISHED_JOB_RETENTION_SECONDS - 1
+    manager._jobs[job.id] = job
+    return job
+
+
+def test_submit_collects_expired_jobs(manager):
+    old = old_finished_job(manager)
+    manager.submit("t", "new query")
+    assert old.id not in manager._jobs
+
+
+def test_finish_collects_expired_jobs(manager, monkeypatch):
+    gate = threading.Event()
+    monkeypatch.setattr(manager.graph, "gate", gate)
+    job = manager.submit("t", "new query")
+    old = old_finished_job(manager)
+    gate.set()
+    # The status flips before the collector runs, under the same lock
+    for _ in range(250):
+        with manager._lock:
+            if job.status == SUCCEEDED:
+                break
+        time.sleep(0.02)
+    assert job.status == SUCCEEDED
+    assert old.id not in manager._jobs
+    assert job.id in manager._jobs
+
+
+def test_mark_finished_runs_off_the_loop_and_outside_the_lock():
+    calls = []
+
+    class Checkpointer:
+        def mark_finished(self, thread_id):
+            calls.append((thread_id, manager._lock.locked(), threading.current_thread() is manager._thread))
+
+    class Graph(FakeGraph):
+        checkpointer = Checkpointer()
+
+    manager = JobManager(graph_factory=Graph, max_concurrent=1).start()
+    job = manager.submit("t", "query")
+    for _ in range(250):
+        if calls:
+            break
+        time.sleep(0.02)
+    assert calls == [(job.thread_id, False, False)]
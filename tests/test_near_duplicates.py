@@ -0,0 +1,26 @@
+import itertools
+
+from tools.near_duplicates import NearDuplicateIndex
+
+ARTICLE = "The official announcement says the model supports a context window of one million tokens."
+OTHER = "Benchmarks on consumer GPUs show quantized models losing little accuracy at four bits."
+
+
+def test_lowest_key_wins_in_any_order():
+    docs = {0: ARTICLE, 1: OTHER, 2: ARTICLE, 3: ARTICLE + " Reposted."}
+    for order in itertools.permutations(docs):
+        index = NearDuplicateIndex()
+        kept = set()
+        for key in order:
+            original, displaced = index.add(key, docs[key])
+            kept -= set(displaced)
+            if original is None:
+                kept.add(key)
+        assert kept == {0, 1}
+
+
+def test_add_reports_the_better_original():
+    index = NearDuplicateIndex()
+    assert index.add(2, ARTICLE) == (None, [])
+    assert index.add(0, ARTICLE) == (None, [2])
+    assert index.add(1, ARTICLE) == (0, [])
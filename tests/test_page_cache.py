@@ -0,0 +1,31 @@
+import agents.reader as reader
+from tools.http_client import FetchResponse
+from tools.page_cache import PageCache
+
+PAGE = "<html><body><article>" + "Page text. " * 30 + "</article></body></html>"
+
+
+def test_lowercase_validators_are_stored_and_revalidated(tmp_path, monkeypatch):
+    cache = PageCache(path=str(tmp_path / "pages.sqlite"), ttl=0)
+    requests = []
+
+    def fake_fetch(url, headers=None, **kwargs):
+        requests.append(headers)
+        if headers:
+            return FetchResponse(url=url, status_code=304)
+        return FetchResponse(
+            url=url, status_code=200, content=PAGE.encode(), encoding="utf-8",
+            headers={"etag": '"v1"', "last-modified": "Wed, 21 Oct 2026 07:28:00 GMT"},
+        )
+
+    monkeypatch.setattr(reader, "get_page_cache", lambda: cache)
+    monkeypatch.setattr(reader, "fetch", fake_fetch)
+
+    first = reader.fetch_page_text("https://a.com/page")
+    second = reader.fetch_page_text("https://a.com/page")
+
+    assert first and second == first
+    assert requests == [None, {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Wed, 21 Oct 2026 07:28:00 GMT",
+    }]
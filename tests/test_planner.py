@@ -0,0 +1,57 @@
+from langchain_core.runnables import RunnableLambda
+
+import agents.planner as planner
+from agents.planner import FusedPlannerOutput
+from tools.kv_cache import MemoryBackend, TTLCache
+
+VERDICT = FusedPlannerOutput(
+    status="AMBIGUOUS",
+    reason="'best' is subjective",
+    questions=["Best by which metric?"],
+    objectives=["Compare local LLM runtimes"],
+    search_queries=["local llm runtime benchmark"],
+)
+
+
+class FakeFusedLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return VERDICT
+
+
+def in_thread(thread_id, fn):
+    return RunnableLambda(lambda _: fn()).invoke(None, config={"configurable": {"thread_id": thread_id}})
+
+
+def test_verdict_cache_is_scoped_to_the_thread(monkeypatch):
+    llm = FakeFusedLLM()
+    monkeypatch.setattr(planner, "fused_planner_llm", llm)
+    monkeypatch.setattr(planner, "get_plan_cache", lambda cache=TTLCache(MemoryBackend(), 3600, 100): cache)
+
+    in_thread("a", lambda: planner._fused_verdict("best local LLM"))
+    in_thread("a", lambda: planner._fused_verdict("Best  local LLM"))
+    assert llm.calls == 1  # the resumed thread reuses its verdict
+
+    in_thread("b", lambda: planner._fused_verdict("best local LLM"))
+    assert llm.calls == 2  # another user's thread asks again
+
+    planner._fused_verdict("best local LLM")
+    assert llm.calls == 3  # outside a graph run nothing is cached
+
+
+def test_clarification_interrupt_payload(monkeypatch):
+    payloads, speculated = [], []
+    monkeypatch.setattr(planner, "interrupt", lambda payload: payloads.append(payload) or {})
+    monkeypatch.setattr(planner, "speculate", lambda *args: speculated.append(args))
+
+    planner._fused_update(VERDICT, 0, "best local LLM")
+    assert payloads == [{
+        "type": "clarification",
+        "reason": "'best' is subjective",
+        "questions": ["Best by which metric?"],
+        "round": 1,
+    }]
+    assert speculated == []  # only a pausing run speculates
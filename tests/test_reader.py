@@ -0,0 +1,157 @@
+import asyncio
+import time
+
+import pytest
+
+import agents.reader as reader
+from tools.kv_cache import MemoryBackend, TTLCache
+
+SOURCES = [
+    {"url": f"https://site{i}.com/page", "title": f"Page {i}"} for i in range(4)
+]
+
+
+class FakeLLM:
+    """Structured-output stand-in: one fact per document, echoing its first words."""
+
+    def __init__(self, batch=False):
+        self.batch = batch
+        self.calls = 0
+
+    def _facts(self, text):
+        return [" ".join(text.split()[:4])]
+
+    def invoke(self, messages):
+        self.calls += 1
+        text = messages[-1].content
+        if not self.batch:
+            return reader.ExtractedFacts(facts=self._facts(text))
+        documents = text.split("<document id=\"")[1:]
+        return reader.BatchExtractedFacts(documents=[
+            reader.DocumentFacts(
+                document_id=int(d.split("\"", 1)[0]),
+                facts=self._facts(d.split(">", 1)[1].split("</document>")[0]),
+            )
+            for d in documents
+        ])
+
+    async def ainvoke(self, messages):
+        return self.invoke(messages)
+
+
+@pytest.fixture
+def env(monkeypatch):
+    cache = TTLCache(MemoryBackend(), ttl=3600, max_entries=1000)
+    pages = {s["url"]: f"Page {i} says the model has {i} billion parameters." for i, s in enumerate(SOURCES)}
+    notes = []
+
+    def fake_intern(kind, records):
+        records = list(records)
+        notes.extend(records)
+        return [f"{kind}:{n}" for n in range(len(records))]
+
+    monkeypatch.setattr(reader, "get_extraction_cache", lambda: cache)
+    monkeypatch.setattr(reader, "reader_llm", FakeLLM())
+    monkeypatch.setattr(reader, "batch_reader_llm", FakeLLM(batch=True))
+    monkeypatch.setattr(reader, "fetch_page_text", lambda url, max_chars=6000: pages.get(url, ""))
+
+    async def afetch_page_text(url, max_chars=6000):
+        return pages.get(url, "")
+
+    monkeypatch.setattr(reader, "afetch_page_text", afetch_page_text)
+    monkeypatch.setattr(reader, "resolve", lambda ids: [SOURCES[int(i)] for i in ids or []])
+    monkeypatch.setattr(reader, "intern", fake_intern)
+    return {"cache": cache, "pages": pages, "notes": notes}
+
+
+def run(agent, n=len(SOURCES)):
+    state = {"source_ids": [str(i) for i in range(n)]}
+    if asyncio.iscoroutinefunction(agent):
+        return asyncio.run(agent(state))
+    return agent(state)
+
+
+@pytest.mark.parametrize("agent", [reader.reader_agent, reader.areader_agent])
+def test_cache_hits_are_counted_per_run(env, agent, capsys):
+    # Hits recorded by other runs in the same process don't count
+    env["cache"].hits = 100
+    run(agent)
+    assert "Extraction cache saved 0 LLM calls" in capsys.readouterr().out
+
+    run(agent)
+    assert f"Extraction cache saved {len(SOURCES)} LLM calls" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("agent", [reader.reader_agent, reader.areader_agent])
+def test_research_tokens_count_only_text_sent_to_the_llm(env, agent):
+    page_tokens = sum(reader.count_tokens(text) for text in env["pages"].values())
+    assert run(agent)["research_tokens"] == page_tokens
+
+    # Everything is cached now
+    assert run(agent)["research_tokens"] == 0
+
+
+@pytest.mark.parametrize("agent", [reader.reader_agent, reader.areader_agent])
+def test_partial_batch_does_not_wait_for_slow_fetches(env, agent, monkeypatch):
+    monkeypatch.setattr(reader, "BATCH_MAX_WAIT_SECONDS", 0.05)
+    batch_calls, slow_done = [], []
+    batch_llm = reader.batch_reader_llm
+
+    def invoke(messages):
+        batch_calls.append(time.monotonic())
+        return FakeLLM.invoke(batch_llm, messages)
+
+    monkeypatch.setattr(batch_llm, "invoke", invoke)
+
+    def fetch_page_text(url, max_chars=6000):
+        if url == SOURCES[-1]["url"]:
+            time.sleep(0.5)
+            slow_done.append(time.monotonic())
+        return env["pages"][url]
+
+    async def afetch_page_text(url, max_chars=6000):
+        if url == SOURCES[-1]["url"]:
+            await asyncio.sleep(0.5)
+            slow_done.append(time.monotonic())
+        return env["pages"][url]
+
+    monkeypatch.setattr(reader, "fetch_page_text", fetch_page_text)
+    monkeypatch.setattr(reader, "afetch_page_text", afetch_page_text)
+
+    run(agent)
+    assert batch_calls and batch_calls[0] < slow_done[0]
+    assert len(env["notes"]) == len(SOURCES)
+
+
+@pytest.mark.parametrize("agent", [reader.reader_agent, reader.areader_agent])
+def test_failed_batch_is_retried_per_document(env, agent, monkeypatch):
+    def fail(messages):
+        raise RuntimeError("bad structured output")
+
+    monkeypatch.setattr(reader.batch_reader_llm, "invoke", fail)
+    run(agent)
+    assert [note["url"] for note in env["notes"]] == [s["url"] for s in SOURCES]
+    assert reader.reader_llm.calls == len(SOURCES)
+
+
+@pytest.mark.parametrize("agent", [reader.reader_agent, reader.areader_agent])
+def test_near_duplicates_keep_the_better_ranked_source(env, agent, monkeypatch):
+    article = "The official announcement says the model supports a context window of one million tokens."
+    env["pages"][SOURCES[0]["url"]] = article
+    env["pages"][SOURCES[2]["url"]] = article  # syndicated mirror
+
+    def fetch_page_text(url, max_chars=6000):
+        if url == SOURCES[0]["url"]:
+            time.sleep(0.2)  # the original arrives after its mirror
+        return env["pages"][url]
+
+    async def afetch_page_text(url, max_chars=6000):
+        if url == SOURCES[0]["url"]:
+            await asyncio.sleep(0.2)
+        return env["pages"][url]
+
+    monkeypatch.setattr(reader, "fetch_page_text", fetch_page_text)
+    monkeypatch.setattr(reader, "afetch_page_text", afetch_page_text)
+
+    run(agent)
+    assert [note["url"] for note in env["notes"]] == [SOURCES[i]["url"] for i in (0, 1, 3)]
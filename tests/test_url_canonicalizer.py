@@ -0,0 +1,18 @@
+from tools.url_canonicalizer import canonicalize_url
+
+
+def test_equivalent_urls_share_a_key():
+    assert canonicalize_url("http://www.Example.com:80/a/?utm_source=x&b=2&a=1#top") == \
+        canonicalize_url("https://example.com/a?a=1&b=2")
+
+
+def test_non_default_port_is_kept():
+    assert canonicalize_url("https://example.com:8443/a") == "https://example.com:8443/a"
+
+
+def test_malformed_port_keeps_netloc():
+    assert canonicalize_url("http://a.com:abc/") == "https://a.com:abc/"
+
+
+def test_unparseable_url_is_returned_unchanged():
+    assert canonicalize_url(" http://[::1/page ") == "http://[::1/page"
@@ -0,0 +1,71 @@
+from agents.verifier import _preverify, build_claim_groups
+from tools.verification_rules import (
+    CONFIDENCE_SINGLE_OFFICIAL,
+    CONFIDENCE_TWO_INDEPENDENT,
+    NEEDS_LLM,
+    UNCERTAIN,
+    VERIFIED,
+    classify_claim_group,
+    preclassify,
+)
+
+
+def item(fact, url, source_type="independent_blog"):
+    return {"fact": fact, "url": url, "title": url, "source_type": source_type}
+
+
+def source(url, source_type="independent_blog"):
+    return {"url": url, "title": url, "source_type": source_type}
+
+
+def test_agreeing_pair_is_verified():
+    groups = build_claim_groups([
+        item("Llama 3 supports function calling natively.", "https://a.com/x"),
+        item("Llama 3 supports function calling natively.", "https://b.com/y"),
+    ])
+    assert preclassify(groups) == [{"verdict": VERIFIED, "confidence": CONFIDENCE_TWO_INDEPENDENT}]
+
+
+def test_negated_pair_goes_to_llm():
+    # Regression: this pair used to be VERIFIED at 0.8 without an LLM call
+    decided, remaining = _preverify(build_claim_groups([
+        item("Llama 3 supports function calling natively.", "https://a.com/x"),
+        item("Llama 3 does not support function calling natively.", "https://b.com/y"),
+    ]))
+    assert decided.verified_facts == []
+    assert decided.uncertain_facts == []
+    assert len(remaining) == 2
+
+
+def test_disagreeing_variant_goes_to_llm():
+    group = {
+        "claim": "vLLM supports AWQ quantization.",
+        "variants": ["vLLM does not support AWQ quantization."],
+        "sources": [source("https://a.com/x"), source("https://b.com/y")],
+    }
+    assert classify_claim_group(group, contested=False) == {"verdict": NEEDS_LLM}
+
+
+def test_single_official_source():
+    group = {
+        "claim": "Gemini 2.5 Flash has a 1M token context window.",
+        "variants": [],
+        "sources": [source("https://ai.google.dev/models", "official")],
+    }
+    assert classify_claim_group(group, contested=False) == {
+        "verdict": VERIFIED, "confidence": CONFIDENCE_SINGLE_OFFICIAL,
+    }
+
+
+def test_single_blog_source_is_uncertain():
+    group = {"claim": "Mixtral runs on one A100.", "variants": [], "sources": [source("https://a.com/x")]}
+    assert classify_claim_group(group, contested=False) == {"verdict": UNCERTAIN}
+
+
+def test_related_but_different_claims_are_contested():
+    groups = build_claim_groups([
+        item("An H100 rents for about $2 per hour on RunPod.", "https://a.com/x", "official"),
+        item("An H100 rents for about $4 per hour on Lambda.", "https://b.com/y", "official"),
+    ])
+    assert len(groups) == 2
+    assert [d["verdict"] for d in preclassify(groups)] == [NEEDS_LLM, NEEDS_LLM]
@@ -0,0 +1,116 @@
+import re
+import threading
+from typing import List
+
+# tiktoken's cl100k is close enough to the reader model's tokenizer for
+# budgeting; without it (or its encoding files) fall back to ~4 chars/token
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+TOKENIZER_ENCODING = "cl100k_base"
+CHARS_PER_TOKEN = 4
+
+CHUNK_TOKENS = 1000
+CHUNK_OVERLAP_TOKENS = 100
+MAX_TOKENS_PER_SOURCE = 3000
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[A-Z0-9])")
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+
+    with _encoding_lock:
+        if not _encoding_loaded:
+            _encoding_loaded = True
+            if tiktoken is not None:
+                try:
+                    _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+                except Exception:
+                    _encoding = None
+
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s for s in _SENTENCE_BOUNDARY.split(text) if s.strip()]
+
+
+def _split_long_sentence(sentence: str, chunk_tokens: int) -> List[str]:
+    # Pages without punctuation (tables, lists) still need to fit a chunk
+    pieces, current, current_tokens = [], [], 0
+    for word in sentence.split():
+        word_tokens = count_tokens(word + " ")
+        if current and current_tokens + word_tokens > chunk_tokens:
+            pieces.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(word)
+        current_tokens += word_tokens
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def chunk_text(
+    text: str,
+    chunk_tokens: int = CHUNK_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+    max_tokens: int = MAX_TOKENS_PER_SOURCE,
+) -> List[str]:
+    """
+    Split `text` into chunks of at most `chunk_tokens` tokens on sentence
+    boundaries. Consecutive chunks share roughly `overlap_tokens` of
+    trailing sentences so facts spanning a boundary aren't cut in half.
+    Chunking stops once the chunks sent so far would exceed `max_tokens`,
+    which bounds the extraction cost of a single source.
+    """
+    sentences = []
+    for sentence in split_sentences(text):
+        tokens = count_tokens(sentence)
+        if tokens > chunk_tokens:
+            sentences.extend((p, count_tokens(p)) for p in _split_long_sentence(sentence, chunk_tokens))
+        else:
+            sentences.append((sentence, tokens))
+
+    chunks = []
+    spent = 0
+    current, current_tokens = [], 0
+    has_new = False  # current holds sentences not already sent as overlap
+
+    for sentence, tokens in sentences:
+        if has_new and current_tokens + tokens > chunk_tokens:
+            chunks.append(" ".join(s for s, _ in current))
+            spent += current_tokens
+
+            # Carry trailing sentences into the next chunk as overlap
+            overlap, overlap_size = [], 0
+            for s, t in reversed(current):
+                if overlap_size + t > overlap_tokens or overlap_size + t + tokens > chunk_tokens:
+                    break
+                overlap.insert(0, (s, t))
+                overlap_size += t
+            current, current_tokens, has_new = overlap, overlap_size, False
+
+        if spent + current_tokens + tokens > max_tokens:
+            break
+        current.append((sentence, tokens))
+        current_tokens += tokens
+        has_new = True
+
+    if has_new:
+        chunks.append(" ".join(s for s, _ in current))
+
+    return chunks
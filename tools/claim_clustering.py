@@ -0,0 +1,123 @@
+import re
+from typing import Dict, FrozenSet, List, Tuple
+
+from tools.text_similarity import cosine, tfidf_vectors
+
+TOPIC_SIMILARITY_THRESHOLD = 0.2
+CLAIM_SIMILARITY_THRESHOLD = 0.6
+
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+
+# "X supports Y" and "X does not support Y" are lexically almost the same
+# claim; these cues keep them apart
+_NEGATION = re.compile(
+    r"\b(?:not|no|never|none|nothing|neither|nor|cannot|without|lacks?|lacking)\b|n't\b",
+    re.IGNORECASE,
+)
+
+# Words that change what a claim commits to ("up to 2x", "only on Linux",
+# "may support")
+_QUALIFIER = re.compile(
+    r"\b(?:only|up to|at least|at most|more than|less than|fewer than|over|under|nearly|almost|"
+    r"approximately|about|roughly|around|some|all|most|partially|partly|fully|may|might|could|"
+    r"experimental|beta|preview|limited)\b",
+    re.IGNORECASE,
+)
+
+
+def claim_signature(text: str) -> Tuple[FrozenSet[str], bool, FrozenSet[str]]:
+    """The numbers, polarity and qualifiers a claim states."""
+    return (
+        frozenset(_NUMBER.findall(text)),
+        bool(_NEGATION.search(text)),
+        frozenset(q.lower() for q in _QUALIFIER.findall(text)),
+    )
+
+
+def claims_agree(a: str, b: str) -> bool:
+    """
+    Whether two wordings of a claim group commit to the same thing: same
+    numbers, same polarity, same qualifiers. Lexical similarity alone
+    can't tell "supports" from "does not support".
+    """
+    return claim_signature(a) == claim_signature(b)
+
+
+def _add(centroid: Dict[str, float], vector: Dict[str, float], size: int) -> Dict[str, float]:
+    merged = {term: w * size for term, w in centroid.items()}
+    for term, w in vector.items():
+        merged[term] = merged.get(term, 0.0) + w
+    return {term: w / (size + 1) for term, w in merged.items()}
+
+
+def _leader_cluster(texts: List[str], threshold: float) -> List[List[int]]:
+    vectors = tfidf_vectors(texts)
+    clusters: List[List[int]] = []
+    centroids: List[Dict[str, float]] = []
+
+    for i, vector in enumerate(vectors):
+        best, best_similarity = None, threshold
+        for c, centroid in enumerate(centroids):
+            similarity = cosine(vector, centroid)
+            if similarity >= best_similarity:
+                best, best_similarity = c, similarity
+
+        if best is None:
+            clusters.append([i])
+            centroids.append(vector)
+        else:
+            centroids[best] = _add(centroids[best], vector, len(clusters[best]))
+            clusters[best].append(i)
+
+    return clusters
+
+
+def cluster_by_topic(texts: List[str], threshold: float = TOPIC_SIMILARITY_THRESHOLD) -> List[List[int]]:
+    """
+    Single-pass leader clustering of `texts` on TF-IDF cosine similarity
+    to each cluster's centroid. Returns clusters as lists of indices into
+    `texts`, in order of first appearance.
+    """
+    return _leader_cluster(texts, threshold)
+
+
+def group_near_identical(texts: List[str], threshold: float = CLAIM_SIMILARITY_THRESHOLD) -> List[List[int]]:
+    """
+    Same clustering with a much tighter threshold: groups claims that
+    state the same thing in slightly different words. Claims only group
+    when they mention the same numbers and have the same polarity, so
+    "8B needs 16 GB" never merges with "70B needs 140 GB", nor "supports
+    X" with "does not support X".
+    """
+    partitions: Dict[tuple, List[int]] = {}
+    for i, text in enumerate(texts):
+        numbers, negated, _ = claim_signature(text)
+        partitions.setdefault((numbers, negated), []).append(i)
+
+    groups = []
+    for members in partitions.values():
+        for cluster in _leader_cluster([texts[i] for i in members], threshold):
+            groups.append([members[j] for j in cluster])
+
+    return sorted(groups, key=lambda g: g[0])
+
+
+def pack_clusters(clusters: List[List[int]], max_batch_size: int) -> List[List[int]]:
+    """
+    Pack clusters into batches of at most `max_batch_size` items without
+    splitting a cluster unless it is larger than a whole batch.
+    """
+    batches: List[List[int]] = []
+
+    # First-fit decreasing
+    for cluster in sorted(clusters, key=len, reverse=True):
+        for start in range(0, len(cluster), max_batch_size):
+            part = cluster[start:start + max_batch_size]
+            for batch in batches:
+                if len(batch) + len(part) <= max_batch_size:
+                    batch.extend(part)
+                    break
+            else:
+                batches.append(list(part))
+
+    return batches
@@ -0,0 +1,303 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+EVIDENCE_STORE_BACKEND = os.getenv("EVIDENCE_STORE_BACKEND", "sqlite")  # memory | sqlite
+STATE_DIR = os.getenv("RESEARCH_STATE_DIR", ".state")
+
+# Records must outlive every checkpoint that points at them; idle
+# threads are collected after 7 days (graph/checkpointer.py)
+EVIDENCE_TTL_SECONDS = 8 * 24 * 60 * 60
+EVIDENCE_REFRESH_SECONDS = 60 * 60  # re-putting a record pushes its expiry out at most this often
+EVIDENCE_GC_INTERVAL_SECONDS = 10 * 60
+EVIDENCE_MEMO_ENTRIES = 4096        # in-process LRU shared by every thread of a worker
+SQLITE_MAX_PARAMS = 500
+
+# State key holding ID lists -> the key consumers see once resolved
+EVIDENCE_KEYS = {
+    "source_ids": "sources",
+    "note_ids": "notes",
+    "verified_fact_ids": "verified_facts",
+    "conflict_ids": "conflicts",
+}
+
+
+def evidence_id(kind: str, record: Dict[str, Any]) -> str:
+    """
+    Content address of a record: equal records from any thread or run
+    share one ID and are stored once.
+    """
+    return _address(kind, _encode(record))
+
+
+def _encode(record: Dict[str, Any]) -> str:
+    return json.dumps(record, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _address(kind: str, body: str) -> str:
+    return f"{kind}:{hashlib.sha256(body.encode('utf-8')).hexdigest()[:20]}"
+
+
+# =========================
+# Backends
+# =========================
+# A backend stores immutable (id -> JSON) records with an expiry. A
+# networked KV store (Redis MGET/MSET with EXPIRE) fits the same three
+# methods.
+
+class MemoryEvidenceBackend:
+    def __init__(self):
+        self._data: Dict[str, tuple] = {}
+
+    def get_many(self, ids: List[str]) -> Dict[str, str]:
+        now = time.time()
+        return {i: self._data[i][0] for i in ids if i in self._data and self._data[i][1] >= now}
+
+    def put_many(self, items: Dict[str, str], expires_at: float):
+        for record_id, body in items.items():
+            self._data[record_id] = (body, expires_at)
+
+    def collect_garbage(self) -> int:
+        now = time.time()
+        expired = [i for i, (_, expires_at) in self._data.items() if expires_at < now]
+        for record_id in expired:
+            del self._data[record_id]
+        return len(expired)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteEvidenceBackend:
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS evidence (
+                id TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS evidence_expires_at ON evidence (expires_at)")
+        self._conn.commit()
+
+    def get_many(self, ids: List[str]) -> Dict[str, str]:
+        found = {}
+        now = time.time()
+        for start in range(0, len(ids), SQLITE_MAX_PARAMS):
+            batch = ids[start:start + SQLITE_MAX_PARAMS]
+            rows = self._conn.execute(
+                f"SELECT id, body FROM evidence WHERE expires_at >= ? AND id IN ({','.join('?' * len(batch))})",
+                (now, *batch),
+            )
+            found.update(rows)
+        return found
+
+    def put_many(self, items: Dict[str, str], expires_at: float):
+        self._conn.executemany(
+            """
+            INSERT INTO evidence (id, body, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET expires_at = excluded.expires_at
+            """,
+            [(record_id, body, expires_at) for record_id, body in items.items()],
+        )
+        self._conn.commit()
+
+    def collect_garbage(self) -> int:
+        deleted = self._conn.execute("DELETE FROM evidence WHERE expires_at < ?", (time.time(),)).rowcount
+        self._conn.commit()
+        return deleted
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM evidence").fetchone()[0]
+
+
+def make_evidence_backend(kind: str, state_dir: str):
+    if kind == "memory":
+        return MemoryEvidenceBackend()
+    if kind == "sqlite":
+        return SQLiteEvidenceBackend(os.path.join(state_dir, "evidence.sqlite"))
+    raise ValueError(f"Unknown evidence store backend: {kind}")
+
+
+# =========================
+# Store
+# =========================
+
+class EvidenceStore:
+    """
+    Content-addressed store for sources, notes, verified facts and
+    conflicts. Graph state carries only the IDs; consumers resolve them
+    when (and if) they need the records.
+    """
+
+    def __init__(self, backend, ttl: float = EVIDENCE_TTL_SECONDS, memo_entries: int = EVIDENCE_MEMO_ENTRIES):
+        self.backend = backend
+        self.ttl = ttl
+        self.memo_entries = memo_entries
+        self._memo: "OrderedDict[str, tuple]" = OrderedDict()  # id -> (JSON, written_at)
+        self._lock = threading.Lock()
+        self._last_gc = 0.0
+
+    def _remember(self, record_id: str, body: str, written_at: float):
+        self._memo[record_id] = (body, written_at)
+        self._memo.move_to_end(record_id)
+        while len(self._memo) > self.memo_entries:
+            self._memo.popitem(last=False)
+
+    def put_many(self, kind: str, records: Iterable[Dict[str, Any]]) -> List[str]:
+        """Intern `records` and return their IDs in order."""
+        ids, pending = [], {}
+        now = time.time()
+
+        with self._lock:
+            for record in records:
+                body = _encode(record)
+                record_id = _address(kind, body)
+                ids.append(record_id)
+
+                memo = self._memo.get(record_id)
+                if memo is None or now - memo[1] > EVIDENCE_REFRESH_SECONDS:
+                    pending[record_id] = body
+                else:
+                    self._memo.move_to_end(record_id)
+
+            if pending:
+                self.backend.put_many(pending, now + self.ttl)
+                for record_id, body in pending.items():
+                    self._remember(record_id, body, now)
+
+            self._maybe_collect_garbage(now)
+
+        return ids
+
+    def put(self, kind: str, record: Dict[str, Any]) -> str:
+        return self.put_many(kind, [record])[0]
+
+    def resolve(self, ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        Records for `ids` in order. IDs whose record has expired are
+        skipped with a warning rather than failing the run.
+        """
+        ids = list(ids)
+        bodies = {}
+
+        with self._lock:
+            missing = []
+            for record_id in ids:
+                memo = self._memo.get(record_id)
+                if memo is None:
+                    missing.append(record_id)
+                else:
+                    self._memo.move_to_end(record_id)
+                    bodies[record_id] = memo[0]
+
+            if missing:
+                found = self.backend.get_many(list(dict.fromkeys(missing)))
+                for record_id, body in found.items():
+                    # Unknown write time: let the next put refresh the expiry
+                    self._remember(record_id, body, 0.0)
+                bodies.update(found)
+
+        lost = [record_id for record_id in ids if record_id not in bodies]
+        if lost:
+            print(f"[WARN] Evidence store: {len(lost)} record(s) missing or expired, e.g. {lost[0]}")
+
+        return [json.loads(bodies[record_id]) for record_id in ids if record_id in bodies]
+
+    def iter_resolve(self, ids: Iterable[str], batch_size: int = 64) -> Iterator[Dict[str, Any]]:
+        """Resolve lazily, `batch_size` records per backend round trip."""
+        ids = list(ids)
+        for start in range(0, len(ids), batch_size):
+            yield from self.resolve(ids[start:start + batch_size])
+
+    def _maybe_collect_garbage(self, now: float):
+        if now - self._last_gc < EVIDENCE_GC_INTERVAL_SECONDS:
+            return
+        self._last_gc = now
+        deleted = self.backend.collect_garbage()
+        if deleted:
+            print(f"[DEBUG] Evidence store: removed {deleted} expired records")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self.backend), "memo_entries": len(self._memo)}
+
+
+_evidence_store: Optional[EvidenceStore] = None
+_evidence_store_lock = threading.Lock()
+
+
+def get_evidence_store() -> EvidenceStore:
+    global _evidence_store
+
+    with _evidence_store_lock:
+        if _evidence_store is None:
+            _evidence_store = EvidenceStore(make_evidence_backend(EVIDENCE_STORE_BACKEND, STATE_DIR))
+
+    return _evidence_store
+
+
+# =========================
+# Resolvers
+# =========================
+
+def intern(kind: str, records: Iterable[Dict[str, Any]]) -> List[str]:
+    return get_evidence_store().put_many(kind, records)
+
+
+def resolve(ids: Optional[Iterable[str]]) -> List[Dict[str, Any]]:
+    return get_evidence_store().resolve(ids or [])
+
+
+class EvidenceView(Sequence):
+    """
+    Read-only list over evidence IDs that loads the records on first
+    access. len() and bool() load them too, since expired IDs are
+    skipped and the view must agree with what iteration yields. `model`
+    (a pydantic class) rebuilds typed records such as VerifiedFact.
+    """
+
+    def __init__(self, ids: Optional[Iterable[str]], model=None):
+        self.ids = list(ids or [])
+        self.model = model
+        self._records = None
+
+    def _load(self):
+        if self._records is None:
+            records = resolve(self.ids)
+            self._records = [self.model.model_validate(r) for r in records] if self.model else records
+        return self._records
+
+    def __getitem__(self, index):
+        return self._load()[index]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load()) if self.ids else 0
+
+    def __bool__(self):
+        return len(self) > 0
+
+
+def resolve_state(values: Dict[str, Any]) -> Dict[str, Any]:
+    """A copy of `values` with every evidence ID list replaced by its records."""
+    resolved = dict(values)
+    for ids_key, key in EVIDENCE_KEYS.items():
+        if ids_key in values:
+            resolved[key] = resolve(resolved.pop(ids_key))
+    return resolved
@@ -0,0 +1,40 @@
+import hashlib
+import os
+import threading
+from typing import Optional
+
+from tools.kv_cache import TTLCache, make_backend
+
+EXTRACTION_CACHE_BACKEND = os.getenv("EXTRACTION_CACHE_BACKEND", "sqlite")  # memory | sqlite | dbm
+EXTRACTION_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+EXTRACTION_CACHE_MAX_ENTRIES = 50000
+
+
+def extraction_cache_key(model: str, system_prompt: str, text: str) -> str:
+    """
+    Extraction output depends only on the model, the prompt and the text,
+    so any change to one of them is a different entry.
+    """
+    digest = hashlib.sha256()
+    for part in (model, system_prompt, text):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+_extraction_cache: Optional[TTLCache] = None
+_extraction_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> TTLCache:
+    global _extraction_cache
+
+    with _extraction_cache_lock:
+        if _extraction_cache is None:
+            _extraction_cache = TTLCache(
+                make_backend(EXTRACTION_CACHE_BACKEND, "extractions"),
+                ttl=EXTRACTION_CACHE_TTL_SECONDS,
+                max_entries=EXTRACTION_CACHE_MAX_ENTRIES,
+            )
+
+    return _extraction_cache
@@ -0,0 +1,201 @@
+import os
+import re
+from typing import Callable, Dict
+
+from bs4 import BeautifulSoup
+
+# Optional fast parsers; the BeautifulSoup engine is always available
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+HTML_EXTRACTOR = os.getenv("HTML_EXTRACTOR", "auto")  # auto | selectolax | lxml | bs4
+
+# Never content
+NON_CONTENT_TAGS = ["script", "style", "noscript", "template", "svg", "iframe"]
+
+# Page chrome, dropped when main-content detection is on
+BOILERPLATE_TAGS = ["nav", "header", "footer", "aside", "form", "button", "dialog"]
+
+# Matched against whole class/id tokens. A compound token ("cookie-banner",
+# "nav_menu") counts only if every part is a boilerplate word, so state
+# classes such as "has-sidebar" or "comments-open" never match.
+BOILERPLATE_WORD = re.compile(
+    r"nav|navbar|menu|breadcrumbs?|sidebar|footer|header|masthead|cookies?|consent|"
+    r"banner|share|social|comments?|related|recommended|promo|ads?|advert\w*|"
+    r"sponsored|newsletter|subscribe|signup|popup|modal|toc",
+    re.IGNORECASE,
+)
+
+# Containers that usually hold the article body, in order of preference
+MAIN_CONTENT_SELECTORS = ["main", "article", "[role=main]", "#content", "#main-content"]
+MAIN_CONTENT_XPATHS = [
+    "//main", "//article", "//*[@role='main']", "//*[@id='content']", "//*[@id='main-content']",
+]
+MIN_MAIN_CONTENT_CHARS = 200
+
+# Elements whose class/id must never cause removal of the whole page
+PROTECTED_TAGS = {"html", "body", "main", "article"}
+
+_WHITESPACE = re.compile(r"\s+")
+_TOKEN_PARTS = re.compile(r"[_-]+")
+
+
+def _clean(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _is_boilerplate_token(token: str) -> bool:
+    parts = [p for p in _TOKEN_PARTS.split(token) if p]
+    return bool(parts) and all(BOILERPLATE_WORD.fullmatch(p) for p in parts)
+
+
+def _is_boilerplate(tag: str, attrs) -> bool:
+    if tag in PROTECTED_TAGS:
+        return False
+    marker = f"{attrs.get('class') or ''} {attrs.get('id') or ''}"
+    return any(_is_boilerplate_token(token) for token in marker.split())
+
+
+# =========================
+# Engines
+# =========================
+
+def _extract_selectolax(html: str, main_content: bool) -> str:
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(NON_CONTENT_TAGS)
+
+    if main_content:
+        # Never drop a wrapper that holds the article itself
+        for node in tree.css(", ".join(BOILERPLATE_TAGS)):
+            if node.css_first("main, article") is None:
+                node.decompose()
+        for node in tree.css("[class], [id]"):
+            if _is_boilerplate(node.tag, node.attributes) and node.css_first("main, article") is None:
+                node.decompose()
+
+        for selector in MAIN_CONTENT_SELECTORS:
+            node = tree.css_first(selector)
+            if node is not None:
+                text = _clean(node.text(separator=" "))
+                if len(text) >= MIN_MAIN_CONTENT_CHARS:
+                    return text
+
+    root = tree.body or tree.root
+    return _clean(root.text(separator=" ")) if root is not None else ""
+
+
+def _extract_lxml(html: str, main_content: bool) -> str:
+    try:
+        root = lxml.html.document_fromstring(html)
+    except Exception:
+        return ""
+
+    for el in root.xpath("|".join(f"//{tag}" for tag in NON_CONTENT_TAGS)):
+        el.drop_tree()
+
+    if main_content:
+        # Never drop a wrapper that holds the article itself
+        for el in root.xpath("|".join(f"//{tag}" for tag in BOILERPLATE_TAGS)):
+            if not el.xpath(".//main|.//article"):
+                el.drop_tree()
+        for el in root.xpath("//*[@class or @id]"):
+            if (
+                el.getparent() is not None
+                and _is_boilerplate(el.tag, el.attrib)
+                and not el.xpath(".//main|.//article")
+            ):
+                el.drop_tree()
+
+        for xpath in MAIN_CONTENT_XPATHS:
+            matches = root.xpath(xpath)
+            if matches:
+                text = _clean(" ".join(matches[0].itertext()))
+                if len(text) >= MIN_MAIN_CONTENT_CHARS:
+                    return text
+
+    body = root.find("body")
+    return _clean(" ".join((body if body is not None else root).itertext()))
+
+
+def _extract_bs4(html: str, main_content: bool) -> str:
+    soup = BeautifulSoup(html, "html.parser")
+
+    for tag in soup(NON_CONTENT_TAGS):
+        tag.decompose()
+
+    if main_content:
+        # Never drop a wrapper that holds the article itself
+        for tag in soup(BOILERPLATE_TAGS):
+            if not tag.decomposed and tag.find(["main", "article"]) is None:
+                tag.decompose()
+        for tag in soup.find_all(lambda t: t.has_attr("class") or t.has_attr("id")):
+            if tag.decomposed:
+                continue
+            attrs = {
+                "class": " ".join(tag.get("class", [])),
+                "id": tag.get("id"),
+            }
+            if _is_boilerplate(tag.name, attrs) and tag.find(["main", "article"]) is None:
+                tag.decompose()
+
+        for selector in MAIN_CONTENT_SELECTORS:
+            node = soup.select_one(selector)
+            if node is not None:
+                text = _clean(node.get_text(separator=" "))
+                if len(text) >= MIN_MAIN_CONTENT_CHARS:
+                    return text
+
+    return _clean(soup.get_text(separator=" "))
+
+
+ENGINES: Dict[str, Callable[[str, bool], str]] = {"bs4": _extract_bs4}
+if lxml is not None:
+    ENGINES["lxml"] = _extract_lxml
+if LexborHTMLParser is not None:
+    ENGINES["selectolax"] = _extract_selectolax
+
+
+def _configured_engine(name: str) -> str:
+    # fetch_page_text turns extraction errors into empty pages, so an
+    # engine that isn't installed would otherwise blank every page
+    if name != "auto" and name not in ENGINES:
+        print(f"[WARN] HTML_EXTRACTOR={name} is not available, using auto ({', '.join(sorted(ENGINES))} installed)")
+        return "auto"
+    return name
+
+
+HTML_EXTRACTOR = _configured_engine(HTML_EXTRACTOR)
+
+
+def default_engine() -> str:
+    if HTML_EXTRACTOR != "auto":
+        return HTML_EXTRACTOR
+    for name in ("selectolax", "lxml", "bs4"):
+        if name in ENGINES:
+            return name
+
+
+def extract_text(html: str, engine: str = None, main_content: bool = True) -> str:
+    """
+    Convert an HTML document to plain text.
+
+    With `main_content` on, page chrome (nav bars, headers, footers, cookie
+    banners, share widgets, ...) is dropped and the main/article container
+    is preferred when it holds enough text. If stripping leaves less than
+    MIN_MAIN_CONTENT_CHARS, the unstripped body text is returned instead.
+    """
+    name = engine or default_engine()
+    if name not in ENGINES:
+        raise ValueError(f"HTML extractor '{name}' is not available")
+
+    text = ENGINES[name](html, main_content)
+    if main_content and len(text) < MIN_MAIN_CONTENT_CHARS:
+        return ENGINES[name](html, False)
+    return text
@@ -0,0 +1,254 @@
+import asyncio
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.request import ACCEPT_ENCODING
+
+from tools.telemetry import span
+
+# Connection pooling
+MAX_HOST_POOLS = 32          # number of per-host pools kept alive
+MAX_CONNECTIONS_PER_HOST = 4 # concurrent connections to a single host
+MAX_TRACKED_HOSTS = 256      # async per-host limiters kept per event loop
+
+# Request limits
+CONNECT_TIMEOUT_SECONDS = 5
+READ_TIMEOUT_SECONDS = 10
+MAX_REDIRECTS = 5
+MAX_RESPONSE_BYTES = 2 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; DeepResearchAgent/1.0)",
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.5",
+    # Only advertise encodings urllib3 can actually decode here (br/zstd
+    # are included when brotli/zstandard are installed)
+    "Accept-Encoding": ACCEPT_ENCODING,
+}
+
+
+@dataclass
+class FetchResponse:
+    url: str
+    status_code: int
+    # Header names are case-insensitive; HTTP/2 servers send them lowercase
+    headers: CaseInsensitiveDict = field(default_factory=CaseInsensitiveDict)
+    content: bytes = b""
+    encoding: Optional[str] = None
+    truncated: bool = False
+
+    def __post_init__(self):
+        if not isinstance(self.headers, CaseInsensitiveDict):
+            self.headers = CaseInsensitiveDict(self.headers)
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Shared keep-alive session used by every page fetch.
+    """
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=MAX_HOST_POOLS,
+                pool_maxsize=MAX_CONNECTIONS_PER_HOST,
+                pool_block=True,  # wait for a free connection instead of opening extras
+                max_retries=0,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            session.max_redirects = MAX_REDIRECTS
+            _session = session
+
+    return _session
+
+
+def fetch(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    max_bytes: int = MAX_RESPONSE_BYTES,
+) -> FetchResponse:
+    """
+    GET `url` through the shared session, streaming the body and
+    stopping once `max_bytes` of decoded content have been read.
+    """
+    with span("http.fetch", "http", **{
+        "http.url": url,
+        "http.conditional": bool(headers),
+    }) as s, get_session().get(
+        url,
+        headers=headers,
+        timeout=(CONNECT_TIMEOUT_SECONDS, READ_TIMEOUT_SECONDS),
+        stream=True,
+    ) as response:
+        chunks = []
+        size = 0
+        truncated = False
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= max_bytes:
+                truncated = True
+                break
+
+        s.set(**{
+            "http.status_code": response.status_code,
+            "http.response_bytes": min(size, max_bytes),
+            "http.truncated": truncated,
+            "http.redirects": len(response.history),
+        })
+
+        return FetchResponse(
+            url=response.url,
+            status_code=response.status_code,
+            headers=CaseInsensitiveDict(response.headers),
+            content=b"".join(chunks)[:max_bytes],
+            encoding=response.encoding,
+            truncated=truncated,
+        )
+
+
+# =========================
+# Async client
+# =========================
+
+class _HostSlots:
+    """
+    Per-host semaphores applying MAX_CONNECTIONS_PER_HOST on one event
+    loop. Only the MAX_TRACKED_HOSTS most recently used hosts keep a
+    semaphore; idle ones beyond that are forgotten.
+    """
+
+    def __init__(self, per_host: int = MAX_CONNECTIONS_PER_HOST, max_hosts: int = MAX_TRACKED_HOSTS):
+        self.per_host = per_host
+        self.max_hosts = max_hosts
+        self._slots: "OrderedDict[str, asyncio.Semaphore]" = OrderedDict()
+        self._users: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def hold(self, host: str):
+        slot = self._slots.get(host)
+        if slot is None:
+            slot = self._slots[host] = asyncio.Semaphore(self.per_host)
+        self._slots.move_to_end(host)
+        self._users[host] = self._users.get(host, 0) + 1
+        try:
+            async with slot:
+                yield
+        finally:
+            self._users[host] -= 1
+            if not self._users[host]:
+                del self._users[host]
+            self._prune()
+
+    def _prune(self):
+        # A semaphore still held or awaited must survive, or its host
+        # would briefly get a second, independent limit
+        for host in list(self._slots):
+            if len(self._slots) <= self.max_hosts:
+                break
+            if host not in self._users:
+                del self._slots[host]
+
+    def __len__(self):
+        return len(self._slots)
+
+
+# httpx clients are bound to the event loop they were first used on
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = weakref.WeakKeyDictionary()
+
+
+async def _close_on_loop_shutdown(client: httpx.AsyncClient):
+    # asyncio.run() and loop.shutdown_asyncgens() finalize pending async
+    # generators before the loop closes; that is when the client goes
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+async def get_async_client() -> Tuple[httpx.AsyncClient, _HostSlots]:
+    """
+    Shared keep-alive client for the running event loop, plus per-host
+    semaphores that apply the same per-host connection cap as the sync
+    session (httpx only limits the pool as a whole). The client is
+    closed when the loop shuts down.
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _async_clients:
+        client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            timeout=httpx.Timeout(READ_TIMEOUT_SECONDS, connect=CONNECT_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=MAX_HOST_POOLS * MAX_CONNECTIONS_PER_HOST,
+                max_keepalive_connections=MAX_HOST_POOLS,
+            ),
+            follow_redirects=True,
+            max_redirects=MAX_REDIRECTS,
+        )
+        closer = _close_on_loop_shutdown(client)
+        _async_clients[loop] = (client, _HostSlots(), closer)  # the loop only holds async generators weakly
+        await closer.asend(None)
+
+    client, host_slots, _ = _async_clients[loop]
+    return client, host_slots
+
+
+async def afetch(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    max_bytes: int = MAX_RESPONSE_BYTES,
+) -> FetchResponse:
+    """Async fetch(): same limits and response, without holding a thread."""
+    client, host_slots = await get_async_client()
+
+    with span("http.fetch", "http", **{
+        "http.url": url,
+        "http.conditional": bool(headers),
+    }) as s:
+        async with host_slots.hold(urlsplit(url).hostname or ""), client.stream("GET", url, headers=headers) as response:
+            chunks = []
+            size = 0
+            truncated = False
+            async for chunk in response.aiter_bytes(chunk_size=CHUNK_SIZE):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= max_bytes:
+                    truncated = True
+                    break
+
+            s.set(**{
+                "http.status_code": response.status_code,
+                "http.response_bytes": min(size, max_bytes),
+                "http.truncated": truncated,
+                "http.redirects": len(response.history),
+            })
+
+            return FetchResponse(
+                url=str(response.url),
+                status_code=response.status_code,
+                headers=CaseInsensitiveDict(response.headers),
+                content=b"".join(chunks)[:max_bytes],
+                encoding=response.charset_encoding,
+                truncated=truncated,
+            )
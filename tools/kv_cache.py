@@ -0,0 +1,204 @@
+import dbm
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+CACHE_DIR = os.getenv("RESEARCH_CACHE_DIR", ".cache")
+
+
+# =========================
+# Backends
+# =========================
+# A backend stores (value, expires_at) pairs for string keys and keeps
+# itself under `max_entries` by dropping the least recently used keys.
+
+class MemoryBackend:
+    def __init__(self):
+        self._data: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        item = self._data.get(key)
+        if item is not None:
+            self._data.move_to_end(key)
+        return item
+
+    def set(self, key: str, value: str, expires_at: float):
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+
+    def delete(self, key: str):
+        self._data.pop(key, None)
+
+    def evict(self, max_entries: int):
+        while len(self._data) > max_entries:
+            self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteBackend:
+    def __init__(self, path: str, table: str = "kv"):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._table = table
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_last_access ON {table} (last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        row = self._conn.execute(
+            f"SELECT value, expires_at FROM {self._table} WHERE key = ?", (key,)
+        ).fetchone()
+        if row is not None:
+            self._conn.execute(
+                f"UPDATE {self._table} SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        return row
+
+    def set(self, key: str, value: str, expires_at: float):
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO {self._table} VALUES (?, ?, ?, ?)",
+            (key, value, expires_at, time.time()),
+        )
+        self._conn.commit()
+
+    def delete(self, key: str):
+        self._conn.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+        self._conn.commit()
+
+    def evict(self, max_entries: int):
+        # Expired rows go first, then least recently used
+        self._conn.execute(f"DELETE FROM {self._table} WHERE expires_at < ?", (time.time(),))
+        self._conn.execute(
+            f"""
+            DELETE FROM {self._table} WHERE key IN (
+                SELECT key FROM {self._table} ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (max_entries,),
+        )
+        self._conn.commit()
+
+    def __len__(self):
+        return self._conn.execute(f"SELECT COUNT(*) FROM {self._table}").fetchone()[0]
+
+
+class DbmBackend:
+    """
+    Local key-value store (stdlib dbm) standing in for a networked KV
+    server such as Redis; swap it out by providing the same methods.
+    """
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = dbm.open(path, "c")
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        raw = self._db.get(key)
+        if raw is None:
+            return None
+        item = json.loads(raw)
+        item["last_access"] = time.time()
+        self._db[key] = json.dumps(item)
+        return item["value"], item["expires_at"]
+
+    def set(self, key: str, value: str, expires_at: float):
+        self._db[key] = json.dumps(
+            {"value": value, "expires_at": expires_at, "last_access": time.time()}
+        )
+
+    def delete(self, key: str):
+        if key in self._db:
+            del self._db[key]
+
+    def evict(self, max_entries: int):
+        keys = list(self._db.keys())
+        if len(keys) <= max_entries:
+            return
+        by_age = sorted(keys, key=lambda k: json.loads(self._db[k])["last_access"])
+        for key in by_age[: len(keys) - max_entries]:
+            del self._db[key]
+
+    def __len__(self):
+        return len(self._db)
+
+
+def make_backend(kind: str, name: str):
+    """
+    Build a backend by name: "memory", "sqlite" or "dbm".
+    File-backed stores live under CACHE_DIR as `<name>.sqlite` / `<name>.dbm`.
+    """
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "sqlite":
+        return SQLiteBackend(os.path.join(CACHE_DIR, f"{name}.sqlite"))
+    if kind == "dbm":
+        return DbmBackend(os.path.join(CACHE_DIR, f"{name}.dbm"))
+    raise ValueError(f"Unknown cache backend: {kind}")
+
+
+# =========================
+# TTL cache
+# =========================
+
+class TTLCache:
+    """
+    JSON-valued cache with a TTL and an entry bound over any backend.
+    Tracks hits and misses for reporting.
+    """
+
+    def __init__(self, backend, ttl: float, max_entries: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self.backend.get(key)
+
+            if item is None or item[1] < time.time():
+                if item is not None:
+                    self.backend.delete(key)
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return json.loads(item[0])
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self.backend.set(key, json.dumps(value), time.time() + self.ttl)
+            self.backend.evict(self.max_entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self.backend),
+            }
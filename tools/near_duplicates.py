@@ -0,0 +1,75 @@
+import hashlib
+import heapq
+import re
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+SHINGLE_WORDS = 5
+SKETCH_SIZE = 128
+NEAR_DUPLICATE_THRESHOLD = 0.85
+
+_WORD = re.compile(r"\w+")
+
+
+def minhash_sketch(text: str, shingle_words: int = SHINGLE_WORDS, size: int = SKETCH_SIZE) -> FrozenSet[int]:
+    """
+    Bottom-k MinHash sketch: the `size` smallest hashes of the text's
+    word shingles. Two sketches estimate the Jaccard similarity of the
+    underlying shingle sets.
+    """
+    words = _WORD.findall(text.lower())
+    if len(words) < shingle_words:
+        shingles = {" ".join(words)} if words else set()
+    else:
+        shingles = {
+            " ".join(words[i:i + shingle_words])
+            for i in range(len(words) - shingle_words + 1)
+        }
+
+    hashes = (
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+        for s in shingles
+    )
+    return frozenset(heapq.nsmallest(size, hashes))
+
+
+def estimate_similarity(a: FrozenSet[int], b: FrozenSet[int], size: int = SKETCH_SIZE) -> float:
+    if not a or not b:
+        return 0.0
+    union_sketch = set(heapq.nsmallest(size, a | b))
+    return len(union_sketch & a & b) / len(union_sketch)
+
+
+class NearDuplicateIndex:
+    """
+    Remembers sketches of accepted documents and reports when a new
+    document is a near copy (syndicated article, mirror, print view) of
+    one of them.
+
+    Keys are ranks: of a set of near copies the lowest key is kept, in
+    whatever order the documents are added.
+    """
+
+    def __init__(self, threshold: float = NEAR_DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self._sketches: Dict[Any, FrozenSet[int]] = {}
+
+    def add(self, key, text: str) -> Tuple[Optional[Any], List[Any]]:
+        """
+        Index `text` under `key` unless a lower-ranked near duplicate is
+        already indexed. Returns (that duplicate's key or None, keys of
+        higher-ranked near duplicates `key` displaced).
+        """
+        sketch = minhash_sketch(text)
+        matches = [
+            other_key for other_key, other_sketch in self._sketches.items()
+            if estimate_similarity(sketch, other_sketch) >= self.threshold
+        ]
+
+        better = [other_key for other_key in matches if other_key < key]
+        if better:
+            return min(better), []
+
+        for other_key in matches:
+            del self._sketches[other_key]
+        self._sketches[key] = sketch
+        return None, sorted(matches)
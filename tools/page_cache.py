@@ -0,0 +1,166 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from tools.kv_cache import CACHE_DIR
+from tools.url_canonicalizer import canonicalize_url
+
+PAGE_CACHE_PATH = os.path.join(CACHE_DIR, "pages.sqlite")
+PAGE_TTL_SECONDS = 24 * 60 * 60
+PAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+PAGE_CACHE_MAX_ENTRIES = 20000
+
+
+@dataclass
+class CachedPage:
+    url: str
+    text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.fetched_at < ttl
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _key(url: str) -> str:
+    return hashlib.sha256(canonicalize_url(url).encode("utf-8")).hexdigest()
+
+
+class PageCache:
+    """
+    On-disk cache of extracted page text keyed by canonical URL.
+
+    Entries younger than `ttl` are served directly; older entries keep their
+    ETag / Last-Modified validators so the caller can revalidate with a
+    conditional GET. Least recently used entries are evicted once the cache
+    grows past `max_bytes` or `max_entries`.
+    """
+
+    def __init__(
+        self,
+        path: str = PAGE_CACHE_PATH,
+        ttl: float = PAGE_TTL_SECONDS,
+        max_bytes: int = PAGE_CACHE_MAX_BYTES,
+        max_entries: int = PAGE_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                text TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access)")
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, text, etag, last_modified, fetched_at FROM pages WHERE key = ?",
+                (_key(url),),
+            ).fetchone()
+            if row is None:
+                return None
+
+            page = CachedPage(*row)
+
+            # Expired and nothing to revalidate with → useless
+            if not page.is_fresh(self.ttl) and not (page.etag or page.last_modified):
+                self._conn.execute("DELETE FROM pages WHERE key = ?", (_key(url),))
+                self._conn.commit()
+                return None
+
+            self._conn.execute(
+                "UPDATE pages SET last_access = ? WHERE key = ?", (time.time(), _key(url))
+            )
+            self._conn.commit()
+            return page
+
+    def put(
+        self,
+        url: str,
+        text: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (_key(url), canonicalize_url(url), text, etag, last_modified, now, now,
+                 len(text.encode("utf-8"))),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, url: str):
+        """Mark an entry as freshly validated (e.g. after a 304)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET fetched_at = ?, last_access = ? WHERE key = ?",
+                (now, now, _key(url)),
+            )
+            self._conn.commit()
+
+    def _evict(self):
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages"
+        ).fetchone()
+
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT key, size FROM pages ORDER BY last_access ASC"
+        ).fetchall()
+
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+
+
+_page_cache: Optional[PageCache] = None
+_page_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> PageCache:
+    global _page_cache
+
+    with _page_cache_lock:
+        if _page_cache is None:
+            _page_cache = PageCache()
+
+    return _page_cache
@@ -0,0 +1,42 @@
+import hashlib
+import os
+import threading
+from typing import Optional
+
+from tools.kv_cache import TTLCache, make_backend
+
+PLAN_CACHE_BACKEND = os.getenv("PLAN_CACHE_BACKEND", "sqlite")  # memory | sqlite | dbm
+PLAN_CACHE_TTL_SECONDS = 24 * 60 * 60
+PLAN_CACHE_MAX_ENTRIES = 10000
+
+
+def plan_cache_key(model: str, system_prompt: str, query: str, thread_id: str) -> str:
+    """
+    A planner verdict depends on the model, the prompt and the (clarified)
+    query; case and spacing of the query don't change it. Entries are
+    scoped to one research thread: the cache exists so a resumed thread
+    doesn't ask again, not to pin one verdict on every user of a query.
+    """
+    digest = hashlib.sha256()
+    for part in (model, system_prompt, " ".join(query.lower().split()), str(thread_id)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+_plan_cache: Optional[TTLCache] = None
+_plan_cache_lock = threading.Lock()
+
+
+def get_plan_cache() -> TTLCache:
+    global _plan_cache
+
+    with _plan_cache_lock:
+        if _plan_cache is None:
+            _plan_cache = TTLCache(
+                make_backend(PLAN_CACHE_BACKEND, "plans"),
+                ttl=PLAN_CACHE_TTL_SECONDS,
+                max_entries=PLAN_CACHE_MAX_ENTRIES,
+            )
+
+    return _plan_cache
@@ -0,0 +1,43 @@
+import hashlib
+import os
+import re
+import threading
+from typing import Optional
+
+from tools.kv_cache import TTLCache, make_backend
+
+SEARCH_CACHE_BACKEND = os.getenv("SEARCH_CACHE_BACKEND", "sqlite")  # memory | sqlite | dbm
+SEARCH_CACHE_TTL_SECONDS = 6 * 60 * 60
+SEARCH_CACHE_MAX_ENTRIES = 5000
+
+
+def normalize_query(query: str) -> str:
+    """
+    Case, punctuation, whitespace and word order don't change what we
+    want back from the search API, so they don't change the key either.
+    """
+    words = re.findall(r"\w+", query.lower())
+    return " ".join(sorted(words))
+
+
+def search_cache_key(query: str, max_results: int) -> str:
+    raw = f"{normalize_query(query)}|{max_results}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+_search_cache: Optional[TTLCache] = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> TTLCache:
+    global _search_cache
+
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = TTLCache(
+                make_backend(SEARCH_CACHE_BACKEND, "search"),
+                ttl=SEARCH_CACHE_TTL_SECONDS,
+                max_entries=SEARCH_CACHE_MAX_ENTRIES,
+            )
+
+    return _search_cache
@@ -0,0 +1,88 @@
+import asyncio
+from concurrent.futures import wait
+from typing import Any, Dict, List
+
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+
+from tools.web_search import aweb_search, web_search
+
+MAX_SEARCH_WORKERS = 4
+QUERY_TIMEOUT_SECONDS = 15
+BATCH_DEADLINE_SECONDS = 30
+
+
+def _collect_results(queries: List[str], futures, done) -> List[List[Dict[str, Any]]]:
+    # Works for thread-pool futures and asyncio tasks alike
+    results = []
+    for query, future in zip(queries, futures):
+        if future not in done:
+            print(f"[WARN] Search deadline exceeded for query: {query}")
+            results.append([])
+            continue
+
+        try:
+            results.append(future.result())
+        except Exception as e:
+            print(f"[WARN] Search failed for query: {query} ({e})")
+            results.append([])
+
+    return results
+
+
+def run_searches(
+    queries: List[str],
+    max_results: int = 5,
+    max_workers: int = MAX_SEARCH_WORKERS,
+    query_timeout: float = QUERY_TIMEOUT_SECONDS,
+    batch_deadline: float = BATCH_DEADLINE_SECONDS,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Run web_search for every query on a bounded thread pool.
+
+    Returns one result list per query, in the same order as `queries`.
+    A query that fails or is still running when the batch deadline
+    expires contributes an empty list instead of failing the batch.
+    """
+    if not queries:
+        return []
+
+    pool = ContextThreadPoolExecutor(max_workers=max(1, min(max_workers, len(queries))))
+    futures = [
+        pool.submit(web_search, query=query, max_results=max_results, timeout=query_timeout)
+        for query in queries
+    ]
+
+    done, _ = wait(futures, timeout=batch_deadline)
+    # Don't block on stragglers past the deadline
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    return _collect_results(queries, futures, done)
+
+
+async def arun_searches(
+    queries: List[str],
+    max_results: int = 5,
+    max_workers: int = MAX_SEARCH_WORKERS,
+    query_timeout: float = QUERY_TIMEOUT_SECONDS,
+    batch_deadline: float = BATCH_DEADLINE_SECONDS,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Async run_searches(): same ordering, deadline and failure handling,
+    with a semaphore instead of a thread pool bounding concurrency.
+    """
+    if not queries:
+        return []
+
+    slots = asyncio.Semaphore(max(1, max_workers))
+
+    async def search(query: str):
+        async with slots:
+            return await aweb_search(query=query, max_results=max_results, timeout=query_timeout)
+
+    tasks = [asyncio.create_task(search(query)) for query in queries]
+
+    done, pending = await asyncio.wait(tasks, timeout=batch_deadline)
+    for task in pending:
+        task.cancel()
+
+    return _collect_results(queries, tasks, done)
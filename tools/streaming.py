@@ -0,0 +1,16 @@
+from langgraph.config import get_stream_writer
+
+
+def _discard(_event):
+    pass
+
+
+def stream_writer():
+    """
+    LangGraph's custom-event writer for the running node, or a no-op when
+    the agent is called directly outside a graph run.
+    """
+    try:
+        return get_stream_writer()
+    except RuntimeError:
+        return _discard
@@ -0,0 +1,337 @@
+import contextvars
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables import RunnableConfig
+from langgraph.errors import GraphInterrupt
+
+SERVICE_NAME = "deep-research-agent"
+MAX_RETAINED_SPANS = 10000
+
+# Duration buckets (seconds) for the Prometheus histogram
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+# =========================
+# Spans
+# =========================
+
+class Span:
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.kind = kind  # node | llm | http | search | cache
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = "ok"
+
+    @property
+    def duration(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def set(self, **attributes):
+        self.attributes.update({k: v for k, v in attributes.items() if v is not None})
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+class SpanCollector:
+    """
+    Keeps the most recent finished spans for export and running
+    aggregates (counts, duration histograms, token and cache counters)
+    for the Prometheus view.
+    """
+
+    def __init__(self, max_spans: int = MAX_RETAINED_SPANS):
+        self._lock = threading.Lock()
+        self._spans = deque(maxlen=max_spans)
+        self._reset()
+
+    def _reset(self):
+        self._spans.clear()
+        self._durations = defaultdict(lambda: [0] * (len(DURATION_BUCKETS) + 1))
+        self._duration_sums = defaultdict(float)
+        self._errors = defaultdict(int)
+        self._tokens = defaultdict(int)
+        self._cache = defaultdict(int)
+
+    def record(self, span: Span):
+        key = (span.kind, span.name)
+        with self._lock:
+            self._spans.append(span)
+
+            buckets = self._durations[key]
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if span.duration <= bound:
+                    buckets[i] += 1
+            buckets[-1] += 1
+            self._duration_sums[key] += span.duration
+
+            if span.status == "error":
+                self._errors[key] += 1
+
+            for direction in ("input", "output"):
+                tokens = span.attributes.get(f"llm.{direction}_tokens")
+                if tokens:
+                    self._tokens[(span.attributes.get("llm.model", span.name), direction)] += tokens
+
+            if "cache.hit" in span.attributes:
+                self._cache[(span.name, "hit" if span.attributes["cache.hit"] else "miss")] += 1
+
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    # ---------- Exporters ----------
+
+    def export_otlp_json(self) -> Dict[str, Any]:
+        """
+        Spans in the OTLP/JSON trace format, ready for an OpenTelemetry
+        collector's /v1/traces endpoint or a file exporter.
+        """
+        def value(v):
+            if isinstance(v, bool):
+                return {"boolValue": v}
+            if isinstance(v, int):
+                return {"intValue": str(v)}
+            if isinstance(v, float):
+                return {"doubleValue": v}
+            return {"stringValue": str(v)}
+
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+                "scopeSpans": [{
+                    "scope": {"name": "tools.telemetry"},
+                    "spans": [
+                        {
+                            "traceId": s.trace_id,
+                            "spanId": s.span_id,
+                            "parentSpanId": s.parent_id or "",
+                            "name": s.name,
+                            "kind": 3 if s.kind in ("llm", "http", "search") else 1,  # CLIENT / INTERNAL
+                            "startTimeUnixNano": str(s.start_ns),
+                            "endTimeUnixNano": str(s.end_ns),
+                            "attributes": [
+                                {"key": k, "value": value(v)}
+                                for k, v in {"span.kind": s.kind, **s.attributes}.items()
+                            ],
+                            "status": {"code": 2 if s.status == "error" else 1},
+                        }
+                        for s in self.spans()
+                    ],
+                }],
+            }]
+        }
+
+    def export_prometheus(self) -> str:
+        """Aggregates in the Prometheus text exposition format."""
+        lines = [
+            "# HELP research_span_duration_seconds Duration of nodes, LLM calls and HTTP requests.",
+            "# TYPE research_span_duration_seconds histogram",
+        ]
+        with self._lock:
+            for (kind, name), buckets in sorted(self._durations.items()):
+                labels = f'kind="{kind}",name="{name}"'
+                for bound, count in zip(DURATION_BUCKETS, buckets):
+                    lines.append(f'research_span_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'research_span_duration_seconds_bucket{{{labels},le="+Inf"}} {buckets[-1]}')
+                lines.append(f"research_span_duration_seconds_sum{{{labels}}} {self._duration_sums[(kind, name)]:.6f}")
+                lines.append(f"research_span_duration_seconds_count{{{labels}}} {buckets[-1]}")
+
+            lines += [
+                "# HELP research_span_errors_total Spans that ended with an error.",
+                "# TYPE research_span_errors_total counter",
+            ]
+            for (kind, name), count in sorted(self._errors.items()):
+                lines.append(f'research_span_errors_total{{kind="{kind}",name="{name}"}} {count}')
+
+            lines += [
+                "# HELP research_llm_tokens_total LLM tokens by model and direction.",
+                "# TYPE research_llm_tokens_total counter",
+            ]
+            for (model, direction), count in sorted(self._tokens.items()):
+                lines.append(f'research_llm_tokens_total{{model="{model}",direction="{direction}"}} {count}')
+
+            lines += [
+                "# HELP research_cache_requests_total Cache lookups by span and result.",
+                "# TYPE research_cache_requests_total counter",
+            ]
+            for (name, result), count in sorted(self._cache.items()):
+                lines.append(f'research_cache_requests_total{{name="{name}",result="{result}"}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+    def write_otlp_json(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.export_otlp_json(), f)
+
+
+collector = SpanCollector()
+
+
+def _new_trace_id() -> str:
+    return uuid.uuid4().hex
+
+
+def start_span(name: str, kind: str, trace_id: Optional[str] = None, **attributes) -> Span:
+    parent = _current_span.get()
+    return Span(
+        name=name,
+        kind=kind,
+        trace_id=trace_id or (parent.trace_id if parent else _new_trace_id()),
+        parent_id=parent.span_id if parent else None,
+        attributes={k: v for k, v in attributes.items() if v is not None},
+    )
+
+
+def end_span(span: Span, status: str = "ok"):
+    span.end_ns = time.time_ns()
+    span.status = status
+    collector.record(span)
+
+
+@contextmanager
+def span(name: str, kind: str, trace_id: Optional[str] = None, **attributes):
+    """
+    Time a block as a child of the current span. Yields the span so the
+    block can attach attributes (token counts, cache hits, sizes, ...).
+    """
+    s = start_span(name, kind, trace_id=trace_id, **attributes)
+    token = _current_span.set(s)
+    try:
+        yield s
+    except GraphInterrupt:
+        # interrupt() is control flow, not a failure
+        end_span(s, "interrupted")
+        raise
+    except Exception as e:
+        s.set(error=type(e).__name__)
+        end_span(s, "error")
+        raise
+    else:
+        end_span(s)
+    finally:
+        _current_span.reset(token)
+
+
+# =========================
+# Graph nodes
+# =========================
+
+def _trace_id_for(config: Optional[RunnableConfig]) -> Optional[str]:
+    # One trace per research thread, so resumed runs land in the same trace
+    thread_id = ((config or {}).get("configurable") or {}).get("thread_id")
+    if thread_id is None:
+        return None
+    return hashlib.sha256(str(thread_id).encode("utf-8")).hexdigest()[:32]
+
+
+def instrument_node(name: str, node: Callable) -> Callable:
+    """Wrap a graph node (sync or async) so every run of it is recorded as a span."""
+
+    if inspect.iscoroutinefunction(node):
+        async def instrumented(state, config: RunnableConfig):
+            with span(name, "node", trace_id=_trace_id_for(config)) as s:
+                result = await node(state)
+                if isinstance(result, dict):
+                    s.set(updated_keys=",".join(sorted(result)))
+                return result
+    else:
+        def instrumented(state, config: RunnableConfig):
+            with span(name, "node", trace_id=_trace_id_for(config)) as s:
+                result = node(state)
+                if isinstance(result, dict):
+                    s.set(updated_keys=",".join(sorted(result)))
+                return result
+
+    instrumented.__name__ = getattr(node, "__name__", name)
+    return instrumented
+
+
+# =========================
+# LLM calls
+# =========================
+
+class TelemetryCallbackHandler(BaseCallbackHandler):
+    """
+    Records one span per chat model call with its model, prompt size,
+    token usage and retries. Attach it to an LLM with
+    `.with_config(callbacks=llm_callbacks)`.
+    """
+
+    # Cheap and thread-safe: run on the event loop under ainvoke instead
+    # of hopping to an executor thread
+    run_inline = True
+
+    def __init__(self):
+        self._open: Dict[uuid.UUID, Span] = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        invocation = kwargs.get("invocation_params") or {}
+        model = invocation.get("model") or invocation.get("model_name") or (kwargs.get("metadata") or {}).get("ls_model_name")
+        prompt_chars = sum(len(str(m.content)) for batch in messages for m in batch)
+
+        s = start_span("llm.call", "llm", **{"llm.model": model, "llm.prompt_chars": prompt_chars})
+        with self._lock:
+            self._open[run_id] = s
+
+    def on_retry(self, retry_state, *, run_id, **kwargs):
+        with self._lock:
+            s = self._open.get(run_id)
+        if s is not None:
+            s.attributes["llm.retries"] = s.attributes.get("llm.retries", 0) + 1
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            s = self._open.pop(run_id, None)
+        if s is None:
+            return
+
+        usage = {}
+        try:
+            usage = response.generations[0][0].message.usage_metadata or {}
+        except (AttributeError, IndexError):
+            pass
+        if not usage and response.llm_output:
+            token_usage = response.llm_output.get("token_usage") or {}
+            usage = {
+                "input_tokens": token_usage.get("prompt_tokens"),
+                "output_tokens": token_usage.get("completion_tokens"),
+            }
+
+        s.set(**{
+            "llm.input_tokens": usage.get("input_tokens"),
+            "llm.output_tokens": usage.get("output_tokens"),
+        })
+        end_span(s)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            s = self._open.pop(run_id, None)
+        if s is not None:
+            s.set(error=type(error).__name__)
+            end_span(s, "error")
+
+
+llm_callbacks = [TelemetryCallbackHandler()]
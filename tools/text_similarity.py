@@ -0,0 +1,51 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in",
+    "is", "it", "its", "of", "on", "or", "that", "the", "this", "to", "was", "were",
+    "what", "when", "which", "who", "why", "how", "will", "with", "vs", "versus",
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[.-][a-z0-9]+)*")
+
+
+def _stem(token: str) -> str:
+    # Plural folding is enough for matching snippets and claims
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [_stem(t) for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def tfidf_vectors(documents: List[str]) -> List[Dict[str, float]]:
+    """
+    L2-normalized TF-IDF vectors for a small in-memory corpus. The IDF is
+    computed over `documents` themselves, which is all we need to compare
+    them with each other.
+    """
+    tokenized = [Counter(tokenize(d)) for d in documents]
+    doc_freq = Counter(term for counts in tokenized for term in counts)
+    n = len(documents)
+
+    vectors = []
+    for counts in tokenized:
+        vector = {
+            term: (1 + math.log(tf)) * (math.log((1 + n) / (1 + doc_freq[term])) + 1)
+            for term, tf in counts.items()
+        }
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        vectors.append({term: w / norm for term, w in vector.items()})
+
+    return vectors
+
+
+def cosine(a: Dict[str, float], b: Dict[str, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b.get(term, 0.0) for term, w in a.items())
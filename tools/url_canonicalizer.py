@@ -0,0 +1,53 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    "gclid", "dclid", "fbclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "ref_url", "_ga", "_gl", "spm", "cmpid", "ocid",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_")
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical form used to decide whether two URLs are the same page:
+    scheme folded to https, lowercase host without "www." and default
+    ports, no fragment, no tracking parameters, sorted query and no
+    trailing slash. A URL that can't be parsed (bad port, broken IPv6
+    host) keeps its netloc, or is returned unchanged.
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+
+    if host.startswith("www."):
+        host = host[4:]
+
+    try:
+        port = parts.port
+    except ValueError:
+        host, port = parts.netloc.lower(), None
+    if port and not (scheme == "http" and port == 80) and not (scheme == "https" and port == 443):
+        host = f"{host}:{port}"
+
+    if scheme in ("http", "https"):
+        scheme = "https"
+
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(k)
+    ))
+
+    return urlunsplit((scheme, host, path, query, ""))
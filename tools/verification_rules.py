@@ -0,0 +1,80 @@
+from typing import Any, Dict, List
+from urllib.parse import urlparse
+
+from tools.claim_clustering import claims_agree
+from tools.text_similarity import cosine, tfidf_vectors
+
+VERIFIED = "verified"
+UNCERTAIN = "uncertain"
+NEEDS_LLM = "needs_llm"
+
+# Claims at least this similar to another claim might corroborate or
+# contradict it in ways only the LLM can judge
+RELATED_CLAIM_THRESHOLD = 0.4
+
+# Sources that never count as evidence on their own
+EXCLUDED_SOURCE_TYPES = {"forum"}
+
+# Reproducible confidence scores, mirroring the verifier prompt's bands
+CONFIDENCE_MULTI_WITH_OFFICIAL = 0.95  # 2+ independent sources incl. official
+CONFIDENCE_MANY_INDEPENDENT = 0.9      # 3+ independent sources
+CONFIDENCE_TWO_INDEPENDENT = 0.8       # exactly 2 independent sources
+CONFIDENCE_SINGLE_OFFICIAL = 0.6       # one official source, uncontradicted
+
+
+def _domain(url: str) -> str:
+    domain = urlparse(url).netloc.lower()
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+def _has_related_claim(vectors, i: int) -> bool:
+    return any(
+        j != i and cosine(vectors[i], vectors[j]) >= RELATED_CLAIM_THRESHOLD
+        for j in range(len(vectors))
+    )
+
+
+def classify_claim_group(group: Dict[str, Any], contested: bool) -> Dict[str, Any]:
+    """
+    Apply the verifier's rules to one claim group:
+    - VERIFIED with two independent sources, or one official source,
+      as long as no related claim could contradict it
+    - UNCERTAIN with a single non-official source and nothing related
+    - NEEDS_LLM otherwise, including whenever a variant wording differs
+      from the claim in polarity, numbers or qualifiers
+    """
+    sources = [s for s in group["sources"] if s["source_type"] not in EXCLUDED_SOURCE_TYPES]
+    independent = len({_domain(s["url"]) for s in sources})
+    has_official = any(s["source_type"] == "official" for s in sources)
+
+    # Disagreement inside the group is a possible contradiction
+    disputed = any(not claims_agree(group["claim"], v) for v in group.get("variants", []))
+
+    if contested or disputed or not sources:
+        return {"verdict": NEEDS_LLM}
+
+    if independent >= 2:
+        if has_official:
+            confidence = CONFIDENCE_MULTI_WITH_OFFICIAL
+        elif independent >= 3:
+            confidence = CONFIDENCE_MANY_INDEPENDENT
+        else:
+            confidence = CONFIDENCE_TWO_INDEPENDENT
+        return {"verdict": VERIFIED, "confidence": confidence}
+
+    if has_official:
+        return {"verdict": VERIFIED, "confidence": CONFIDENCE_SINGLE_OFFICIAL}
+
+    return {"verdict": UNCERTAIN}
+
+
+def preclassify(claim_groups: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Decide every claim group that the rules can decide on their own.
+    Returns one decision per group, in order.
+    """
+    vectors = tfidf_vectors([g["claim"] for g in claim_groups])
+    return [
+        classify_claim_group(group, contested=_has_related_claim(vectors, i))
+        for i, group in enumerate(claim_groups)
+    ]
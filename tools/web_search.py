@@ -1,22 +1,66 @@
-from tavily import TavilyClient
+import asyncio
+from tavily import AsyncTavilyClient, TavilyClient
 import os
 
-tavily = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+from tools.search_cache import get_search_cache, search_cache_key
+from tools.telemetry import span
 
-def web_search(query: str, max_results: int = 5):
-    results = tavily.search(
-        query=query,
-        max_results=max_results
-    )
+tavily = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+async_tavily = AsyncTavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
 
+def _clean_results(results, query: str):
     cleaned = []
     for r in results["results"]:
         cleaned.append({
             "url": r["url"],
             "title": r["title"],
             "snippet": r["content"],
+            "score": r.get("score"),
             "source": "web",
             "query": query
         })
-
     return cleaned
+
+def web_search(query: str, max_results: int = 5, timeout: float = 60):
+    cache = get_search_cache()
+    key = search_cache_key(query, max_results)
+
+    with span("search.tavily", "search", query=query) as s:
+        cached = cache.get(key)
+        s.set(**{"cache.hit": cached is not None})
+        if cached is not None:
+            # Same normalized query, possibly worded differently this time
+            return [{**r, "query": query} for r in cached]
+
+        results = tavily.search(
+            query=query,
+            max_results=max_results,
+            timeout=timeout
+        )
+
+        cleaned = _clean_results(results, query)
+        s.set(**{"search.results": len(cleaned)})
+        cache.set(key, cleaned)
+        return cleaned
+
+async def aweb_search(query: str, max_results: int = 5, timeout: float = 60):
+    cache = get_search_cache()
+    key = search_cache_key(query, max_results)
+
+    with span("search.tavily", "search", query=query) as s:
+        # The search cache may be blocking SQLite; keep it off the event loop
+        cached = await asyncio.to_thread(cache.get, key)
+        s.set(**{"cache.hit": cached is not None})
+        if cached is not None:
+            return [{**r, "query": query} for r in cached]
+
+        results = await async_tavily.search(
+            query=query,
+            max_results=max_results,
+            timeout=timeout
+        )
+
+        cleaned = _clean_results(results, query)
+        s.set(**{"search.results": len(cleaned)})
+        await asyncio.to_thread(cache.set, key, cleaned)
+        return cleaned